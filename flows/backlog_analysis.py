@@ -0,0 +1,158 @@
+import os
+import json
+from typing import Optional
+from prefect import flow, task, get_run_logger
+from prefect.task_runners import ThreadPoolTaskRunner
+
+from flows.extract_keywords import (
+    EXTRACT_BATCH_SIZE, evict_classification_cache, extract_keywords_concurrently, extraction_slot,
+    upload_results_to_db, refresh_materialized_views, update_trend_counters, backup_results_to_s3,
+)
+from plugins.hooks.log_and_notify import upload_logs_to_s3_and_notify
+from services.service_db import TASK_RUNNER_WORKERS
+
+# 한 번에 조회/분류/커밋하는 미분석 포스트 수
+BACKLOG_CHUNK_SIZE = int(os.getenv("BACKLOG_CHUNK_SIZE", "500"))
+# 마지막으로 커밋한 청크의 id를 기록하는 체크포인트 파일
+BACKLOG_CHECKPOINT_PATH = os.getenv("BACKLOG_CHECKPOINT_PATH", "/opt/prefect/blog_data/backlog_checkpoint.json")
+
+
+def _load_checkpoint(path: str = BACKLOG_CHECKPOINT_PATH) -> dict:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def _save_checkpoint(state: dict, path: str = BACKLOG_CHECKPOINT_PATH) -> None:
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(state, f)
+    os.replace(tmp_path, path)
+
+
+@task(name="load_unanalyzed_chunk")
+def load_unanalyzed_chunk(after_id: Optional[str], limit: int) -> list[str]:
+    """
+    분석 대상 포스트 id를 id 순으로 after_id 다음부터 limit 개 조회 (keyset pagination)
+    is_analyzed == False 인 포스트와, LLM 할당량이 없을 때 로컬 모델이 대신 분석한(analyzed_by = 'local') 포스트가 대상이다.
+    """
+    from sqlalchemy import or_
+    from services.service_db import session_scope
+    from models.db_models import ExternalPost
+    from plugins.extractor.local_extractor import ANALYZED_BY_LOCAL
+
+    with session_scope() as db:
+        query = db.query(ExternalPost.id).filter(or_(ExternalPost.is_analyzed == False, ExternalPost.analyzed_by == ANALYZED_BY_LOCAL))
+        if after_id is not None:
+            query = query.filter(ExternalPost.id > after_id)
+        rows = query.order_by(ExternalPost.id).limit(limit).all()
+    return [row[0] for row in rows]
+
+
+@task(name="backfill_manifest")
+def backfill_manifest(force: bool = False) -> int:
+    """
+    매니페스트를 레이크 전체(수집 원본)로 한 번 채운다. 매니페스트 도입 전에 쓴 파일의 포스트는
+    수집 flow도 파티션 압축(최근 7일)도 기록하지 않으므로, 채우지 않으면 backlog에서 찾을 수 없다.
+    이미 채웠으면 force=True일 때만 다시 채운다.
+    """
+    from services.lake import RAW_PREFIX
+    from services.manifest import PostManifest
+
+    logger = get_run_logger()
+    manifest = PostManifest()
+    if manifest.backfilled and not force:
+        return 0
+    total = manifest.backfill(RAW_PREFIX)
+    logger.info(f"매니페스트 백필 완료: {total} 개의 포스트 ({len(manifest)} 개 기록됨)")
+    return total
+
+
+@task(name="load_chunk_texts")
+def load_chunk_texts(post_ids: list[str]) -> list[dict]:
+    """
+    매니페스트로 각 포스트가 들어 있는 레이크 객체를 찾아 encoded_url, rss_content만 읽어 반환
+    본문을 찾지 못한 포스트는 매니페스트에 표시해 다음 실행부터 레이크를 다시 뒤지지 않고 건너뛴다.
+    (매니페스트를 다시 채워 본문이 기록되면 표시가 지워진다)
+    """
+    from services.lake import read_posts
+    from services.manifest import PostManifest
+
+    logger = get_run_logger()
+    manifest = PostManifest()
+    skipped = manifest.missing(post_ids)
+    targets = [post_id for post_id in post_ids if post_id not in skipped]
+    located = manifest.locate(targets)
+    s3_data = []
+    for obj_key, ids in located.items():
+        s3_data.extend(read_posts(obj_key, ids).to_pylist())
+
+    found = {row['encoded_url'] for row in s3_data}
+    missing = [post_id for post_id in targets if post_id not in found]
+    if missing:
+        manifest.mark_missing(missing)
+        logger.warning(f"레이크에서 본문을 찾지 못한 포스트 {len(missing)} 개는 다음 실행부터 건너뜁니다. (python utils/backfill_manifest.py 로 다시 채울 수 있음)")
+    if skipped:
+        logger.info(f"본문 없음으로 표시된 포스트 {len(skipped)} 개 건너뜀")
+    logger.info(f"Loaded {len(s3_data)} rows from {len(located)} lake objects.")
+    return s3_data
+
+
+@flow(name="Backlog analysis flow", on_completion=[upload_logs_to_s3_and_notify], on_failure=[upload_logs_to_s3_and_notify], task_runner=ThreadPoolTaskRunner(max_workers=TASK_RUNNER_WORKERS), log_prints=True) # type: ignore
+def backlog_analysis_flow(chunk_size: int = BACKLOG_CHUNK_SIZE, batch_size: int = EXTRACT_BATCH_SIZE,
+                          max_chunks: Optional[int] = None, restart: bool = False):
+    """
+    아직 분석되지 않은 포스트와 로컬 모델이 대신 분석한 포스트를 chunk_size 개씩 LLM으로 분류하고 청크마다 커밋한다.
+
+    - 청크가 커밋될 때마다 마지막 id를 체크포인트에 기록하므로, 중단되면 다음 실행이 그 뒤부터 이어서 진행한다.
+    - 끝까지 처리하면 체크포인트를 지워, 다음 실행에서 분류에 실패했던 포스트를 처음부터 다시 시도한다.
+    - restart=True면 체크포인트를 무시하고 처음부터 진행한다.
+    - 주간 파이프라인과 겹치지 않도록 청크마다 추출 슬롯(extraction_slot)을 잡는다. 파이프라인이 돌고 있으면
+      끝날 때까지 기다리고, 파이프라인은 backlog의 청크 하나가 끝날 때까지만 기다린다.
+    """
+    logger = get_run_logger()
+
+    checkpoint = {} if restart else _load_checkpoint()
+    last_id = checkpoint.get('last_id')
+    if last_id is not None:
+        logger.info(f"체크포인트에서 이어서 진행: {last_id} 이후 (지금까지 {checkpoint.get('analyzed', 0)} 개 분석)")
+
+    backfill_manifest()
+    evict_classification_cache()
+    analyzed = 0
+    chunks = 0
+    changed_tables = set()
+    while max_chunks is None or chunks < max_chunks:
+        post_ids = load_unanalyzed_chunk(last_id, chunk_size)
+        if not post_ids:
+            logger.info("미분석 포스트를 끝까지 처리했습니다.")
+            _save_checkpoint({})
+            break
+
+        s3_data = load_chunk_texts(post_ids)
+        if s3_data:
+            with extraction_slot():
+                # 로컬 결과를 LLM 결과로 바꾸는 것이 목적이므로 로컬 사전 필터는 쓰지 않는다.
+                results = extract_keywords_concurrently(s3_data, batch_size, use_prefilter=False)
+                if results:
+                    changed_tables |= upload_results_to_db(results)
+                    backup_results_to_s3(results)
+                    analyzed += len(results)
+
+        last_id = post_ids[-1]
+        _save_checkpoint({'last_id': last_id, 'analyzed': checkpoint.get('analyzed', 0) + analyzed})
+        chunks += 1
+        logger.info(f"청크 {chunks} 커밋 완료: {len(post_ids)} 개 중 누적 {analyzed} 개 분석")
+
+    if analyzed:
+        with extraction_slot():
+            refresh_materialized_views(changed_tables)
+            update_trend_counters()
+    return analyzed
+
+
+if __name__ == "__main__":
+    backlog_analysis_flow()
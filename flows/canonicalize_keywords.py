@@ -0,0 +1,80 @@
+from prefect import flow, task, get_run_logger
+
+from flows.extract_keywords import refresh_materialized_views, update_trend_counters
+from plugins.extractor.keyword_canonicalizer import KEYWORD_SIMILARITY_THRESHOLD
+from plugins.hooks.log_and_notify import upload_logs_to_s3_and_notify
+
+
+@task(name="find_keyword_masters")
+def find_keyword_masters(threshold: float = KEYWORD_SIMILARITY_THRESHOLD) -> list[tuple[int, int, str, str]]:
+    """
+    master_id가 없는 키워드를 별칭/문자 n-gram 유사도로 묶어 (id, master_id, keyword, master_keyword) 목록을 반환
+    """
+    from sqlalchemy import func
+    from services.service_db import session_scope
+    from models.db_models import Keyword, PostKeywordMapping
+    from plugins.extractor.keyword_canonicalizer import cluster_keywords
+
+    logger = get_run_logger()
+    with session_scope() as db:
+        rows = (
+            db.query(Keyword.id, Keyword.keyword, func.count(PostKeywordMapping.post_id))
+            .outerjoin(PostKeywordMapping, PostKeywordMapping.keyword_id == Keyword.id)
+            .filter(Keyword.master_id.is_(None))
+            .group_by(Keyword.id, Keyword.keyword)
+            .order_by(Keyword.id)
+            .all()
+        )
+    if not rows:
+        return []
+    ids, keywords, popularity = map(list, zip(*rows))
+    master = cluster_keywords(keywords, popularity, threshold)
+    merges = [(ids[i], ids[m], keywords[i], keywords[m]) for i, m in enumerate(master) if m != i]
+    logger.info(f"키워드 {len(rows)} 개 중 {len(merges)} 개를 {len({m for _, m, _, _ in merges})} 개의 대표 키워드로 통합")
+    return merges
+
+
+@task(name="apply_keyword_masters")
+def apply_keyword_masters(merges: list[tuple[int, int, str, str]]) -> int:
+    """
+    master_id를 기록하고 기존 매핑을 대표 키워드로 옮긴 뒤 KEYWORD_DAILY_COUNTS를 다시 계산
+    """
+    from services.service_db import session_scope
+    from services.bulk_load import set_keyword_masters, merge_keyword_mappings, rebuild_keyword_daily_counts, forget_keyword_ids
+    from plugins.extractor.keyword_canonicalizer import reset_canonicalizer
+
+    logger = get_run_logger()
+    with session_scope() as db:
+        cursor = db.connection().connection.cursor()
+        updated = set_keyword_masters(cursor, [(keyword_id, master_id) for keyword_id, master_id, _, _ in merges])
+        moved = merge_keyword_mappings(cursor)
+        counted = rebuild_keyword_daily_counts(cursor) if moved else 0
+    # 이 프로세스에 캐시된 키워드 id/표기는 통합 전 기준이므로 버린다.
+    forget_keyword_ids()
+    reset_canonicalizer()
+    logger.info(f"master_id 지정 {updated} 개, 매핑 이동 {moved} 개, 일별 집계 {counted} 행 재계산")
+    return updated
+
+
+@flow(name="Keyword canonicalization flow", on_completion=[upload_logs_to_s3_and_notify], on_failure=[upload_logs_to_s3_and_notify], log_prints=True) # type: ignore
+def keyword_canonicalization_flow(threshold: float = KEYWORD_SIMILARITY_THRESHOLD, dry_run: bool = False):
+    """
+    동의어/표기 차이 키워드에 master_id를 지정하고 매핑과 집계를 대표 키워드로 모은다.
+    dry_run=True면 통합 후보만 로그로 남긴다.
+    """
+    logger = get_run_logger()
+
+    merges = find_keyword_masters(threshold)
+    for keyword_id, master_id, keyword, master_keyword in merges[:50]:
+        logger.info(f"{keyword} ({keyword_id}) -> {master_keyword} ({master_id})")
+    if dry_run or not merges:
+        return merges
+
+    apply_keyword_masters(merges)
+    refresh_materialized_views({"KEYWORDS", "EXTERNAL_POSTS_KEYWORDS", "KEYWORD_DAILY_COUNTS"})
+    update_trend_counters()
+    return merges
+
+
+if __name__ == "__main__":
+    keyword_canonicalization_flow()
@@ -1,6 +1,11 @@
-from prefect import flow, task, get_run_logger
+from prefect import flow, task, get_run_logger, unmapped
 from prefect.task_runners import ThreadPoolTaskRunner
 from plugins.hooks.log_and_notify import upload_logs_to_s3_and_notify
+from services.service_db import TASK_RUNNER_WORKERS, pool_metrics
+import os
+
+# 피드 파싱 방식: "thread" (플랫폼별 태스크 매핑) | "process" (프로세스 풀)
+PARSE_MODE = os.getenv("PARSE_MODE", "thread")
 
 
 
@@ -21,55 +26,164 @@ def load_config():
 
     return [{"platform": key, "url": config[key], "decoded_platform": base64.b64decode(key).decode('utf-8')} for key in config]
 
-def _undup_url(url_hash_list:list[str], db) -> list[str]:
+@task(name="fetch_platform_feeds")
+def fetch_platform_feeds(configs):
     """
-    수집된 url 중에서 이미 DB에 존재하는 url을 제거하여 반환
+    모든 플랫폼의 RSS 피드를 비동기로 동시에 가져온다.
+    ETag/Last-Modified 캐시 기준으로 변경되지 않은(304) 피드는 제외하고 반환
+    """
+    from plugins.parser.fetcher import FeedCache, fetch_feeds
+
+    logger = get_run_logger()
+    cache = FeedCache().load()
+    fetched = fetch_feeds([config['url'] for config in configs], cache)
+
+    changed = []
+    for config in configs:
+        res = fetched[config['url']]
+        if res['not_modified']:
+            logger.info(f"변경 없음(304), 파싱 생략: {config['decoded_platform']}")
+            continue
+        if res['error']:
+            logger.warning(f"피드 다운로드 실패, 파싱 단계에서 다시 시도합니다: {config['decoded_platform']} ({res['error']})")
+        changed.append(config | {'fetched': res})
+    logger.info(f"피드 다운로드 완료: {len(changed)}/{len(configs)} 개의 피드 변경됨")
+    return changed
+
+@task(name="save_feed_cache")
+def save_feed_cache(configs):
+    """
+    처리가 끝난 피드의 ETag/Last-Modified 값을 캐시에 기록
+    DB 저장까지 성공한 뒤에 호출해야 실패한 피드가 다음 실행에서 304로 누락되지 않는다.
+    """
+    from plugins.parser.fetcher import FeedCache
+
+    cache = FeedCache().load()
+    for config in configs:
+        fetched = config.get('fetched') or {}
+        if fetched.get('content') is None:
+            continue
+        cache.update(config['url'], etag=fetched.get('etag'), last_modified=fetched.get('last_modified'))
+    cache.save()
+
+@task(name="load_url_index")
+def load_url_index():
     """
-    from models.db_models import ExternalPost
+    로컬 URL 해시 인덱스를 로드하고, 마지막 동기화 이후 DB에 추가된 해시만 반영하여 반환
+    한 번의 실행에서 한 번만 로드하여 모든 collect_platform_data 태스크가 공유한다.
+    """
+    from services.url_index import UrlIndex
+    from services.service_db import session_scope
 
     logger = get_run_logger()
-    logger.info(f"중복 제거를 위해 DB에서 기존 URL 조회 시도: {len(url_hash_list)} 개의 URL 해시")
-    existing_urls = db.query(ExternalPost.id).filter(ExternalPost.id.in_(url_hash_list)).all()
-    existing_urls = [url[0] for url in existing_urls]
+    url_index = UrlIndex().load()
+    try:
+        with session_scope() as db:
+            synced = url_index.sync_from_db(db)
+        logger.info(f"URL 인덱스 로드 완료: {len(url_index)} 개의 해시 (DB에서 {synced} 개 동기화)")
+    except Exception as e:
+        logger.warning(f"URL 인덱스 DB 동기화 실패, 인덱스에 없는 URL은 DB에서 확인합니다: {e}")
+    return url_index
 
-    return [url for url in url_hash_list if url not in existing_urls]
+@task(name="save_url_index")
+def save_url_index(url_index, data):
+    """
+    DB에 저장된 신규 기사의 해시를 URL 인덱스에 추가하고 디스크에 기록
+    """
+    url_index.add(url for d in data for url in d['data'].column('encoded_url').to_pylist())
+    url_index.save()
+
+def _undup_url(url_hash_list:list[str], url_index, db) -> set[str]:
+    """
+    수집된 url 중에서 이미 DB에 존재하는 url을 제거하여 반환
+    로컬 URL 인덱스로 먼저 거르고, 인덱스가 DB와 동기화되지 않은 경우에만 남은 url을 DB에서 확인한다.
+    """
+    logger = get_run_logger()
+    logger.info(f"중복 제거를 위해 URL 인덱스 조회: {len(url_hash_list)} 개의 URL 해시")
+    return url_index.filter_new(url_hash_list, db=None if url_index.synced else db)
 
 @task(name="collect_platform_data")
-def collect_platform_data(config):
+def collect_platform_data(config, url_index):
     """
-    특정 플랫폼의 RSS 피드를 파싱하고 중복 제거 후 DataFrame으로 반환
+    특정 플랫폼의 RSS 피드를 파싱하고 중복 제거 후 Arrow Table로 반환
     """
-    import pandas as pd
+    from contextlib import nullcontext
     from plugins.parser.parser import RSSParser
-    from services.service_db import DbSession
-    db = DbSession()
+    from services.service_db import session_scope
     logger = get_run_logger()
     logger.info(f" collecting data for platform: {config['decoded_platform']}")
 
     # RSS 파싱
     try:        
         parser = RSSParser(config['platform'], config['url'])
-        articles = parser.parse()
+        fetched = config.get('fetched') or {}
+        # 이미 수집된 글은 HTML 파싱 전에 건너뛴다
+        articles = parser.parse(fetched.get('content'), fetched.get('headers'), is_known=url_index.__contains__)
         logger.info(f"RSS 파싱 완료: {len(articles)} 개의 기사 수집")
     except Exception as e:
         logger.error(f"RSS 파싱 실패: {e}")
         return None
 
+    # 인덱스가 DB와 동기화되지 않은 경우에만 중복 확인용 커넥션을 잡는다 (피드 다운로드/파싱 동안에는 잡지 않음)
+    with (nullcontext() if url_index.synced else session_scope()) as db:
+        return _build_result(config, articles, url_index, db)
+
+def _build_result(config, articles, url_index, db):
+    """
+    파싱된 기사에서 중복을 제거하고 collect_platform_data 결과 형태로 변환
+    """
+    from models.rss_schema import ArticleBatchBuilder
+
+    logger = get_run_logger()
+
     # 중복 제거
     try:
         hash_list = [article.encoded_url for article in articles]
-        undup_hash_list = _undup_url(hash_list, db)
-        articles = [article for article in articles if article.encoded_url in undup_hash_list]
+        undup_hash_set = _undup_url(hash_list, url_index, db)
+        articles = [article for article in articles if article.encoded_url in undup_hash_set]
         logger.info(f"중복 제거 완료: {len(articles)} 개의 신규 기사")
     except Exception as e:
         logger.error(f"중복 제거 실패: {e}")
         return None
 
-    # DataFrame 변환
-    articles = [article.__dict__ for article in articles]
-    n = len(articles)
-    df = pd.DataFrame(articles)
-    return {'data': df, 'platform': config['decoded_platform'], 'num_articles': n}
+    # 컬럼 단위로 바로 Arrow Table 구성
+    table = ArticleBatchBuilder().extend(articles).build()
+    n = table.num_rows
+    return {'data': table, 'platform': config['decoded_platform'], 'num_articles': n}
+
+@task(name="collect_platform_data_in_pool")
+def collect_platform_data_in_pool(configs, url_index):
+    """
+    모든 플랫폼의 피드 파싱(feedparser + HTML 텍스트 추출)을 CPU 코어 수만큼의 프로세스 풀에 나눠 맡기고,
+    플랫폼별 결과를 collect_platform_data와 같은 형태의 리스트로 반환
+    """
+    from contextlib import nullcontext
+    from models.rss_schema import ArticleSchema
+    from plugins.parser.pool import parse_feeds_in_pool
+    from services.service_db import session_scope
+
+    logger = get_run_logger()
+    jobs = [{
+        'platform': config['platform'],
+        'url': config['url'],
+        'content': (config.get('fetched') or {}).get('content'),
+        'headers': (config.get('fetched') or {}).get('headers'),
+    } for config in configs]
+    parsed = parse_feeds_in_pool(jobs, known_hashes=url_index.hashes)
+    logger.info(f"프로세스 풀 파싱 완료: {len(parsed)} 개의 피드")
+
+    results = []
+    with (nullcontext() if url_index.synced else session_scope()) as db:
+        for config in configs:
+            res = parsed[config['url']]
+            if res['error']:
+                logger.error(f"RSS 파싱 실패: {config['decoded_platform']} ({res['error']})")
+                results.append(None)
+                continue
+            articles = [ArticleSchema(**article) for article in res['articles']]
+            logger.info(f"RSS 파싱 완료: {config['decoded_platform']} {len(articles)} 개의 기사 수집")
+            results.append(_build_result(config, articles, url_index, db))
+    return results
 
 @task(name="save_to_sqlite")
 def save_to_sqlite(data):
@@ -82,7 +196,7 @@ def save_to_sqlite(data):
     db_path = os.path.join(base_path, "articles.db")
     conn = sqlite3.connect(db_path)
     platform = data['platform']
-    df = data['data']
+    df = data['data'].to_pandas()
     table_name = platform.replace(" ", "_").lower() + "_articles"
 
     logger = get_run_logger()
@@ -94,134 +208,142 @@ def save_to_sqlite(data):
         conn.close()
     logger.info(f"Saved {data['num_articles']} articles to table {table_name} in {db_path}")
 
-@task(name="save_to_s3")
-def save_to_s3(data):
+def _write_raw_to_lake(table):
     """
-    수집된 데이터를 Parquet 형식으로 S3에 저장
+    한 번의 실행에서 수집한 모든 플랫폼의 데이터를 blog-data/raw/dt=날짜/ 아래 Parquet 파일 하나로 저장하고 object key를 반환
     """
-
-    import boto3
-    import io
     import pendulum
-    import os
-    s3_client = boto3.client('s3')
-
-    # 2. 메모리 버퍼에 Parquet 쓰기
-    buffer = io.BytesIO()
-    data['data'].to_parquet(buffer, index=False, engine='pyarrow', compression='snappy')
-    buffer.seek(0)
+    from services.lake import RAW_PREFIX, write_dataset
+    from services.manifest import PostManifest
 
     now = pendulum.now('Asia/Seoul')
     partition_date = now.to_date_string()        # 2025-02-05
     timestamp = now.format('HHmmss')             # 203015 (시분초)
 
-    object_key = f"blog-data/raw/dt={partition_date}/{data['platform']}_{timestamp}.parquet"
-    bucket_name = os.getenv('S3_BUCKET_NAME')
+    object_key = write_dataset(RAW_PREFIX, table, partition_date, f"run_{timestamp}")
+    logger = get_run_logger()
+    logger.info(f"S3 업로드 성공: {object_key} ({table.num_rows} rows)")
     try:
-        s3_client.upload_fileobj(buffer, bucket_name, object_key)
-        logger = get_run_logger()
-        logger.info(f"S3 업로드 성공: s3://{bucket_name}/{object_key}")
-        return object_key
+        PostManifest().add(table.column('encoded_url').to_pylist(), object_key)
+    except Exception as e:
+        logger.warning(f"포스트 매니페스트 기록 실패: {e}")
+    return object_key
+
+@task(name="save_to_s3")
+def save_to_s3(data):
+    """
+    수집된 데이터를 Parquet 형식으로 S3에 저장 (실행당 파일 하나)
+    """
+    import pyarrow as pa
+
+    try:
+        return _write_raw_to_lake(pa.concat_tables([d['data'] for d in data]))
     except Exception as e:
         logger = get_run_logger()
         logger.error(f"S3 업로드 실패: {e}")
         raise
 
-def _parse_rss_date(raw_date_str):
+@task(name="write_handoff_spool")
+def write_handoff_spool(data):
     """
-    RSS 피드에서 제공하는 날짜 문자열을 Pendulum datetime 객체로 변환
+    수집된 Arrow Table들을 로컬 스풀 파일(Arrow IPC) 하나로 써서 경로를 반환
+    추출 flow는 S3를 거치지 않고 이 파일을 memory map으로 바로 읽는다.
     """
+    from services.spool import write_spool
 
-    import pendulum
-    from email.utils import parsedate_to_datetime
-    from datetime import datetime
+    logger = get_run_logger()
+    path = write_spool([d['data'] for d in data])
+    logger.info(f"스풀 파일 기록: {path} ({sum(d['num_articles'] for d in data)} 개의 기사)")
+    return path
 
-    if not raw_date_str:
-        return pendulum.now('Asia/Seoul')
+@task(name="archive_spool_to_s3", retries=3, retry_delay_seconds=[10, 30, 60])
+def archive_spool_to_s3(spool_path):
+    """
+    스풀 파일의 데이터를 Parquet으로 S3에 보관 (handoff 모드에서 추출과 동시에 실행)
+    """
+    from services.spool import read_spool
 
+    logger = get_run_logger()
     try:
-        # 시도 1: 가장 확실한 email.utils 방식
-        dt_native = parsedate_to_datetime(raw_date_str)
-        return pendulum.instance(dt_native).in_timezone('Asia/Seoul')
-    except Exception:
-        try:
-            # 시도 2: 일반적인 ISO 형식일 경우 Pendulum 자동 파싱
-            return pendulum.parse(raw_date_str)
-        except Exception as e:
-            # 모두 실패 시 현재 시간으로 대체하고 로그 남김
-            logger = get_run_logger()
-            logger.warning(f"날짜 파싱 실패: {raw_date_str}. 현재 시간으로 대체합니다.")
-            return pendulum.now('Asia/Seoul')
+        return _write_raw_to_lake(read_spool(spool_path))
+    except Exception as e:
+        logger.error(f"S3 업로드 실패: {e}")
+        raise
 
 @task(name="insert_to_postgres")
 def insert_to_postgres(data):
     """
     수집된 데이터를 PostgreSQL 데이터베이스에 저장
+    COPY로 임시 테이블에 나눠 적재한 뒤 한 번의 INSERT ... SELECT로 병합한다. (services.bulk_load)
     """
-    from services.service_db import DbSession
-    from models.db_models import ExternalPost
-    import pandas as pd
-    from datetime import datetime
-    from sqlalchemy.dialects.postgresql import insert
+    from services.service_db import session_scope
+    from services.bulk_load import bulk_insert_posts
+    import pyarrow as pa
 
-    db = DbSession()
     logger = get_run_logger()
 
-    dfs = [d['data'] for d in data if d is not None]
-    df = pd.concat(dfs, ignore_index=True)
-    df = df.to_dict(orient='records')
+    tables = [d['data'] for d in data if d is not None]
+    table = pa.concat_tables(tables)
+    # 날짜는 ArticleBatchBuilder가 컬럼 단위로 파싱해 둔 timestamp 컬럼을 그대로 쓴다.
+    columns = [table.column(name).to_pylist() for name in ('encoded_url', 'source', 'title', 'url', 'published_ts', 'collected_ts')]
+    rows = zip(*columns)
 
     try:
-        data_to_insert = []
-        for row in df:
-            logger = get_run_logger()
-            logger.info(f"Inserting post with URL hash: {row['encoded_url']}")
-            logger.info(f"Published at: {row['published_at']}, Created at: {row['created_at']}")
-            post = ({
-                'id': row['encoded_url'],
-                'source': row['source'],
-                'title': row['title'],
-                'url': row['url'],
-                'published_at': _parse_rss_date(row['published_at']),
-                'collected_at': _parse_rss_date(row['created_at']) if row['created_at'] else datetime.now(),
-            })
-            data_to_insert.append(post)
-
-        stmt = insert(ExternalPost).values(data_to_insert)
-        stmt = stmt.on_conflict_do_nothing(index_elements=['id'])
-        db.execute(stmt)
-
-        logger.info(f"PostgreSQL 삽입 성공: {len(data_to_insert)} 개의 포스트 삽입 시도")
-        db.commit()
+        with session_scope() as db:
+            cursor = db.connection().connection.cursor()
+            inserted, skipped = bulk_insert_posts(cursor, rows)
+        logger.info(f"PostgreSQL 삽입 성공: {inserted} 개 삽입, {skipped} 개 중복으로 건너뜀")
     except Exception as e:
         logger.error(f"PostgreSQL 삽입 실패: {e}")
-        db.rollback()
         raise
-    finally:
-        db.close()
 
 
-@flow(task_runner=ThreadPoolTaskRunner(max_workers=4),on_completion=[upload_logs_to_s3_and_notify], on_failure=[upload_logs_to_s3_and_notify], name="Data Collection Flow", log_prints=True) # type: ignore
-def data_collection_flow():
+@flow(task_runner=ThreadPoolTaskRunner(max_workers=TASK_RUNNER_WORKERS),on_completion=[upload_logs_to_s3_and_notify], on_failure=[upload_logs_to_s3_and_notify], name="Data Collection Flow", log_prints=True) # type: ignore
+def data_collection_flow(parse_mode: str = PARSE_MODE, handoff: bool = False):
+    """
+    handoff=False: 플랫폼별 Parquet을 S3에 저장하고 object key 리스트를 반환
+    handoff=True: S3 저장을 건너뛰고 로컬 스풀 파일 경로를 반환 (수집된 데이터가 없으면 None)
+                  S3 보관은 호출하는 쪽에서 archive_spool_to_s3로 따로 처리한다.
+    """
     configs = load_config()
-    collected_futures = collect_platform_data.map(configs)
+    configs = fetch_platform_feeds(configs)
+    url_index = load_url_index()
+    if parse_mode == "process":
+        # 파싱은 CPU 작업이라 프로세스 풀에서 코어 수만큼 병렬로 처리
+        collected = collect_platform_data_in_pool(configs, url_index)
+    else:
+        collected_futures = collect_platform_data.map(configs, url_index=unmapped(url_index))
+        collected = [future.result() for future in collected_futures]
     collected_results = []
+    processed_configs = []
     logger = get_run_logger()
 
-    for future in collected_futures:
-        res = future.result()
+    for config, res in zip(configs, collected):
+        if res is not None:
+            processed_configs.append(config)
         if res and res['num_articles'] > 0:
             collected_results.append(res)
     logger.info(f"총 수집된 플랫폼 수: {len(collected_results)}")
     if len(collected_results) == 0:
         logger.warning("수집된 데이터가 없습니다.")
-        return []
+        save_feed_cache(processed_configs)
+        return None if handoff else []
+
+    if handoff:
+        insert_to_postgres(collected_results)
+        spool_path = write_handoff_spool(collected_results)
+        save_url_index(url_index, collected_results)
+        save_feed_cache(processed_configs)
+        return spool_path
+
     # sqlite_futures = save_to_sqlite.map(collected_results)
-    s3_futures = save_to_s3.map(collected_results)
     # [f.result() for f in sqlite_futures]
-    obj_keys = [f.result() for f in s3_futures]
+    obj_keys = [save_to_s3(collected_results)]
 
     insert_to_postgres(collected_results)
+    save_url_index(url_index, collected_results)
+    save_feed_cache(processed_configs)
+    logger.info(f"DB 커넥션 풀 사용량: {pool_metrics.snapshot()}")
     
     return obj_keys
 
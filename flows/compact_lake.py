@@ -0,0 +1,47 @@
+from prefect import flow, task, get_run_logger
+from prefect.task_runners import ThreadPoolTaskRunner
+from plugins.hooks.log_and_notify import upload_logs_to_s3_and_notify
+
+
+@task(name="compact_partition", retries=2, retry_delay_seconds=[10, 30])
+def compact_partition(prefix: str, partition_date: str, name: str):
+    """
+    데이터셋 dt 파티션 하나의 작은 Parquet 파일들을 정렬된 파일 하나로 합친다. (services.lake)
+    """
+    from services.lake import RAW_PREFIX, compact_partition as compact
+    from services.manifest import PostManifest
+
+    logger = get_run_logger()
+    obj_key = compact(prefix, partition_date, name)
+    if obj_key:
+        logger.info(f"파티션 압축 완료: {obj_key}")
+        if prefix == RAW_PREFIX:
+            # 합쳐진 파일로 매니페스트의 object key를 옮긴다
+            PostManifest().rebuild_from_lake(f"{RAW_PREFIX}/dt={partition_date}")
+    return obj_key
+
+
+@flow(task_runner=ThreadPoolTaskRunner(max_workers=4), on_completion=[upload_logs_to_s3_and_notify], on_failure=[upload_logs_to_s3_and_notify], name="Lake compaction flow", log_prints=True) # type: ignore
+def lake_compaction_flow(days: int = 7, end_date: str | None = None):
+    """
+    end_date(기본값 오늘)까지 days 일 동안의 raw/keywords 파티션을 파티션마다 파일 하나로 압축
+    raw 파티션에 섞여 있던 예전 키워드 결과 파일은 keywords 데이터셋으로 옮긴다.
+    days 보다 오래된 파티션의 예전 키워드 파일은 utils/migrate_legacy_keywords.py로 한 번 옮긴다.
+    """
+    import pendulum
+    from services.lake import RAW_PREFIX, KEYWORDS_PREFIX
+
+    now = pendulum.now('Asia/Seoul')
+    end = pendulum.parse(end_date).date() if end_date else now.date()
+    name = f"compacted_{now.format('YYYYMMDDHHmmss')}"
+    partitions = [end.subtract(days=i).to_date_string() for i in range(days)]
+
+    # 예전 키워드 파일이 keywords 파티션으로 옮겨진 뒤에 keywords 파티션을 압축한다.
+    raw_futures = [compact_partition.submit(RAW_PREFIX, day, name) for day in partitions]
+    [f.result() for f in raw_futures]
+    keyword_futures = [compact_partition.submit(KEYWORDS_PREFIX, day, f"{name}_k") for day in partitions]
+    return [key for f in raw_futures + keyword_futures if (key := f.result())]
+
+
+if __name__ == "__main__":
+    lake_compaction_flow()
@@ -1,168 +1,402 @@
-from prefect import flow, task, get_run_logger, unmapped
+import os
+from contextlib import contextmanager
+from prefect import flow, task, get_run_logger
 from prefect.task_runners import ThreadPoolTaskRunner
 
 from models.db_models import Fields
+from services.service_db import TASK_RUNNER_WORKERS, pool_metrics
 from plugins.hooks.log_and_notify import upload_logs_to_s3_and_notify
 
-@task(name="load_unanalized_data")
-def load_unanalized_data():
+# 한 번의 LLM 요청에 담을 기사 수 (1이면 기사별 개별 요청)
+EXTRACT_BATCH_SIZE = int(os.getenv("EXTRACT_BATCH_SIZE", "10"))
+# 공유 비동기 LLM 클라이언트 사용 여부 (False면 태스크 매핑 + Prefect 재시도 방식)
+USE_ASYNC_LLM_CLIENT = os.getenv("USE_ASYNC_LLM_CLIENT", "true").lower() == "true"
+# 추출 후 갱신할 materialized view (쉼표 구분, 빈 값이면 갱신하지 않음)
+# 키워드 x 일 x 분야 집계는 KEYWORD_DAILY_COUNTS에 증분으로 쌓인다.
+MATERIALIZED_VIEWS = [view.strip() for view in os.getenv(
+    "MATERIALIZED_VIEWS", "TRENDING_KEYWORDS_VIEW,ARTICLES_MENTIONING_KEYWORDS_VIEW,USERS_MENTIONING_KEYWORDS_VIEW"
+).split(",") if view.strip()]
+
+# 미분석 여부를 한 번에 조회하는 id 수
+UNANALYZED_QUERY_CHUNK = 1000
+# 주간 파이프라인과 backlog flow가 함께 쓰는 전역 동시 실행 제한 (슬롯 1개)
+# 두 flow가 같은 포스트를 동시에 분류/업데이트하거나 LLM 할당량을 나눠 쓰지 않도록 한다.
+EXTRACTION_CONCURRENCY_LIMIT = os.getenv("EXTRACTION_CONCURRENCY_LIMIT", "keyword-extraction")
+
+@contextmanager
+def extraction_slot():
+    """
+    EXTRACTION_CONCURRENCY_LIMIT 슬롯을 잡은 동안만 실행 (다른 flow가 잡고 있으면 놓을 때까지 기다린다)
+    Prefect 3는 없는 제한을 무시하므로 처음이면 슬롯 1개로 만든다.
+    """
+    from prefect import get_client
+    from prefect.concurrency.sync import concurrency
+    from prefect.exceptions import ObjectNotFound
+    from prefect.client.schemas.actions import GlobalConcurrencyLimitCreate
+
+    with get_client(sync_client=True) as client:
+        try:
+            client.read_global_concurrency_limit_by_name(EXTRACTION_CONCURRENCY_LIMIT)
+        except ObjectNotFound:
+            client.create_global_concurrency_limit(GlobalConcurrencyLimitCreate(name=EXTRACTION_CONCURRENCY_LIMIT, limit=1))
+    with concurrency(EXTRACTION_CONCURRENCY_LIMIT, occupy=1):
+        yield
+
+def filter_unanalyzed(post_ids: list[str]) -> list[str]:
     """
-    db에서 분석되지 않은 데이터를 로드하는 함수
+    post_ids 중 is_analyzed == False 인 id만 반환 (UNANALYZED_QUERY_CHUNK 개씩 조회)
     """
-    from services.service_db import DbSession
+    from services.service_db import session_scope
     from models.db_models import ExternalPost
-    db = DbSession()
-    existing_urls = db.query(ExternalPost.id).filter(ExternalPost.is_analyzed == False).all()
-    existing_urls = [url[0] for url in existing_urls]
-    return existing_urls
+
+    unanalyzed = []
+    with session_scope() as db:
+        for start in range(0, len(post_ids), UNANALYZED_QUERY_CHUNK):
+            chunk = post_ids[start:start + UNANALYZED_QUERY_CHUNK]
+            rows = db.query(ExternalPost.id).filter(ExternalPost.id.in_(chunk), ExternalPost.is_analyzed == False).all()
+            unanalyzed.extend(row[0] for row in rows)
+    return unanalyzed
 
 @task(name="load_data_from_s3")
-def load_data_from_s3(obj_key: str, target_ids: list[str]):
+def load_data_from_s3(obj_key: str):
+    """
+    S3의 Parquet 객체에서 아직 분석되지 않은 기사의 encoded_url, rss_content만 읽어 반환
+    객체의 encoded_url 컬럼만 읽어 그 id 중 미분석인 것만 DB에서 조회하므로, 메모리는 미분석 backlog 전체가 아니라 객체 크기에 비례한다.
+    footer와 필요한 컬럼 청크만 범위 요청으로 읽고, id 필터는 Arrow에서 처리한다. (services.lake)
+    """
+    from services.lake import read_post_ids, read_posts
 
-    import boto3
-    import pandas as pd
-    from io import BytesIO
+    logger = get_run_logger()
+
+    target_ids = filter_unanalyzed(read_post_ids(obj_key))
+    table = read_posts(obj_key, target_ids)
+    logger.info(f"Loaded {table.num_rows} target rows from {obj_key}.")
+    return table.to_pylist()
+
+@task(name="load_data_from_spool")
+def load_data_from_spool(spool_path: str):
+    """
+    수집 flow가 넘겨준 로컬 스풀 파일(Arrow IPC)에서 encoded_url, rss_content만 읽어 반환
+    스풀에는 이번 실행에서 새로 삽입된(분석 전) 기사만 있으므로 DB에서 분석 대상을 다시 조회하지 않는다.
+    """
+    from services.spool import read_spool
 
-    # --- Configuration ---
-    BUCKET_NAME = 'jandi-post-bucket'
-    OBJECT_KEY = obj_key
     logger = get_run_logger()
 
-    s3_client = boto3.client('s3')
-    s3_response_object = s3_client.get_object(Bucket=BUCKET_NAME, Key=OBJECT_KEY)
-    df_bytes = s3_response_object['Body'].read()
-    df = pd.read_parquet(BytesIO(df_bytes))
-    logger.info(f"Loaded DataFrame from S3 with columns: {df.columns.tolist()} and {len(df)} rows.")
-    res = df[["encoded_url", "rss_content"]].to_dict(orient='records')
-    res = [item for item in res if item['encoded_url'] in target_ids]
-    return res
+    table = read_spool(spool_path, columns=["encoded_url", "rss_content"])
+    logger.info(f"Loaded {table.num_rows} rows from spool {spool_path}.")
+    return table.to_pylist()
+
+def _is_final_attempt() -> bool:
+    """
+    현재 태스크 실행이 마지막 재시도인지 (이번에도 실패하면 더 재시도하지 않는다)
+    """
+    from prefect.context import TaskRunContext
+
+    context = TaskRunContext.get()
+    return context is None or context.task_run.run_count > context.task.retries
 
 @task(name="extract_keywords", retries=5, retry_delay_seconds=[2, 4, 8, 16, 32])
 def extract_keywords(s3_data:dict):
+    """
+    기사 한 개를 개별 요청으로 분류 (캐시/유사 중복/로컬 사전 필터는 plugins.extractor.classification_run)
+    마지막 재시도에서도 실패하면 키워드 사전의 키워드를 찾은 경우에만 로컬 결과로 대신한다.
+    """
     logger = get_run_logger()
 
-    from plugins.preprocessor.raw_text_preprocessor import process_text
-    from plugins.extractor.keyword_extractor import generate
-    import json
-
-    result = generate(process_text(s3_data['rss_content']))
+    from plugins.extractor.keyword_extractor import generate, ArticleClassification
+    from plugins.extractor.classification_run import ClassificationRun
 
-    logger.info(f"Extracted keywords for {len(result)} articles.")
-    result = json.loads(result) | {'id': s3_data['encoded_url']}
+    run = ClassificationRun([s3_data], logger)
+    try:
+        run.store({post_id: ArticleClassification.model_validate_json(generate(text)) for post_id, text in run.misses.items()})
+    except Exception as e:
+        if not (run.can_fall_back and _is_final_attempt()) or run.fall_back(run.pending(), e) == 0:
+            raise
+    result = run.results()[0]
     logger.info(result)
     return result
 
+@task(name="extract_keywords_batch", retries=5, retry_delay_seconds=[2, 4, 8, 16, 32])
+def extract_keywords_batch(s3_batch: list[dict]):
+    """
+    여러 기사를 한 번의 LLM 요청으로 분류
+    배치 응답에서 끝까지 검증에 실패한 기사만 개별 요청으로 다시 처리한다.
+    429/할당량 소진이면 개별 요청으로 쪼개지 않고 예외를 올려 태스크 재시도(retry_delay_seconds)로 물러난다.
+    마지막 재시도에서도 실패하면 키워드 사전의 키워드를 찾은 기사만 로컬 결과로 대신하고, 나머지는 다음 실행으로 넘긴다.
+    """
+    logger = get_run_logger()
+
+    from plugins.extractor.keyword_extractor import ArticleClassification, generate, generate_batch
+    from plugins.extractor.classification_run import ClassificationRun
+
+    run = ClassificationRun(s3_batch, logger)
+    try:
+        if run.misses:
+            run.store(generate_batch(run.misses))
+            for post_id, text in run.pending().items():
+                logger.warning(f"배치 분류 실패, 개별 요청으로 재시도: {post_id}")
+                run.store({post_id: ArticleClassification.model_validate_json(generate(text))})
+    except Exception as e:
+        if not (run.can_fall_back and _is_final_attempt()):
+            raise
+        run.fall_back(run.pending(), e)
+
+    results = run.results()
+    logger.info(f"Extracted keywords for {len(results)} articles in one batch.")
+    return results
+
+async def classify_articles_async(llm_client, s3_data: list[dict], batch_size: int, logger, use_prefilter: bool = True) -> list[dict]:
+    """
+    기사들을 캐시 조회 후 batch_size 개씩 묶어 공유 비동기 LLM 클라이언트로 분류
+    extract_keywords_concurrently와 스트리밍 파이프라인이 함께 사용한다.
+    use_prefilter=False면 USE_LOCAL_EXTRACTOR와 관계없이 로컬 사전 필터를 쓰지 않는다. (로컬 결과를 LLM으로 다시 분석할 때)
+    """
+    import asyncio
+    from plugins.extractor.keyword_extractor import ArticleClassification, build_contents, generate_batch_async, is_rate_limited
+    from plugins.extractor.classification_run import ClassificationRun
+
+    run = ClassificationRun(s3_data, logger, use_prefilter=use_prefilter)
+
+    async def _classify(batch: dict[str, list[str]]) -> None:
+        try:
+            run.store(await generate_batch_async(llm_client, batch))
+        except Exception as e:
+            if not is_rate_limited(e):
+                raise
+            # 클라이언트가 재시도한 뒤에도 할당량이 없으면 개별 요청으로 쪼개지 않는다.
+            run.fall_back(batch, e)
+            return
+        # 배치에서 끝까지 검증에 실패한 기사만 개별 요청
+        for post_id in [post_id for post_id in batch if post_id not in run.classified]:
+            try:
+                response = await llm_client.generate_json(build_contents(batch[post_id]), ArticleClassification.model_json_schema())
+                run.store({post_id: ArticleClassification.model_validate_json(response)})
+            except Exception as e:
+                run.fall_back([post_id], e)
+
+    await asyncio.gather(*[_classify(batch) for batch in run.batches(batch_size)])
+    return run.results()
+
+@task(name="extract_keywords_concurrently")
+def extract_keywords_concurrently(s3_data: list[dict], batch_size: int, use_prefilter: bool = True):
+    """
+    공유 비동기 LLM 클라이언트 하나로 모든 기사를 분류
+    RPM/TPM 할당량과 429 응답에 맞춰 동시 요청 수를 스스로 조절한다. (plugins.extractor.llm_client)
+    """
+    logger = get_run_logger()
+
+    import asyncio
+    from plugins.extractor.llm_client import AsyncLLMClient
+
+    async def _run():
+        llm_client = AsyncLLMClient()
+        results = await classify_articles_async(llm_client, s3_data, batch_size, logger, use_prefilter)
+        logger.info(f"LLM 요청 완료: 429 응답 {llm_client.throttled} 회, 최종 동시 요청 한도 {llm_client.concurrency.limit:.1f}")
+        return results
+
+    return asyncio.run(_run())
+
+@task(name="evict_classification_cache")
+def evict_classification_cache():
+    """
+    오래되었거나 용량을 넘는 LLM 분류 캐시 항목과 유사 중복 인덱스 항목을 정리
+    """
+    from plugins.extractor.classification_cache import ClassificationCache
+    from plugins.extractor.dedup_index import NearDuplicateIndex
+
+    logger = get_run_logger()
+    try:
+        evicted = ClassificationCache().evict()
+        logger.info(f"분류 캐시 정리: {evicted} 개의 항목 삭제")
+    except Exception as e:
+        logger.warning(f"분류 캐시 정리 실패: {e}")
+    try:
+        evicted = NearDuplicateIndex().evict()
+        logger.info(f"유사 중복 인덱스 정리: {evicted} 개의 항목 삭제")
+    except Exception as e:
+        logger.warning(f"유사 중복 인덱스 정리 실패: {e}")
+
 @task(name="upload_results_to_db")
 def upload_results_to_db(results):
-    from services.service_db import DbSession
-    from models.db_models import ExternalPost, Keyword, PostKeywordMapping
+    """
+    분류 결과를 EXTERNAL_POSTS, KEYWORDS, EXTERNAL_POSTS_KEYWORDS에 반영
+    키워드는 대표 표기로 바꾼 뒤(plugins.extractor.keyword_canonicalizer) 저장하고, 키워드 id는
+    INSERT ... RETURNING과 프로세스 캐시로, 포스트 업데이트와 매핑은
+    임시 테이블 COPY + 한 번의 set 기반 쿼리로 처리한다. (services.bulk_load)
+
+    Returns:
+        실제로 변경된 테이블 이름 집합 (refresh_materialized_views에 넘긴다)
+    """
+    from services.service_db import session_scope
+    from services.bulk_load import resolve_keyword_ids, remember_keyword_ids, forget_keyword_ids, update_analyzed_posts, insert_post_keywords
     from plugins.extractor.keyword_extractor import category_to_field
-    from sqlalchemy.dialects.postgresql import insert
-    from sqlalchemy import text
+    from plugins.extractor.keyword_canonicalizer import get_canonicalizer
+    from plugins.extractor.local_extractor import ANALYZED_BY_LLM, ANALYZED_BY_LOCAL
 
-    db = DbSession()
     logger = get_run_logger()
 
-    keywords = [result['keywords'] for result in results if 'keywords' in result]
-    keywords = list(set(sum(keywords, [])))
-    keyword_to_id = {}
+    keywords = {kw for result in results for kw in result.get('keywords', [])}
 
     try:
+        with session_scope() as db:
+            cursor = db.connection().connection.cursor()
 
-        # 키워드 테이블에 키워드 삽입
-        keyword_data = [{'keyword': kw} for kw in keywords]
-        stmt = insert(Keyword).values(keyword_data)
-        stmt = stmt.on_conflict_do_nothing(index_elements=['keyword'])
-        db.execute(stmt)
-        db.commit()
-        logger.info(f"PostgreSQL 키워드 삽입 성공: {len(keyword_data)} 개의 키워드 삽입 시도")
-
-        # 키워드-id 매핑
-        existing_keywords = db.query(Keyword).filter(Keyword.keyword.in_(keywords)).all()
-        for kw in existing_keywords:
-            keyword_to_id[kw.keyword] = kw.id
-        print(keyword_to_id)
-
-        # field-id 매핑
-        field_to_id = {}
-        existing_fields = db.query(Fields).all()
-        for field in existing_fields:
-            field_to_id[field.field_name.strip()] = field.field_id
-        print(field_to_id)
-
-        # is_analyzed, category 업데이트
-        data_to_update = []
-        for result in results:
-            if 'category' in result:
-                data_to_update.append({
-                    'id': result['id'],
-                    'category': result['category'],
-                    'is_analyzed': True,
-                    'summary': result.get('summary', None),
-                    'field_id': field_to_id.get(category_to_field.get(result['category']), None),
-                })
-        db.bulk_update_mappings(ExternalPost, data_to_update) # type: ignore
-        logger.info(f"PostgreSQL 포스트 업데이트 성공: {len(data_to_update)} 개의 포스트 업데이트 시도")
-
-        # Post-Keyword 매핑 삽입
-        post_keyword_mappings = []
-        for result in results:
-            if 'keywords' in result:
-                for kw in result['keywords']:
-                    if kw in keyword_to_id:
-                        post_keyword_mappings.append({
-                            'post_id': result['id'],
-                            'keyword_id': keyword_to_id[kw],
-                        })
-        stmt = insert(PostKeywordMapping).values(post_keyword_mappings)
-        stmt = stmt.on_conflict_do_nothing()
-        db.execute(stmt)
-
-        try: 
-            db.execute(text('REFRESH MATERIALIZED VIEW "TRENDING_KEYWORDS_VIEW"'))  # Simple query to test connection
-            db.execute(text('REFRESH MATERIALIZED VIEW "ARTICLES_MENTIONING_KEYWORDS_VIEW"'))
-            db.execute(text('REFRESH MATERIALIZED VIEW "USERS_MENTIONING_KEYWORDS_VIEW"'))
-        except Exception as e:
-            logger.error(f"Failed to refresh materialized views: {e}")
-            
-        db.commit()
+            # 대표 표기로 정규화 (k8s, 쿠버네티스 -> Kubernetes / 대소문자, 공백 차이 통일)
+            canonicalizer = get_canonicalizer(cursor)
+            canonical = {kw: name for kw in keywords if (name := canonicalizer.canonicalize(kw))}
+
+            # 키워드 삽입 + 키워드-id 매핑
+            keyword_to_id = resolve_keyword_ids(cursor, set(canonical.values()))
+            logger.info(f"PostgreSQL 키워드 id 확인: {len(keywords)} 개의 키워드 -> 대표 키워드 {len(keyword_to_id)} 개")
+
+            # field-id 매핑
+            field_to_id = {field.field_name.strip(): field.field_id for field in db.query(Fields).all()}
+
+            # is_analyzed, category, 분석 주체(LLM/로컬) 업데이트
+            data_to_update = {
+                result['id']: (result['id'], result['category'], result.get('summary', None),
+                               field_to_id.get(category_to_field.get(result['category']), None),
+                               result.get('analyzed_by', ANALYZED_BY_LLM))
+                for result in results if 'category' in result
+            }
+            # 로컬 모델이 대신 분석했던 포스트(backlog 재분석)는 이전 키워드 매핑을 새 결과로 바꾼다.
+            updated = update_analyzed_posts(cursor, data_to_update.values(), replace_keywords_of=ANALYZED_BY_LOCAL)
+            logger.info(f"PostgreSQL 포스트 업데이트 성공: {updated}/{len(data_to_update)} 개의 포스트 업데이트")
+
+            # Post-Keyword 매핑 삽입
+            post_keyword_mappings = (
+                (keyword_to_id[canonical[kw]], result['id'])
+                for result in results for kw in result.get('keywords', []) if kw in canonical
+            )
+            inserted, counted = insert_post_keywords(cursor, post_keyword_mappings)
+            logger.info(f"PostgreSQL 키워드 매핑 삽입 성공: {inserted} 개의 매핑 삽입, 일별 집계 {counted} 행 갱신")
     except Exception as e:
         logger.error(f"PostgreSQL 키워드 삽입 실패: {e}")
-        db.rollback()
+        # 캐시된 id가 더 이상 없는 키워드일 수도 있으므로 다음 시도에서는 DB에서 다시 확인
+        forget_keyword_ids()
         raise
-    
+    # 커밋이 끝난 뒤에만 캐시에 넣는다
+    remember_keyword_ids(keyword_to_id)
+
+    changed_tables = set()
+    if updated:
+        changed_tables |= {"EXTERNAL_POSTS", "KEYWORD_DAILY_COUNTS"}
+    if inserted:
+        changed_tables |= {"KEYWORDS", "EXTERNAL_POSTS_KEYWORDS", "KEYWORD_DAILY_COUNTS"}
+    return changed_tables
+
+
+def _view_dependencies(conn, views: list[str]) -> dict[str, set[str]]:
+    """
+    materialized view별로 정의에서 참조하는 테이블/view 이름 (pg_depend)
+    """
+    from sqlalchemy import text
+
+    rows = conn.execute(text('''
+        SELECT DISTINCT v.relname, t.relname
+        FROM pg_depend AS d
+        JOIN pg_rewrite AS r ON r.oid = d.objid
+        JOIN pg_class AS v ON v.oid = r.ev_class
+        JOIN pg_class AS t ON t.oid = d.refobjid
+        WHERE d.classid = 'pg_rewrite'::regclass AND v.relkind = 'm' AND t.oid <> v.oid AND v.relname = ANY(:views)
+    '''), {'views': views}).all()
+    dependencies: dict[str, set[str]] = {view: set() for view in views}
+    for view, table in rows:
+        dependencies[view].add(table)
+    return dependencies
+
+@task(name="refresh_materialized_views")
+def refresh_materialized_views(changed_tables: set[str] | None = None, views: list[str] = MATERIALIZED_VIEWS):
+    """
+    아직 집계 테이블로 옮기지 않은 materialized view를 쓰기 트랜잭션 밖에서 갱신
+    CONCURRENTLY로 갱신해 조회를 막지 않고, unique index가 없는 view만 일반 REFRESH로 대신한다.
+
+    changed_tables가 주어지면 정의가 그 테이블(또는 이번에 갱신한 다른 view)을 참조하는 view만 갱신한다.
+    None이면 전부 갱신한다.
+    """
+    from services.service_db import engine
+    from sqlalchemy import text
+
+    logger = get_run_logger()
+    if changed_tables is not None and not changed_tables:
+        logger.info("변경된 테이블이 없어 materialized view 갱신을 건너뜁니다.")
+        return
+    # REFRESH ... CONCURRENTLY는 트랜잭션 블록 안에서 실행할 수 없다.
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        dependencies = None
+        if changed_tables is not None:
+            try:
+                dependencies = _view_dependencies(conn, views)
+                changed_tables = set(changed_tables)
+            except Exception as e:
+                logger.warning(f"view 의존 테이블을 확인하지 못해 전부 갱신합니다: {e}")
+        # 전체 갱신은 기본 statement_timeout보다 오래 걸릴 수 있다. (풀에 돌려주기 전에 RESET)
+        conn.execute(text("SET statement_timeout = 0"))
+        for view in views:
+            if dependencies is not None and not dependencies[view] & changed_tables:  # type: ignore
+                logger.info(f"입력 테이블이 바뀌지 않아 건너뜁니다: {view}")
+                continue
+            try:
+                conn.execute(text(f'REFRESH MATERIALIZED VIEW CONCURRENTLY "{view}"'))
+            except Exception as e:
+                logger.warning(f"CONCURRENTLY 갱신 실패, 일반 REFRESH로 다시 시도합니다: {view} ({e})")
+                try:
+                    conn.execute(text(f'REFRESH MATERIALIZED VIEW "{view}"'))
+                except Exception as e:
+                    logger.error(f"Failed to refresh materialized view {view}: {e}")
+                    continue
+            if dependencies is not None:
+                # 이 view를 참조하는 다른 view도 갱신 대상이 된다.
+                changed_tables.add(view)  # type: ignore
+            logger.info(f"Materialized view 갱신 완료: {view}")
+        conn.execute(text("RESET statement_timeout"))
+
+@task(name="update_trend_counters")
+def update_trend_counters():
+    """
+    KEYWORD_DAILY_COUNTS의 최근 기간을 로컬 트렌드 카운터(NumPy 링 버퍼)에 반영하고 저장
+    트렌드 조회는 이 파일만 메모리 맵으로 읽어 OLTP 테이블을 건드리지 않는다. (plugins.trend)
+    """
+    from services.service_db import session_scope
+    from plugins.trend.trend_counter import TrendCounter
+
+    logger = get_run_logger()
+    counter = TrendCounter.load()
+    try:
+        with session_scope() as db:
+            synced = counter.sync_from_db(db)
+        counter.save()
+        logger.info(f"트렌드 카운터 갱신: {synced} 개의 일별 집계 반영")
+    except Exception as e:
+        logger.warning(f"트렌드 카운터 갱신 실패: {e}")
 
 @task(name="backup_results_to_s3")
 def backup_results_to_s3(results):
     """
-    수집된 데이터를 Parquet 형식으로 S3에 저장
+    키워드 추출 결과를 blog-data/keywords/dt=날짜/ 아래 Parquet 파일 하나로 S3에 저장 (수집 원본과 prefix 분리)
     """
 
-    import boto3
-    import io
     import pendulum
-    import os
-    import pandas as pd
-    s3_client = boto3.client('s3')
+    import pyarrow as pa
+    from services.lake import KEYWORDS_PREFIX, write_dataset
 
-    results = [{"keyword": keyword, "post_id": result['id'], "category": result.get('category', None)} for result in results for keyword in result.get('keywords', [])]
-    
-    df = pd.DataFrame(results)
-    # 2. 메모리 버퍼에 Parquet 쓰기
-    buffer = io.BytesIO()
-    df.to_parquet(buffer, index=False, engine='pyarrow', compression='snappy')
-    buffer.seek(0)
+    rows = [(keyword, result['id'], result.get('category', None)) for result in results for keyword in result.get('keywords', [])]
+    keywords, post_ids, categories = map(list, zip(*rows)) if rows else ([], [], [])
+    table = pa.table({
+        'keyword': pa.array(keywords, type=pa.string()),
+        'post_id': pa.array(post_ids, type=pa.string()),
+        'category': pa.array(categories, type=pa.string()),
+    })
 
     now = pendulum.now('Asia/Seoul')
     partition_date = now.to_date_string()        # 2025-02-05
     timestamp = now.format('HHmmss')             # 203015 (시분초)
 
-    object_key = f"blog-data/raw/dt={partition_date}/{timestamp}.parquet"
-    bucket_name = os.getenv('S3_BUCKET_NAME')
     try:
-        s3_client.upload_fileobj(buffer, bucket_name, object_key)
+        object_key = write_dataset(KEYWORDS_PREFIX, table, partition_date, f"run_{timestamp}")
         logger = get_run_logger()
-        logger.info(f"S3 업로드 성공: s3://{bucket_name}/{object_key}")
+        logger.info(f"S3 업로드 성공: {object_key}")
         return object_key
     except Exception as e:
         logger = get_run_logger()
@@ -170,29 +404,48 @@ def backup_results_to_s3(results):
         raise
 
 
-@flow(name="Extract keywords flow", on_completion=[upload_logs_to_s3_and_notify], on_failure=[upload_logs_to_s3_and_notify], task_runner=ThreadPoolTaskRunner(max_workers=4), log_prints=True) # type: ignore
-def extract_keywords_flow(collected_obj_keys: list[str]):
+@flow(name="Extract keywords flow", on_completion=[upload_logs_to_s3_and_notify], on_failure=[upload_logs_to_s3_and_notify], task_runner=ThreadPoolTaskRunner(max_workers=TASK_RUNNER_WORKERS), log_prints=True) # type: ignore
+def extract_keywords_flow(collected_obj_keys: list[str], batch_size: int = EXTRACT_BATCH_SIZE, use_async_client: bool = USE_ASYNC_LLM_CLIENT, spool_path: str | None = None):
+    """
+    collected_obj_keys: 수집 flow가 S3에 저장한 object key 리스트
+    spool_path: handoff 모드에서 수집 flow가 넘겨준 로컬 스풀 파일. 주어지면 S3와 DB 조회 없이 이 파일만 읽는다.
+    """
     logger = get_run_logger()
 
     logger.info("Starting keyword extraction process...")
-    if len(collected_obj_keys) == 0:
+    if len(collected_obj_keys) == 0 and spool_path is None:
         logger.warning("No collected object keys provided for keyword extraction.")
         return
     
-    unanalized_data_ids = load_unanalized_data()
-    s3_data_futures = load_data_from_s3.map(collected_obj_keys, target_ids = unmapped(unanalized_data_ids))
-    s3_data = [f.result() for f in s3_data_futures]
-    s3_data = sum(s3_data, [])
+    evict_classification_cache()
+    if spool_path is not None:
+        s3_data = load_data_from_spool(spool_path)
+    else:
+        s3_data_futures = load_data_from_s3.map(collected_obj_keys)
+        s3_data = [f.result() for f in s3_data_futures]
+        s3_data = sum(s3_data, [])
     logger.info(f"Loaded data from {len(s3_data)} S3 objects.")
     if len(s3_data) == 0:
         logger.warning("No unanalized data found in the loaded S3 objects.")
         return
 
-    results = extract_keywords.map(s3_data)
-    results = [r.result() for r in results]
+    if use_async_client:
+        # 공유 비동기 클라이언트로 할당량 한도까지 동시에 요청
+        results = extract_keywords_concurrently(s3_data, batch_size)
+    elif batch_size > 1:
+        # 기사 batch_size 개를 한 번의 요청으로 분류
+        batches = [s3_data[i:i + batch_size] for i in range(0, len(s3_data), batch_size)]
+        results = extract_keywords_batch.map(batches)
+        results = [item for r in results for item in r.result()]
+    else:
+        results = extract_keywords.map(s3_data)
+        results = [r.result() for r in results]
     
     logger.info(f"Extracted keywords results: {len(results)} items.")
 
-    upload_results_to_db(results)
+    changed_tables = upload_results_to_db(results)
+    refresh_materialized_views(changed_tables)
+    update_trend_counters()
     backup_results_to_s3(results)
+    logger.info(f"DB 커넥션 풀 사용량: {pool_metrics.snapshot()}")
     logger.info("Keyword extraction process completed.")
\ No newline at end of file
@@ -1,22 +1,66 @@
-from flows.collect_platform_data import data_collection_flow
-from flows.extract_keywords import extract_keywords_flow
+from flows.collect_platform_data import data_collection_flow, archive_spool_to_s3
+from flows.extract_keywords import extract_keywords_flow, extraction_slot
+from flows.streaming_pipeline import streaming_pipeline_flow
+import os
 import logging
 
 from plugins.hooks.log_and_notify import upload_logs_to_s3_and_notify
 from prefect import flow
 
+# 수집 결과를 S3를 거치지 않고 로컬 스풀 파일로 추출 flow에 넘길지 여부
+# S3에는 추출과 동시에 보관용으로만 저장한다. (기본값 false: 기존처럼 S3를 거쳐 넘긴다)
+PIPELINE_HANDOFF = os.getenv("PIPELINE_HANDOFF", "false").lower() == "true"
+# 플랫폼별 수집이 끝나는 대로 추출을 시작하는 스트리밍 모드 (flows.streaming_pipeline)
+PIPELINE_STREAMING = os.getenv("PIPELINE_STREAMING", "false").lower() == "true"
 
 
     
 @flow(on_completion=[upload_logs_to_s3_and_notify], on_failure=[upload_logs_to_s3_and_notify], name="trend_keyword_extraction_pipeline") # type: ignore
-def trend_keyword_extraction_pipeline():
+def trend_keyword_extraction_pipeline(handoff: bool = PIPELINE_HANDOFF, streaming: bool = PIPELINE_STREAMING):
+    """
+    backlog_analysis_flow와 같은 추출 슬롯(extraction_slot)을 잡고 실행해 두 flow가 겹치지 않게 한다.
+    """
+    with extraction_slot():
+        _run_pipeline(handoff, streaming)
+
+
+def _run_pipeline(handoff: bool, streaming: bool):
     logging.info("Starting RSS Insight Pipeline to collect platform data...")
-    collected_obj_keys = data_collection_flow()
-    logging.info(f"Collected S3 URLs: {collected_obj_keys}")
-    extract_keywords_flow(collected_obj_keys)
-    logging.info("Starting keyword extraction process...")
+    if streaming:
+        collected_obj_keys = streaming_pipeline_flow()
+        logging.info(f"Archived S3 URLs: {collected_obj_keys}")
+        return
+
+    if not handoff:
+        collected_obj_keys = data_collection_flow()
+        logging.info(f"Collected S3 URLs: {collected_obj_keys}")
+        extract_keywords_flow(collected_obj_keys)
+        logging.info("Starting keyword extraction process...")
+        return
+
+    from services.spool import remove_spool
+
+    spool_path = data_collection_flow(handoff=True)
+    if spool_path is None:
+        logging.info("No new articles collected.")
+        return
+    # S3 보관은 추출과 동시에 진행
+    archive_future = archive_spool_to_s3.submit(spool_path)
+    try:
+        extract_keywords_flow([], spool_path=spool_path)
+    finally:
+        # 추출이 실패해도 DB에 들어간 기사는 레이크에 남아야 하므로 보관은 끝까지 기다린다.
+        # 스풀은 보관에 성공한 뒤에만 지운다. (실패하면 archive_spool_to_s3로 다시 보관할 수 있도록 남겨 둔다)
+        archive_future.wait()
+        if archive_future.state.is_completed():
+            logging.info(f"Archived S3 URL: {archive_future.result()}")
+            remove_spool(spool_path)
+        else:
+            logging.error(f"S3 보관 실패, 스풀 파일을 남겨 둡니다: {spool_path}")
+    # 추출은 성공했지만 보관이 실패한 경우 flow를 실패로 끝낸다.
+    archive_future.result()
 
 if __name__ == "__main__":
     import dotenv
     dotenv.load_dotenv("/Users/jeongdaegyun/airflow_dc/.env")
-    trend_keyword_extraction_pipeline()
\ No newline at end of file
+    trend_keyword_extraction_pipeline()
@@ -0,0 +1,94 @@
+import os
+from prefect import flow, get_run_logger, unmapped
+from prefect.futures import as_completed
+from prefect.task_runners import ThreadPoolTaskRunner
+
+from flows.collect_platform_data import (
+    load_config, fetch_platform_feeds, load_url_index, collect_platform_data,
+    insert_to_postgres, save_to_s3, save_url_index, save_feed_cache,
+)
+from flows.extract_keywords import (
+    EXTRACT_BATCH_SIZE, classify_articles_async, evict_classification_cache,
+    upload_results_to_db, refresh_materialized_views, update_trend_counters, backup_results_to_s3,
+)
+from plugins.hooks.log_and_notify import upload_logs_to_s3_and_notify
+from services.service_db import TASK_RUNNER_WORKERS
+
+# 수집과 추출 사이 큐에 쌓아 둘 수 있는 기사 묶음 수
+STREAM_QUEUE_SIZE = int(os.getenv("STREAM_QUEUE_SIZE", "8"))
+
+
+@flow(task_runner=ThreadPoolTaskRunner(max_workers=TASK_RUNNER_WORKERS), on_completion=[upload_logs_to_s3_and_notify], on_failure=[upload_logs_to_s3_and_notify], name="Streaming collection and extraction flow", log_prints=True) # type: ignore
+def streaming_pipeline_flow(batch_size: int = EXTRACT_BATCH_SIZE, queue_size: int = STREAM_QUEUE_SIZE):
+    """
+    플랫폼별 수집이 끝나는 대로 신규 기사를 DB에 넣고 곧바로 추출 큐에 넘긴다. (S3 보관은 마지막에 한 번, 추출이 실패해도 보관한 뒤 오류를 올린다)
+    가장 느린 피드를 기다리지 않고 LLM 분류가 수집과 동시에 진행된다.
+    """
+    from plugins.extractor.stream import ExtractionStream
+
+    logger = get_run_logger()
+    configs = load_config()
+    configs = fetch_platform_feeds(configs)
+    url_index = load_url_index()
+    evict_classification_cache()
+
+    async def _classify(llm_client, items):
+        return await classify_articles_async(llm_client, items, batch_size, logger)
+
+    stream = ExtractionStream(_classify, maxsize=queue_size).start()
+    collected_futures = collect_platform_data.map(configs, url_index=unmapped(url_index))
+    config_by_run = {future.task_run_id: config for future, config in zip(collected_futures, configs)}
+
+    collected_results = []
+    processed_configs = []
+    errors: list[BaseException] = []
+    try:
+        for future in as_completed(list(collected_futures)):
+            res = future.result()
+            config = config_by_run[future.task_run_id]
+            if res is not None:
+                processed_configs.append(config)
+            if not res or res['num_articles'] == 0:
+                continue
+
+            # 추출 결과가 업데이트할 행이 먼저 있어야 하므로 DB 삽입 후 큐에 넣는다.
+            insert_to_postgres([res])
+            collected_results.append(res)
+            items = res['data'].select(['encoded_url', 'rss_content']).to_pylist()
+            for i in range(0, len(items), batch_size):
+                stream.put(items[i:i + batch_size])
+            logger.info(f"추출 대기열에 추가: {res['platform']} {res['num_articles']} 개의 기사")
+    except BaseException as e:
+        errors.append(e)
+
+    # DB에 들어간 기사는 분류가 실패해도 먼저 레이크와 매니페스트에 보관해야 백로그 flow가 본문을 다시 읽을 수 있다.
+    # 실행 전체를 Parquet 파일 하나로 보관
+    obj_keys = []
+    if collected_results:
+        try:
+            obj_keys = [save_to_s3(collected_results)]
+            save_url_index(url_index, collected_results)
+        except BaseException as e:
+            errors.append(e)
+    results = []
+    try:
+        results = stream.close()
+    except BaseException as e:
+        errors.append(e)
+    if errors:
+        # 먼저 난 오류를 올리고, 뒤따른 오류(예: 같은 원인으로 실패한 stream.close)는 로그로만 남긴다.
+        for e in errors[1:]:
+            logger.error(f"뒤따른 오류: {e!r}")
+        raise errors[0]
+
+    if stream.llm_client is not None:
+        logger.info(f"LLM 요청 완료: 429 응답 {stream.llm_client.throttled} 회, 최종 동시 요청 한도 {stream.llm_client.concurrency.limit:.1f}")
+    logger.info(f"총 수집된 플랫폼 수: {len(collected_results)}, 추출 결과: {len(results)} 개")
+
+    if results:
+        changed_tables = upload_results_to_db(results)
+        refresh_materialized_views(changed_tables)
+        update_trend_counters()
+        backup_results_to_s3(results)
+    save_feed_cache(processed_configs)
+    return obj_keys
@@ -0,0 +1,32 @@
+from prefect import flow, task, get_run_logger
+
+from plugins.hooks.log_and_notify import upload_logs_to_s3_and_notify
+
+
+@task(name="train_local_extractor")
+def train_local_extractor():
+    """
+    LLM이 분석한 포스트로 로컬 키워드 추출/분류 모델을 다시 학습하고 저장
+    추출 flow는 학습하지 않고 저장된 모델만 불러온다. (plugins.extractor.local_extractor.load_local_extractor)
+    """
+    from services.service_db import session_scope
+    from plugins.extractor.local_extractor import train_from_db
+
+    logger = get_run_logger()
+    with session_scope() as db:
+        model = train_from_db(db)
+    model.save()
+    logger.info(f"로컬 추출 모델 학습 완료: 카테고리 {len(model.classes)} 개, 키워드 사전 {len(model.keywords)} 개, 확신도 기준 {model.threshold}")
+    return model.threshold
+
+
+@flow(name="Local extractor training flow", on_completion=[upload_logs_to_s3_and_notify], on_failure=[upload_logs_to_s3_and_notify], log_prints=True) # type: ignore
+def local_extractor_training_flow():
+    """
+    레이크에서 최대 LOCAL_TRAIN_MAX_POSTS 개의 본문을 읽으므로 추출 flow와 따로 스케줄한다.
+    """
+    return train_local_extractor()
+
+
+if __name__ == "__main__":
+    local_extractor_training_flow()
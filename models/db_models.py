@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Text, Integer, DateTime, Boolean, ForeignKey
+from sqlalchemy import Column, String, Text, Integer, Date, DateTime, Boolean, ForeignKey
 from services.service_db import Base
 from sqlalchemy.sql import func
 
@@ -24,6 +24,8 @@ class ExternalPost(Base):
     # 분석 상태 및 결과
     is_analyzed = Column(Boolean, default=False, index=True)
     summary = Column(Text, nullable=True)
+    # 분석 주체 ("llm" | "local"). 로컬 모델 학습/보정에는 LLM이 분석한 포스트만 쓴다. (NULL은 도입 전 LLM 분석)
+    analyzed_by = Column(String(10), nullable=True)
     field_id = Column(Integer, ForeignKey('FIELDS.field_id',ondelete='CASCADE', onupdate='CASCADE'), nullable=True, index=True)
 class PostKeywordMapping(Base):
     __tablename__ = 'EXTERNAL_POSTS_KEYWORDS'
@@ -33,4 +35,12 @@ class PostKeywordMapping(Base):
 class Fields(Base):
     __tablename__ = 'FIELDS'
     field_id = Column(Integer, primary_key=True, autoincrement=True, default=1)
-    field_name = Column(String(50), unique=True, nullable=False)
\ No newline at end of file
+    field_name = Column(String(50), unique=True, nullable=False)
+
+class KeywordDailyCount(Base):
+    # 키워드 x 게시일 x 분야별 포스트 수 (새로 삽입된 EXTERNAL_POSTS_KEYWORDS 매핑만큼 증분 갱신)
+    __tablename__ = 'KEYWORD_DAILY_COUNTS'
+    keyword_id = Column(Integer, ForeignKey('KEYWORDS.id', ondelete='CASCADE', onupdate='CASCADE'), primary_key=True)
+    day = Column(Date, primary_key=True)                      # 게시일 (Asia/Seoul)
+    field_id = Column(Integer, primary_key=True, default=0)   # 0: 분야 없음
+    post_count = Column(Integer, nullable=False, default=0)
@@ -1,3 +1,13 @@
+import logging
+from datetime import datetime, timezone
+from typing import Optional
+
+import pyarrow as pa
+import pyarrow.compute as pc
+
+logger = logging.getLogger(__name__)
+
+
 class ArticleSchema:
     '''
     rss로 추출한 한 개의 post를 나타냅니다.
@@ -10,6 +20,8 @@ class ArticleSchema:
     created_at: 글이 크롤링된 날짜 (ISO 8601 형식)
     encoded_url: 글 URL의 MD5 해시값 (자료 중복 저장 방지)
     '''
+    __slots__ = ('source', 'title', 'url', 'rss_content', 'content', 'published_at', 'created_at', 'encoded_url')
+
     source: str
     title: str
     url: str
@@ -20,4 +32,109 @@ class ArticleSchema:
     encoded_url:str
     def __init__(self, **kwargs):
         for key, value in kwargs.items():
-            setattr(self, key, value)
\ No newline at end of file
+            setattr(self, key, value)
+
+    def to_dict(self) -> dict:
+        return {field: getattr(self, field) for field in self.__slots__}
+
+
+TIMESTAMP_TYPE = pa.timestamp('us', tz='UTC')
+# 문자열 날짜 컬럼을 한 번에 파싱해 함께 저장하는 타입 있는 컬럼 (EXTERNAL_POSTS의 published_at, collected_at으로 바로 COPY)
+TIMESTAMP_COLUMNS = {'published_ts': 'published_at', 'collected_ts': 'created_at'}
+ARTICLE_ARROW_SCHEMA = pa.schema([(field, pa.string()) for field in ArticleSchema.__slots__]
+                                 + [(field, TIMESTAMP_TYPE) for field in TIMESTAMP_COLUMNS])
+
+# RSS(RFC 822)와 ISO 8601 날짜 형식. 오프셋이 없는 형식은 UTC로 본다.
+DATE_FORMATS = [
+    "%a, %d %b %Y %H:%M:%S %z",
+    "%a, %d %b %Y %H:%M:%S GMT",
+    "%d %b %Y %H:%M:%S %z",
+    "%Y-%m-%dT%H:%M:%S%z",
+    "%Y-%m-%dT%H:%M:%S",
+    "%Y-%m-%d %H:%M:%S",
+]
+
+
+def _parse_date(value: str) -> Optional[datetime]:
+    """
+    컬럼 단위 형식에 맞지 않은 날짜 문자열 하나를 파싱 (요일/월 이름이 다른 표기, 소수점 초 등). 실패하면 None
+    """
+    import pendulum
+    from email.utils import parsedate_to_datetime
+
+    try:
+        return pendulum.instance(parsedate_to_datetime(value)).in_timezone('UTC')
+    except Exception:
+        pass
+    try:
+        return pendulum.parse(value).in_timezone('UTC')  # type: ignore
+    except Exception:
+        return None
+
+
+def parse_timestamps(values: pa.Array) -> pa.Array:
+    """
+    날짜 문자열 컬럼을 UTC timestamp 컬럼으로 변환
+
+    컬럼 전체 ISO 캐스트, DATE_FORMATS 순서의 strptime을 컬럼 단위로 적용하고,
+    남은 값만 한 행씩 파싱한다. 비어 있거나 끝내 파싱하지 못한 값은 현재 시각으로 채운다.
+    """
+    if isinstance(values, pa.ChunkedArray):
+        values = values.combine_chunks()
+    try:
+        # 수집 시각(datetime.isoformat)처럼 한 가지 ISO 형식인 컬럼은 캐스트 한 번으로 끝난다.
+        return pc.fill_null(values.cast(pa.timestamp('us')).cast(TIMESTAMP_TYPE), pa.scalar(datetime.now(timezone.utc), TIMESTAMP_TYPE))
+    except (pa.ArrowInvalid, pa.ArrowNotImplementedError):
+        pass
+
+    parsed = pa.nulls(len(values), TIMESTAMP_TYPE)
+    for date_format in DATE_FORMATS:
+        if parsed.null_count == 0:
+            break
+        candidate = pc.strptime(values, format=date_format, unit='us', error_is_null=True)
+        parsed = pc.coalesce(parsed, candidate.cast(TIMESTAMP_TYPE))
+
+    if parsed.null_count:
+        now = datetime.now(timezone.utc)
+        rows = parsed.to_pylist()
+        failed = 0
+        for i, (value, timestamp) in enumerate(zip(values.to_pylist(), rows)):
+            if timestamp is not None:
+                continue
+            rows[i] = _parse_date(value) if value else None
+            if rows[i] is None:
+                failed += value is not None and value != ""
+                rows[i] = now
+        if failed:
+            logger.warning(f"날짜 파싱 실패 {failed} 개, 현재 시간으로 대체합니다.")
+        parsed = pa.array(rows, type=TIMESTAMP_TYPE)
+    return parsed
+
+
+class ArticleBatchBuilder:
+    '''
+    ArticleSchema를 컬럼별 리스트에 바로 쌓아 pyarrow Table로 만드는 빌더
+    기사마다 dict를 만들고 DataFrame으로 바꾸는 과정을 거치지 않는다.
+    '''
+    def __init__(self):
+        self.columns: dict[str, list] = {field: [] for field in ArticleSchema.__slots__}
+
+    def __len__(self) -> int:
+        return len(self.columns['encoded_url'])
+
+    def append(self, article: ArticleSchema) -> None:
+        for field, column in self.columns.items():
+            column.append(getattr(article, field))
+
+    def extend(self, articles) -> "ArticleBatchBuilder":
+        for article in articles:
+            self.append(article)
+        return self
+
+    def build(self) -> pa.Table:
+        """
+        문자열 컬럼과, 날짜 문자열을 컬럼 단위로 한 번 파싱한 timestamp 컬럼(TIMESTAMP_COLUMNS)으로 Table을 만든다.
+        """
+        arrays = {field: pa.array(column, type=pa.string()) for field, column in self.columns.items()}
+        arrays |= {field: parse_timestamps(arrays[source]) for field, source in TIMESTAMP_COLUMNS.items()}
+        return pa.Table.from_arrays([arrays[field.name] for field in ARTICLE_ARROW_SCHEMA], schema=ARTICLE_ARROW_SCHEMA)
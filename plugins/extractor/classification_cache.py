@@ -0,0 +1,111 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+from plugins.extractor.keyword_extractor import ArticleClassification, MODEL, PROMPT_VERSION
+
+logger = logging.getLogger(__name__)
+
+CLASSIFICATION_CACHE_PATH = os.getenv("CLASSIFICATION_CACHE_PATH", "/opt/prefect/blog_data/classification_cache.db")
+
+
+def cache_key(text: list[str], model: str = MODEL, prompt_version: str = PROMPT_VERSION) -> str:
+    """
+    process_text 결과 + 모델명 + 프롬프트 버전의 SHA-256 해시
+    같은 본문이 다른 URL로 들어와도(재배포 글) 같은 키가 된다.
+    """
+    payload = json.dumps([model, prompt_version, text], ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class ClassificationCache():
+    """
+    LLM 분류 결과(ArticleClassification)를 로컬 SQLite에 저장하는 content-addressed 캐시
+
+    max_age_days 보다 오래된 항목은 무효로 취급하고, evict() 에서 삭제한다.
+    항목 수가 max_entries 를 넘으면 가장 오래 사용되지 않은 항목부터 삭제한다.
+    """
+
+    def __init__(self, path: str = CLASSIFICATION_CACHE_PATH, max_age_days: int = 90, max_entries: int = 100_000) -> None:
+        self.path = path
+        self.max_age_seconds = max_age_days * 24 * 3600
+        self.max_entries = max_entries
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS classifications ("
+                " key TEXT PRIMARY KEY,"
+                " result TEXT NOT NULL,"
+                " created_at REAL NOT NULL,"
+                " used_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS ix_classifications_used_at ON classifications (used_at)")
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        # 매핑된 태스크가 여러 스레드에서 호출하므로 호출마다 짧게 연결한다.
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def get_many(self, keys: list[str]) -> dict[str, ArticleClassification]:
+        if not keys:
+            return {}
+        now = time.time()
+        found = {}
+        with self._connect() as conn:
+            placeholders = ",".join("?" * len(keys))
+            rows = conn.execute(
+                f"SELECT key, result FROM classifications WHERE key IN ({placeholders}) AND created_at >= ?",
+                [*keys, now - self.max_age_seconds],
+            ).fetchall()
+            for key, result in rows:
+                try:
+                    found[key] = ArticleClassification.model_validate_json(result)
+                except Exception as e:
+                    logger.warning(f"손상된 캐시 항목 무시: {key} ({e})")
+            conn.executemany("UPDATE classifications SET used_at = ? WHERE key = ?", [(now, key) for key in found])
+        return found
+
+    def get(self, key: str) -> Optional[ArticleClassification]:
+        return self.get_many([key]).get(key)
+
+    def put_many(self, items: dict[str, ArticleClassification]) -> None:
+        if not items:
+            return
+        now = time.time()
+        with self._connect() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO classifications (key, result, created_at, used_at) VALUES (?, ?, ?, ?)",
+                [(key, classification.model_dump_json(), now, now) for key, classification in items.items()],
+            )
+
+    def put(self, key: str, classification: ArticleClassification) -> None:
+        self.put_many({key: classification})
+
+    def evict(self) -> int:
+        """
+        만료되었거나 용량을 넘는 항목을 삭제
+
+        Returns:
+            삭제된 항목 수
+        """
+        with self._connect() as conn:
+            expired = conn.execute(
+                "DELETE FROM classifications WHERE created_at < ?", (time.time() - self.max_age_seconds,)
+            ).rowcount
+            overflow = conn.execute(
+                "DELETE FROM classifications WHERE key IN ("
+                " SELECT key FROM classifications ORDER BY used_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            ).rowcount
+        return expired + overflow
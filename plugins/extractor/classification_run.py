@@ -0,0 +1,118 @@
+import logging
+from typing import Iterable, Optional
+
+from plugins.preprocessor.raw_text_preprocessor import process_texts
+from plugins.extractor.keyword_extractor import ArticleClassification
+from plugins.extractor.classification_cache import ClassificationCache, cache_key
+from plugins.extractor.dedup_index import NearDuplicateIndex, minhash
+from plugins.extractor.local_extractor import (
+    USE_LOCAL_EXTRACTOR, LOCAL_FALLBACK, ANALYZED_BY_LLM, ANALYZED_BY_LOCAL, load_local_extractor,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class ClassificationRun():
+    """
+    기사 묶음 하나의 분류 전처리/후처리 (개별, 배치, 비동기 추출이 함께 사용한다)
+
+    - 생성 시: 본문 전처리 → 분류 캐시 조회 → 유사 중복 조회 → 로컬 사전 필터. 남은 기사가 misses
+    - store: LLM이 분류한 결과를 캐시와 유사 중복 인덱스에 넣는다.
+    - fall_back: LLM 요청이 끝내 실패한 기사를 로컬 결과로 대신한다. (캐시와 인덱스에는 넣지 않는다)
+    - results: 배치 안의 유사 중복 기사에 원본 결과를 채우고 입력 순서대로 결과 딕셔너리를 만든다.
+
+    LLM 호출은 호출한 쪽이 misses로 직접 한다.
+    """
+    def __init__(self, items: list[dict], log: Optional[logging.Logger] = None, use_prefilter: bool = True) -> None:
+        """
+        items: encoded_url, rss_content 딕셔너리 리스트
+        use_prefilter: False면 USE_LOCAL_EXTRACTOR가 켜져 있어도 로컬 사전 필터를 쓰지 않는다.
+        """
+        use_prefilter = use_prefilter and USE_LOCAL_EXTRACTOR
+        self.logger = log or logger
+        self.texts = dict(zip([item['encoded_url'] for item in items], process_texts([item['rss_content'] for item in items])))
+        self.keys = {post_id: cache_key(text) for post_id, text in self.texts.items()}
+        self.cache = ClassificationCache()
+        self.dedup = NearDuplicateIndex()
+        self.local = load_local_extractor() if use_prefilter or LOCAL_FALLBACK else None
+        # LLM 대신 로컬 결과를 쓴 기사 (사전 필터 + 대체)
+        self.local_ids: set[str] = set()
+
+        # 캐시에 있는 기사는 요청에서 제외
+        cached = self.cache.get_many(list(set(self.keys.values())))
+        self.classified: dict[str, ArticleClassification] = {post_id: cached[key] for post_id, key in self.keys.items() if key in cached}
+        hits = len(self.classified)
+        misses = [post_id for post_id in self.texts if post_id not in self.classified]
+
+        # 다른 URL로 재배포된 기사는 원본의 분류 결과를 재사용
+        self.signatures = {post_id: minhash(self.texts[post_id]) for post_id in misses}
+        reused, self.canonical_of = self.dedup.match(self.signatures)
+        self.classified |= reused
+        misses = [post_id for post_id in misses if post_id not in reused and post_id not in self.canonical_of]
+
+        # 로컬 분류기가 확신하는 기사는 LLM 요청에서 제외
+        confident = {}
+        if self.local is not None and use_prefilter and misses:
+            confident = self.local.classify_confident({post_id: self.texts[post_id] for post_id in misses})
+        self.classified |= confident
+        self.local_ids |= confident.keys()
+        self.misses = {post_id: self.texts[post_id] for post_id in misses if post_id not in confident}
+
+        self.logger.info(f"분류 캐시 적중: {hits}/{len(self.texts)} 개의 기사, 유사 중복 {len(reused) + len(self.canonical_of)} 개, "
+                         f"로컬 분류 {len(confident)} 개, LLM 요청 대상 {len(self.misses)} 개")
+
+    @property
+    def can_fall_back(self) -> bool:
+        return self.local is not None and LOCAL_FALLBACK
+
+    def pending(self) -> dict[str, list[str]]:
+        """
+        아직 결과가 없는 LLM 요청 대상 기사
+        """
+        return {post_id: text for post_id, text in self.misses.items() if post_id not in self.classified}
+
+    def batches(self, batch_size: int) -> list[dict[str, list[str]]]:
+        post_ids = list(self.misses)
+        return [{post_id: self.misses[post_id] for post_id in post_ids[i:i + batch_size]} for i in range(0, len(post_ids), batch_size)]
+
+    def store(self, generated: dict[str, ArticleClassification]) -> None:
+        """
+        LLM 분류 결과를 기록하고 캐시와 유사 중복 인덱스에 바로 넣는다. (태스크가 재시도되어도 다시 요청하지 않도록)
+        """
+        if not generated:
+            return
+        self.cache.put_many({self.keys[post_id]: classification for post_id, classification in generated.items()})
+        self.dedup.add_many({post_id: (self.signatures[post_id], classification) for post_id, classification in generated.items()})
+        self.classified |= generated
+
+    def fall_back(self, post_ids: Iterable[str], error: Exception) -> int:
+        """
+        키워드 사전의 키워드를 찾은 기사만 로컬 결과로 대신한다. (나머지는 다음 실행에서 다시 시도)
+
+        Returns:
+            로컬 결과로 대신한 기사 수
+        """
+        replaced = 0
+        for post_id in post_ids:
+            classification = self.local.fallback(self.texts[post_id]) if self.can_fall_back else None  # type: ignore
+            if classification is None:
+                self.logger.error(f"키워드 추출 실패, 다음 실행에서 다시 시도합니다: {post_id} ({error})")
+                continue
+            self.logger.warning(f"키워드 추출 실패, 로컬 분류 결과로 대신합니다: {post_id} ({error})")
+            self.classified[post_id] = classification
+            self.local_ids.add(post_id)
+            replaced += 1
+        return replaced
+
+    def results(self) -> list[dict]:
+        """
+        입력 순서대로 {분류 결과, id, analyzed_by} 리스트. 끝까지 결과가 없는 기사는 빠진다.
+        """
+        for post_id, canonical in self.canonical_of.items():
+            if canonical in self.classified:
+                self.classified[post_id] = self.classified[canonical]
+                if canonical in self.local_ids:
+                    self.local_ids.add(post_id)
+        return [self.classified[post_id].model_dump() | {
+                    'id': post_id, 'analyzed_by': ANALYZED_BY_LOCAL if post_id in self.local_ids else ANALYZED_BY_LLM}
+                for post_id in self.texts if post_id in self.classified]
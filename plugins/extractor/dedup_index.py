@@ -0,0 +1,212 @@
+import os
+import time
+import sqlite3
+import hashlib
+import logging
+import zlib
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+import numpy as np
+
+from plugins.extractor.keyword_extractor import ArticleClassification, MODEL, PROMPT_VERSION
+
+logger = logging.getLogger(__name__)
+
+DEDUP_INDEX_PATH = os.getenv("DEDUP_INDEX_PATH", "/opt/prefect/blog_data/dedup_index.db")
+# 추정 Jaccard 유사도가 이 값 이상이면 같은 글로 보고 분류 결과를 재사용
+NEAR_DUPLICATE_THRESHOLD = float(os.getenv("NEAR_DUPLICATE_THRESHOLD", "0.8"))
+
+# 단어 SHINGLE_SIZE-gram 집합의 MinHash (NUM_BANDS x ROWS_PER_BAND 개의 해시 함수)
+SHINGLE_SIZE = 3
+NUM_BANDS = 16
+ROWS_PER_BAND = 8
+NUM_PERM = NUM_BANDS * ROWS_PER_BAND
+
+# h(x) = (a * x + b) mod p (p = 2^61 - 1), a는 [1, p), b는 [0, p)에서 뽑는다.
+# a * x는 uint64를 넘으므로 _mulmod61로 나눠 곱한다. (a가 작으면 mod가 감기지 않아 모든 해시가 x의 단조 함수가 된다)
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_rng = np.random.default_rng(20240601)
+_A = _rng.integers(1, (1 << 61) - 1, size=NUM_PERM, dtype=np.uint64)
+_B = _rng.integers(0, (1 << 61) - 1, size=NUM_PERM, dtype=np.uint64)
+# 시그니처 계산 방식을 바꾸면 올려서 이전 시그니처를 후보에서 제외한다.
+SIGNATURE_VERSION = "2"
+
+
+def _mod61(v: np.ndarray) -> np.ndarray:
+    # v < 2^64 를 p = 2^61 - 1로 나눈 나머지 (2^61 ≡ 1 mod p)
+    v = (v & _MERSENNE_PRIME) + (v >> np.uint64(61))
+    return np.where(v >= _MERSENNE_PRIME, v - _MERSENNE_PRIME, v)
+
+
+def _mulmod61(a: np.ndarray, x: np.ndarray) -> np.ndarray:
+    """
+    (a * x) mod p. a < p, x < 2^32 (broadcast 가능)
+    a = a_hi * 2^32 + a_lo 로 나누면 각 곱이 uint64 범위 안에 들어온다.
+    """
+    a_hi, a_lo = a >> np.uint64(32), a & np.uint64(0xFFFFFFFF)
+    # a_hi * x < 2^61, (t_hi * 2^29 + t_lo) * 2^32 ≡ t_hi + t_lo * 2^32 (mod p)
+    t = a_hi * x
+    high = _mod61((t >> np.uint64(29)) + ((t & np.uint64((1 << 29) - 1)) << np.uint64(32)))
+    return _mod61(high + _mod61(a_lo * x))
+
+
+def minhash(text: list[str]) -> Optional[np.ndarray]:
+    """
+    process_text 결과의 단어 shingle 집합에 대한 MinHash 시그니처 (uint64, 길이 NUM_PERM)
+    단어가 하나도 없으면 None
+    """
+    words = " ".join(text).split()
+    if not words:
+        return None
+    size = min(SHINGLE_SIZE, len(words))
+    shingles = {" ".join(words[i:i + size]) for i in range(len(words) - size + 1)}
+    hashes = np.fromiter((zlib.crc32(shingle.encode('utf-8')) for shingle in shingles), dtype=np.uint64, count=len(shingles))
+    return _mod61(_mulmod61(_A, hashes[:, None]) + _B).min(axis=0)
+
+
+def similarity(a: np.ndarray, b: np.ndarray) -> float:
+    """
+    두 MinHash 시그니처로 추정한 Jaccard 유사도
+    """
+    return float(np.mean(a == b))
+
+
+def _band_keys(signature: np.ndarray) -> list[int]:
+    # 밴드마다 ROWS_PER_BAND 개의 값을 해시해 SQLite INTEGER(부호 있는 64비트)로 저장
+    bands = signature.reshape(NUM_BANDS, ROWS_PER_BAND)
+    return [int.from_bytes(hashlib.blake2b(band.tobytes(), digest_size=8).digest(), 'big', signed=True) for band in bands]
+
+
+class NearDuplicateIndex():
+    """
+    분류가 끝난 기사의 MinHash 시그니처와 분류 결과를 로컬 SQLite에 저장하는 LSH 인덱스
+
+    밴드 해시가 하나라도 같은 기사만 후보로 꺼내고, 전체 시그니처로 유사도를 다시 확인한다.
+    미러/애그리게이터로 URL만 바뀌어 다시 들어온 글은 원본(canonical) 기사의 분류 결과를 재사용한다.
+    모델/프롬프트 버전이 다른 항목은 후보에서 제외하고, max_age_days 보다 오래된 항목은 evict() 에서 삭제한다.
+    """
+
+    def __init__(self, path: str = DEDUP_INDEX_PATH, threshold: float = NEAR_DUPLICATE_THRESHOLD, max_age_days: int = 90) -> None:
+        self.path = path
+        self.threshold = threshold
+        self.max_age_seconds = max_age_days * 24 * 3600
+        self.version = f"{MODEL}:{PROMPT_VERSION}:{SIGNATURE_VERSION}"
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS posts ("
+                " post_id TEXT PRIMARY KEY,"
+                " signature BLOB NOT NULL,"
+                " result TEXT NOT NULL,"
+                " version TEXT NOT NULL,"
+                " created_at REAL NOT NULL)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS bands ("
+                " band INTEGER NOT NULL,"
+                " hash INTEGER NOT NULL,"
+                " post_id TEXT NOT NULL,"
+                " PRIMARY KEY (band, hash, post_id))"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS ix_bands_post_id ON bands (post_id)")
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        # 매핑된 태스크가 여러 스레드에서 호출하므로 호출마다 짧게 연결한다.
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def match(self, signatures: dict[str, Optional[np.ndarray]]) -> tuple[dict[str, ArticleClassification], dict[str, str]]:
+        """
+        시그니처를 인덱스와 배치 안의 다른 기사에 대조
+
+        Returns:
+            (인덱스의 원본 기사와 겹쳐 분류 결과를 재사용할 기사 {post_id: 분류 결과},
+             배치 안의 앞선 기사와 겹치는 기사 {post_id: 배치 안의 원본 post_id})
+        """
+        reused: dict[str, ArticleClassification] = {}
+        canonical_of: dict[str, str] = {}
+        # 배치 안 원본 후보: (band, hash) -> [post_id]
+        local_bands: dict[tuple[int, int], list[str]] = {}
+        with self._connect() as conn:
+            for post_id, signature in signatures.items():
+                if signature is None:
+                    continue
+                keys = _band_keys(signature)
+                found = self._lookup(conn, signature, keys)
+                if found is not None:
+                    reused[post_id] = found
+                    continue
+
+                candidates = {other for band, key in enumerate(keys) for other in local_bands.get((band, key), ())}
+                canonical = next((other for other in candidates
+                                  if similarity(signature, signatures[other]) >= self.threshold), None)  # type: ignore
+                if canonical is not None:
+                    canonical_of[post_id] = canonical
+                    continue
+                for band, key in enumerate(keys):
+                    local_bands.setdefault((band, key), []).append(post_id)
+        return reused, canonical_of
+
+    def _lookup(self, conn: sqlite3.Connection, signature: np.ndarray, keys: list[int]) -> Optional[ArticleClassification]:
+        conditions = " OR ".join("(b.band = ? AND b.hash = ?)" for _ in keys)
+        rows = conn.execute(
+            f"SELECT DISTINCT p.post_id, p.signature, p.result FROM bands b JOIN posts p ON p.post_id = b.post_id "
+            f"WHERE ({conditions}) AND p.version = ? AND p.created_at >= ?",
+            [value for band, key in enumerate(keys) for value in (band, key)]
+            + [self.version, time.time() - self.max_age_seconds],
+        ).fetchall()
+        best, best_score = None, self.threshold
+        for _, stored, result in rows:
+            score = similarity(signature, np.frombuffer(stored, dtype=np.uint64))
+            if score >= best_score:
+                best, best_score = result, score
+        if best is None:
+            return None
+        try:
+            return ArticleClassification.model_validate_json(best)
+        except Exception as e:
+            logger.warning(f"손상된 중복 인덱스 항목 무시: {e}")
+            return None
+
+    def add_many(self, items: dict[str, tuple[Optional[np.ndarray], ArticleClassification]]) -> None:
+        """
+        분류가 끝난 기사를 원본 후보로 등록 {post_id: (시그니처, 분류 결과)}
+        """
+        items = {post_id: item for post_id, item in items.items() if item[0] is not None}
+        if not items:
+            return
+        now = time.time()
+        with self._connect() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO posts (post_id, signature, result, version, created_at) VALUES (?, ?, ?, ?, ?)",
+                [(post_id, signature.tobytes(), classification.model_dump_json(), self.version, now)  # type: ignore
+                 for post_id, (signature, classification) in items.items()],
+            )
+            conn.executemany("DELETE FROM bands WHERE post_id = ?", [(post_id,) for post_id in items])
+            conn.executemany(
+                "INSERT OR IGNORE INTO bands (band, hash, post_id) VALUES (?, ?, ?)",
+                [(band, key, post_id) for post_id, (signature, _) in items.items()
+                 for band, key in enumerate(_band_keys(signature))],  # type: ignore
+            )
+
+    def evict(self) -> int:
+        """
+        만료되었거나 현재 모델/프롬프트 버전이 아닌 항목을 삭제
+
+        Returns:
+            삭제된 항목 수
+        """
+        with self._connect() as conn:
+            deleted = conn.execute(
+                "DELETE FROM posts WHERE created_at < ? OR version != ?",
+                (time.time() - self.max_age_seconds, self.version),
+            ).rowcount
+            conn.execute("DELETE FROM bands WHERE post_id NOT IN (SELECT post_id FROM posts)")
+        return deleted
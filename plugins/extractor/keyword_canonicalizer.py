@@ -0,0 +1,215 @@
+import os
+import re
+import json
+import zlib
+import logging
+import threading
+import unicodedata
+from typing import Iterable, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# 기본 별칭에 더할 {별칭: 대표 표기} JSON 파일 (선택)
+KEYWORD_ALIASES_PATH = os.getenv("KEYWORD_ALIASES_PATH", "")
+# 문자 n-gram 코사인 유사도가 이 값 이상이면 같은 키워드로 묶는다.
+KEYWORD_SIMILARITY_THRESHOLD = float(os.getenv("KEYWORD_SIMILARITY_THRESHOLD", "0.85"))
+
+# 문자 NGRAM_SIZE-gram을 해싱한 NUM_DIMENSIONS 차원 벡터로 유사도를 계산
+NGRAM_SIZE = 3
+NUM_DIMENSIONS = 1 << 11
+# 유사도 행렬을 BLOCK_SIZE x n 블록씩 계산해 메모리를 제한한다.
+BLOCK_SIZE = 1024
+
+_SEPARATOR_PATTERN = re.compile(r"[\s\-_./·]+")
+
+# 자주 나오는 약어/한글 표기 -> 대표 표기
+DEFAULT_ALIASES = {
+    "k8s": "Kubernetes", "쿠버네티스": "Kubernetes",
+    "js": "JavaScript", "자바스크립트": "JavaScript",
+    "ts": "TypeScript", "타입스크립트": "TypeScript",
+    "파이썬": "Python", "자바": "Java", "코틀린": "Kotlin", "스프링": "Spring", "스프링부트": "Spring Boot",
+    "도커": "Docker", "리액트": "React", "reactjs": "React", "nodejs": "Node.js", "노드js": "Node.js",
+    "postgres": "PostgreSQL", "포스트그레스": "PostgreSQL", "포스트그레스큐엘": "PostgreSQL",
+    "mysql": "MySQL", "마이sql": "MySQL", "레디스": "Redis", "카프카": "Kafka", "apachekafka": "Kafka",
+    "ml": "Machine Learning", "머신러닝": "Machine Learning", "기계학습": "Machine Learning",
+    "dl": "Deep Learning", "딥러닝": "Deep Learning",
+    "llm": "LLM", "대규모언어모델": "LLM", "거대언어모델": "LLM",
+    "rag": "RAG", "검색증강생성": "RAG",
+    "msa": "Microservices", "마이크로서비스": "Microservices", "microservice": "Microservices",
+    "마이크로서비스아키텍처": "Microservices", "microservicesarchitecture": "Microservices",
+    "cicd": "CI/CD", "gha": "GitHub Actions", "깃허브액션": "GitHub Actions",
+    "aws": "AWS", "아마존웹서비스": "AWS", "gcp": "GCP", "구글클라우드": "GCP",
+    "테라폼": "Terraform", "엘라스틱서치": "Elasticsearch",
+    "벡터데이터베이스": "Vector Database", "vectordb": "Vector Database",
+}
+
+
+def keyword_key(keyword: str) -> str:
+    """
+    대소문자, 공백, 구분 기호(-, _, ., /) 차이를 무시한 비교용 키
+    """
+    return _SEPARATOR_PATTERN.sub("", unicodedata.normalize("NFKC", keyword).casefold())
+
+
+def clean_keyword(keyword: str) -> str:
+    """
+    표기용 정리 (NFKC, 앞뒤 공백 제거, 연속 공백을 한 칸으로)
+    """
+    return " ".join(unicodedata.normalize("NFKC", keyword).split())
+
+
+def _load_aliases(path: str = KEYWORD_ALIASES_PATH) -> dict[str, str]:
+    aliases = dict(DEFAULT_ALIASES)
+    if path:
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                aliases.update(json.load(f))
+        except Exception as e:
+            logger.warning(f"키워드 별칭 파일을 읽지 못했습니다: {path} ({e})")
+    # 대표 표기 자신도 별칭으로 등록해 대소문자만 다른 입력을 대표 표기로 맞춘다.
+    lookup = {keyword_key(canonical): canonical for canonical in aliases.values()}
+    lookup.update({keyword_key(alias): canonical for alias, canonical in aliases.items()})
+    return lookup
+
+
+class KeywordCanonicalizer():
+    """
+    LLM이 돌려준 키워드 문자열을 대표 표기로 바꾸는 메모리 내 조회표
+
+    1. 별칭(k8s, 쿠버네티스 -> Kubernetes)에 있으면 대표 표기
+    2. 대소문자/공백/구분 기호만 다른 키워드가 이미 있으면 그 표기 (DB에 먼저 들어간 표기 우선)
+    3. 처음 보는 키워드는 정리한 표기를 그대로 쓰고 이후 같은 키의 표기로 등록
+    """
+    def __init__(self, aliases: Optional[dict[str, str]] = None) -> None:
+        self.aliases = _load_aliases() if aliases is None else {keyword_key(alias): canonical for alias, canonical in aliases.items()}
+        self.known: dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def add_known(self, keywords: Iterable[str]) -> None:
+        """
+        이미 저장된 키워드 표기를 등록 (먼저 등록된 표기가 유지된다)
+        """
+        with self._lock:
+            for keyword in keywords:
+                self.known.setdefault(keyword_key(keyword), keyword)
+
+    def canonicalize(self, keyword: str) -> Optional[str]:
+        """
+        대표 표기를 반환. 정리 후 빈 문자열이면 None
+        """
+        cleaned = clean_keyword(keyword)
+        key = keyword_key(cleaned)
+        if not key:
+            return None
+        if key in self.aliases:
+            return self.aliases[key]
+        with self._lock:
+            return self.known.setdefault(key, cleaned)
+
+
+_canonicalizer: Optional[KeywordCanonicalizer] = None
+_canonicalizer_lock = threading.Lock()
+
+
+def get_canonicalizer(cursor=None) -> KeywordCanonicalizer:
+    """
+    프로세스에서 공유하는 canonicalizer. 처음 만들 때 cursor가 주어지면
+    KEYWORDS의 대표 키워드(master_id가 없는 행)를 id 순으로 등록한다.
+    """
+    global _canonicalizer
+    with _canonicalizer_lock:
+        if _canonicalizer is None:
+            canonicalizer = KeywordCanonicalizer()
+            if cursor is not None:
+                cursor.execute('SELECT keyword FROM "KEYWORDS" WHERE master_id IS NULL ORDER BY id')
+                canonicalizer.add_known(keyword for keyword, in cursor.fetchall())
+            _canonicalizer = canonicalizer
+        return _canonicalizer
+
+
+def reset_canonicalizer() -> None:
+    global _canonicalizer
+    with _canonicalizer_lock:
+        _canonicalizer = None
+
+
+def ngram_vectors(keywords: list[str]) -> np.ndarray:
+    """
+    키워드별 문자 n-gram(앞뒤 경계 포함) 해싱 벡터 (L2 정규화, float32)
+    """
+    vectors = np.zeros((len(keywords), NUM_DIMENSIONS), dtype=np.float32)
+    for row, keyword in enumerate(keywords):
+        padded = f" {keyword_key(keyword)} "
+        grams = [padded[i:i + NGRAM_SIZE] for i in range(max(1, len(padded) - NGRAM_SIZE + 1))]
+        columns = np.fromiter((zlib.crc32(gram.encode("utf-8")) % NUM_DIMENSIONS for gram in grams), dtype=np.int64, count=len(grams))
+        np.add.at(vectors[row], columns, 1)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+def similar_pairs(vectors: np.ndarray, threshold: float = KEYWORD_SIMILARITY_THRESHOLD,
+                  block_size: int = BLOCK_SIZE) -> tuple[np.ndarray, np.ndarray]:
+    """
+    코사인 유사도가 threshold 이상인 (i, j) 쌍 (i < j)
+    블록 행렬 곱으로 계산해 메모리는 block_size x n 에 비례한다.
+    """
+    rows, columns = [], []
+    n = vectors.shape[0]
+    for start in range(0, n, block_size):
+        block = vectors[start:start + block_size]
+        # 대각선 아래는 앞 블록에서 이미 비교했으므로 start 이후 열만 계산
+        similarity = block @ vectors[start:].T
+        i, j = np.nonzero(similarity >= threshold)
+        keep = j > i
+        rows.append(i[keep] + start)
+        columns.append(j[keep] + start)
+    if not rows:
+        return np.array([], dtype=np.int64), np.array([], dtype=np.int64)
+    return np.concatenate(rows), np.concatenate(columns)
+
+
+def cluster_keywords(keywords: list[str], popularity: list[int], threshold: float = KEYWORD_SIMILARITY_THRESHOLD,
+                     aliases: Optional[dict[str, str]] = None) -> list[int]:
+    """
+    키워드를 묶어 각 키워드가 따를 대표 키워드의 인덱스를 반환 (대표 자신은 자기 인덱스)
+
+    - 별칭으로 같은 대표 표기가 되거나 비교용 키가 같은 키워드는 항상 한 묶음
+    - 그 외에는 문자 n-gram 유사도가 threshold 이상인 키워드를 묶는다.
+    - 별칭의 대표 표기와 같은 키워드, 그다음 인기(매핑된 포스트 수)가 높은 키워드부터 대표가 되고,
+      대표와 직접 비슷한 키워드만 흡수한다. (A~B, B~C 처럼 이어지기만 한 키워드가 한 묶음이 되는 것을 막는다)
+    """
+    lookup = _load_aliases() if aliases is None else {keyword_key(alias): canonical for alias, canonical in aliases.items()}
+    keys = [keyword_key(lookup.get(keyword_key(keyword), keyword)) for keyword in keywords]
+    preferred = [clean_keyword(keyword) == lookup.get(keyword_key(keyword)) for keyword in keywords]
+
+    n = len(keywords)
+    neighbors: list[set[int]] = [set() for _ in range(n)]
+    by_key: dict[str, list[int]] = {}
+    for index, key in enumerate(keys):
+        by_key.setdefault(key, []).append(index)
+    for group in by_key.values():
+        for index in group:
+            neighbors[index].update(group)
+
+    # 같은 키끼리는 이미 묶였으므로 키마다 하나씩만 벡터로 비교
+    representatives = [group[0] for group in by_key.values()]
+    i, j = similar_pairs(ngram_vectors([keys[index] for index in representatives]), threshold)
+    for a, b in zip(i.tolist(), j.tolist()):
+        for x in by_key[keys[representatives[a]]]:
+            for y in by_key[keys[representatives[b]]]:
+                neighbors[x].add(y)
+                neighbors[y].add(x)
+
+    master = list(range(n))
+    assigned = [False] * n
+    for index in sorted(range(n), key=lambda k: (not preferred[k], -popularity[k], k)):
+        if assigned[index]:
+            continue
+        assigned[index] = True
+        for other in neighbors[index]:
+            if not assigned[other]:
+                assigned[other] = True
+                master[other] = index
+    return master
@@ -2,10 +2,14 @@
 # pip install google-genai
 
 import os
+import json
+import logging
 from typing import Literal
 from google import genai
-from google.genai import types
-from pydantic import BaseModel
+from google.genai import errors, types
+from pydantic import BaseModel, ValidationError
+
+logger = logging.getLogger(__name__)
 
 category_to_field = {
     # Tech
@@ -42,36 +46,51 @@ Categories = Literal [
     "Economics", "Geography", "Social", "Other"
 ]
 
+PROMPT_TEMPLATE = """
+                                     Role: You are a Senior Editor and Content Analyst. Your mission is to parse articles across various domains, identify their core subjects, and maintain a high-quality content classification database. Valid Categories: {category_pool} STRICT RULE: You MUST only select a category that exists in Valid Categories above. Do NOT invent, infer, or approximate new categories. Any output containing a category outside the list is considered invalid. Task Instructions: Analysis (thought_process): Before deciding on a keyword, briefly analyze the article's context. Determine: "Is the primary subject a specific concept, methodology, or theory? Or is it an entity (company, person, organization) or an event (conference, festival, talk)?" If the article describes something associated with a specific entity, focus only on the core subject or underlying concept, not the entity itself. Keyword Selection (keyword): Select exactly one noun that represents the core subject of the article. PRIORITY: Specific concepts, methodologies, tools, frameworks, theories, or practices. STRICT PROHIBITION: Do not use company names, person names, organization names, or event titles. Bad: Naver, Toss, Kakao Enterprise, UNESCO, AWS re:Invent, Slash24. Good: Vector Database, Microservices, Fermentation, Renaissance, Behavioral Economics. Category Selection (category): Select exactly one category from Valid Categories that most precisely describes the core subject of the article. VALIDATION: Confirm the selected category exists verbatim in Valid Categories. If not, reselect. If no category fits perfectly, select the closest one and note it in thought_process. Summary (summary): Provide a concise, one-sentence overview of the article. LANGUAGE REQUIREMENT: This field MUST be written in Korean. Few-Shot Examples: Content: "How we optimized our search engine at Naver using Elasticsearch." Keyword: Elasticsearch (Correct) | Keyword: Naver (Wrong) Content: "Introducing the new feature of our service announced at Toss Slash 23." Keyword: the specific tech mentioned (Correct) | Keyword: Toss Slash 23 (Wrong) Content: "A deep dive into the history of the Roman Empire's expansion." Keyword: Roman Empire (Correct) | Keyword: History Channel (Wrong) Content: "UNESCO's report on the endangered languages of Southeast Asia." Keyword: Endangered Languages (Correct) | Keyword: UNESCO (Wrong) Content: "Our journey of migrating to a Distributed Database system." Keyword: Distributed Database (Correct)
+                                     """
+
+BATCH_INSTRUCTION = """
+                                     Batch Mode: The following message contains several articles. Each article starts with a line "### Article ID: <id>". Apply the instructions above to every article independently and return exactly one result per article. Copy each article's ID verbatim into the id field. Do not merge, skip, or reorder articles.
+                                     """
+
+# 요청마다 다시 포맷하지 않도록 import 시점에 한 번만 만든다.
+SYSTEM_PROMPT = PROMPT_TEMPLATE.format(category_pool=", ".join(categories))
+_SYSTEM_PART = types.Part.from_text(text=SYSTEM_PROMPT)
+_BATCH_INSTRUCTION_PART = types.Part.from_text(text=BATCH_INSTRUCTION)
+
+MODEL = "gemini-2.5-flash-lite"
+# 프롬프트, 응답 스키마, 본문 전처리를 바꾸면 올려서 이전 분류 캐시를 무효화한다.
+PROMPT_VERSION = "2"
+
 class ArticleClassification(BaseModel):
     keywords: list[str]
     category: Categories
     summary: str
 
-def generate(text: list[str]) -> str:
-    client = genai.Client(
+class KeyedArticleClassification(ArticleClassification):
+    id: str
+
+def is_rate_limited(e: Exception) -> bool:
+    """
+    429(RESOURCE_EXHAUSTED) 응답인지. 요청을 더 쪼개 보내면 할당량만 더 쓰므로 호출한 쪽에서 물러나야 한다.
+    """
+    return isinstance(e, errors.APIError) and (e.code == 429 or e.status == "RESOURCE_EXHAUSTED")
+
+def _client() -> genai.Client:
+    return genai.Client(
         api_key=os.getenv('GEMINI_API_KEY'),
     )
 
-    model = "gemini-2.5-flash-lite"
-    contents = [
-        types.Content(
-            role="user",
-            parts=[
-                types.Part.from_text(text="""
-                                     Role: You are a Senior Editor and Content Analyst. Your mission is to parse articles across various domains, identify their core subjects, and maintain a high-quality content classification database. Valid Categories: {category_pool} STRICT RULE: You MUST only select a category that exists in Valid Categories above. Do NOT invent, infer, or approximate new categories. Any output containing a category outside the list is considered invalid. Task Instructions: Analysis (thought_process): Before deciding on a keyword, briefly analyze the article's context. Determine: "Is the primary subject a specific concept, methodology, or theory? Or is it an entity (company, person, organization) or an event (conference, festival, talk)?" If the article describes something associated with a specific entity, focus only on the core subject or underlying concept, not the entity itself. Keyword Selection (keyword): Select exactly one noun that represents the core subject of the article. PRIORITY: Specific concepts, methodologies, tools, frameworks, theories, or practices. STRICT PROHIBITION: Do not use company names, person names, organization names, or event titles. Bad: Naver, Toss, Kakao Enterprise, UNESCO, AWS re:Invent, Slash24. Good: Vector Database, Microservices, Fermentation, Renaissance, Behavioral Economics. Category Selection (category): Select exactly one category from Valid Categories that most precisely describes the core subject of the article. VALIDATION: Confirm the selected category exists verbatim in Valid Categories. If not, reselect. If no category fits perfectly, select the closest one and note it in thought_process. Summary (summary): Provide a concise, one-sentence overview of the article. LANGUAGE REQUIREMENT: This field MUST be written in Korean. Few-Shot Examples: Content: "How we optimized our search engine at Naver using Elasticsearch." Keyword: Elasticsearch (Correct) | Keyword: Naver (Wrong) Content: "Introducing the new feature of our service announced at Toss Slash 23." Keyword: the specific tech mentioned (Correct) | Keyword: Toss Slash 23 (Wrong) Content: "A deep dive into the history of the Roman Empire's expansion." Keyword: Roman Empire (Correct) | Keyword: History Channel (Wrong) Content: "UNESCO's report on the endangered languages of Southeast Asia." Keyword: Endangered Languages (Correct) | Keyword: UNESCO (Wrong) Content: "Our journey of migrating to a Distributed Database system." Keyword: Distributed Database (Correct)
-                                     """.format(category_pool= ", ".join(categories))),
-                types.Part.from_text(text=" ".join(text)),
-            ],
-        ),
-    ]
+def _stream(client: genai.Client, contents, response_schema) -> str:
     generate_content_config = types.GenerateContentConfig(
         response_mime_type="application/json",
-        response_schema=ArticleClassification.model_json_schema(),
+        response_schema=response_schema,
     )
     result = ""
 
     for chunk in client.models.generate_content_stream(
-        model=model,
+        model=MODEL,
         contents=contents,
         config=generate_content_config,
     ):
@@ -79,6 +98,119 @@ def generate(text: list[str]) -> str:
 
     return result
 
+def build_contents(text: list[str]) -> list[types.Content]:
+    """
+    기사 한 개 분류 요청 본문
+    """
+    return [
+        types.Content(
+            role="user",
+            parts=[
+                _SYSTEM_PART,
+                types.Part.from_text(text=" ".join(text)),
+            ],
+        ),
+    ]
+
+def build_batch_contents(articles: dict[str, list[str]]) -> list[types.Content]:
+    """
+    여러 기사 분류 요청 본문. 시스템 프롬프트는 한 번만 들어간다.
+    """
+    return [
+        types.Content(
+            role="user",
+            parts=[
+                _SYSTEM_PART,
+                _BATCH_INSTRUCTION_PART,
+                types.Part.from_text(text="\n\n".join(
+                    f"### Article ID: {article_id}\n" + " ".join(text) for article_id, text in articles.items()
+                )),
+            ],
+        ),
+    ]
+
+def generate(text: list[str]) -> str:
+    client = _client()
+    return _stream(client, build_contents(text), ArticleClassification.model_json_schema())
+
+def _parse_batch_response(result: str, ids: set[str]) -> dict[str, ArticleClassification]:
+    """
+    배치 응답을 항목별로 검증하여 {article_id: ArticleClassification} 으로 반환
+    스키마에 맞지 않거나 요청하지 않은 id의 항목은 버린다.
+    """
+    try:
+        items = json.loads(result)
+    except json.JSONDecodeError:
+        return {}
+    if not isinstance(items, list):
+        return {}
+
+    parsed = {}
+    for item in items:
+        try:
+            keyed = KeyedArticleClassification.model_validate(item)
+        except ValidationError:
+            continue
+        if keyed.id in ids and keyed.id not in parsed:
+            parsed[keyed.id] = ArticleClassification.model_validate(keyed.model_dump(exclude={'id'}))
+    return parsed
+
+def generate_batch(articles: dict[str, list[str]], max_attempts: int = 2) -> dict[str, ArticleClassification]:
+    """
+    여러 기사를 한 번의 요청으로 분류
+
+    Args:
+        articles: {article_id: process_text 결과}
+        max_attempts: 검증에 실패한 항목만 모아 다시 요청하는 최대 횟수
+
+    Returns:
+        {article_id: ArticleClassification}. 끝까지 실패한 항목은 포함되지 않는다.
+
+    Raises:
+        google.genai.errors.APIError: 429/할당량 소진은 삼키지 않고 그대로 올린다. (호출한 쪽에서 물러나 재시도)
+    """
+    client = _client()
+    results: dict[str, ArticleClassification] = {}
+    pending = dict(articles)
+
+    for _ in range(max_attempts):
+        if not pending:
+            break
+        try:
+            parsed = _parse_batch_response(_stream(client, build_batch_contents(pending), list[KeyedArticleClassification]), set(pending))
+        except Exception as e:
+            if is_rate_limited(e):
+                raise
+            logger.warning(f"배치 분류 요청 실패: {e}")
+            parsed = {}
+        results.update(parsed)
+        pending = {article_id: text for article_id, text in pending.items() if article_id not in parsed}
+
+    return results
+
+async def generate_batch_async(llm_client, articles: dict[str, list[str]], max_attempts: int = 2) -> dict[str, ArticleClassification]:
+    """
+    generate_batch의 비동기 버전. 공유 AsyncLLMClient(plugins.extractor.llm_client)로 요청한다.
+    """
+    results: dict[str, ArticleClassification] = {}
+    pending = dict(articles)
+
+    for _ in range(max_attempts):
+        if not pending:
+            break
+        try:
+            response = await llm_client.generate_json(build_batch_contents(pending), list[KeyedArticleClassification])
+            parsed = _parse_batch_response(response, set(pending))
+        except Exception as e:
+            if is_rate_limited(e):
+                raise
+            logger.warning(f"배치 분류 요청 실패: {e}")
+            parsed = {}
+        results.update(parsed)
+        pending = {article_id: text for article_id, text in pending.items() if article_id not in parsed}
+
+    return results
+
 
 if __name__=="__main__":
     import dotenv
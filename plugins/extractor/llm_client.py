@@ -0,0 +1,205 @@
+import os
+import re
+import time
+import random
+import asyncio
+import logging
+from typing import Optional
+
+from google import genai
+from google.genai import errors, types
+
+from plugins.extractor.keyword_extractor import MODEL
+
+logger = logging.getLogger(__name__)
+
+# Gemini 할당량 (분당 요청 수 / 분당 토큰 수). 요금제에 맞게 환경 변수로 조정한다.
+GEMINI_RPM = int(os.getenv("GEMINI_RPM", "15"))
+GEMINI_TPM = int(os.getenv("GEMINI_TPM", "250000"))
+# 로컬 가짜 Gemini 서버(utils/fake_gemini_server.py) 등으로 요청을 보낼 때 사용
+GEMINI_BASE_URL = os.getenv("GEMINI_BASE_URL")
+
+RETRYABLE_CODES = {429, 500, 502, 503, 504}
+
+
+class TokenBucket():
+    """
+    분당 per_minute 만큼 연속적으로 채워지는 토큰 버킷
+    """
+
+    def __init__(self, per_minute: int) -> None:
+        self.capacity = float(per_minute)
+        self.tokens = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.updated = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float) -> float:
+        self._refill()
+        amount = min(amount, self.capacity)
+        return 0.0 if self.tokens >= amount else (amount - self.tokens) / self.rate
+
+    def take(self, amount: float) -> None:
+        self._refill()
+        self.tokens -= min(amount, self.capacity)
+
+    def adjust(self, delta: float) -> None:
+        """예상 토큰 수와 실제 사용량의 차이를 반영 (음수가 되면 다음 요청이 그만큼 기다린다)"""
+        self._refill()
+        self.tokens = min(self.capacity, self.tokens - delta)
+
+
+class RateLimiter():
+    """
+    분당 요청 수(RPM)와 분당 토큰 수(TPM)를 함께 지키는 리미터
+    Retry-After를 받으면 pause()로 모든 요청을 그 시간만큼 멈춘다.
+    """
+
+    def __init__(self, rpm: int = GEMINI_RPM, tpm: int = GEMINI_TPM) -> None:
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm)
+        self.paused_until = 0.0
+        self._lock = asyncio.Lock()
+
+    def pause(self, seconds: float) -> None:
+        self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+    async def acquire(self, estimated_tokens: int) -> None:
+        # 락을 잡은 채로 기다려 먼저 온 요청부터 순서대로 통과시킨다.
+        async with self._lock:
+            while True:
+                wait = max(
+                    self.paused_until - time.monotonic(),
+                    self.requests.wait_time(1),
+                    self.tokens.wait_time(estimated_tokens),
+                )
+                if wait <= 0:
+                    break
+                await asyncio.sleep(wait)
+            self.requests.take(1)
+            self.tokens.take(estimated_tokens)
+
+
+class AdaptiveConcurrency():
+    """
+    AIMD 방식으로 동시 요청 수를 조절
+    - 성공하고 지연이 latency_target 이하이면 한 라운드에 1씩 증가 (limit += 1/limit)
+    - 429를 받으면 절반으로, 지연이 목표를 넘으면 조금 줄인다.
+    """
+
+    def __init__(self, initial: int = 4, minimum: int = 1, maximum: int = 16, latency_target: float = 30.0) -> None:
+        self.limit = float(initial)
+        self.minimum = minimum
+        self.maximum = maximum
+        self.latency_target = latency_target
+        self.in_flight = 0
+        self._cond = asyncio.Condition()
+
+    async def __aenter__(self) -> "AdaptiveConcurrency":
+        async with self._cond:
+            await self._cond.wait_for(lambda: self.in_flight < int(self.limit))
+            self.in_flight += 1
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        async with self._cond:
+            self.in_flight -= 1
+            self._cond.notify_all()
+
+    def on_success(self, latency: float) -> None:
+        if latency <= self.latency_target:
+            self.limit = min(self.maximum, self.limit + 1.0 / self.limit)
+        else:
+            self.limit = max(self.minimum, self.limit * 0.9)
+
+    def on_throttle(self) -> None:
+        self.limit = max(self.minimum, self.limit / 2)
+
+
+def _retry_after(e: errors.APIError) -> Optional[float]:
+    """
+    Retry-After 헤더 또는 오류 본문의 RetryInfo.retryDelay("17s")에서 대기 시간을 읽는다.
+    """
+    headers = getattr(getattr(e, "response", None), "headers", None) or {}
+    value = headers.get("retry-after") or headers.get("Retry-After")
+    if value:
+        try:
+            return float(value)
+        except ValueError:
+            pass
+
+    details = e.details.get("error", {}).get("details", []) if isinstance(e.details, dict) else []
+    for detail in details:
+        delay = detail.get("retryDelay") if isinstance(detail, dict) else None
+        match = re.fullmatch(r"([\d.]+)s", delay or "")
+        if match:
+            return float(match.group(1))
+    return None
+
+
+def estimate_tokens(contents: list[types.Content]) -> int:
+    """
+    요청 토큰 수를 로컬에서 대략 추정 (한글 섞인 본문 기준 약 3자당 1토큰)
+    """
+    chars = sum(len(part.text or "") for content in contents for part in (content.parts or []))
+    return chars // 3 + 1
+
+
+class AsyncLLMClient():
+    """
+    extract_keywords_flow 전체가 공유하는 비동기 Gemini 클라이언트
+
+    RateLimiter로 RPM/TPM 할당량을 지키고, AdaptiveConcurrency로 동시 요청 수를 조절한다.
+    429/5xx는 Retry-After(없으면 지수 백오프)만큼 기다렸다가 다시 요청한다.
+    """
+
+    def __init__(self, rpm: int = GEMINI_RPM, tpm: int = GEMINI_TPM, base_url: Optional[str] = GEMINI_BASE_URL,
+                 max_concurrency: int = 16, max_retries: int = 6, model: str = MODEL) -> None:
+        http_options = types.HttpOptions(base_url=base_url) if base_url else None
+        self.client = genai.Client(api_key=os.getenv('GEMINI_API_KEY'), http_options=http_options)
+        self.model = model
+        self.limiter = RateLimiter(rpm, tpm)
+        self.concurrency = AdaptiveConcurrency(maximum=max_concurrency)
+        self.max_retries = max_retries
+        self.throttled = 0
+
+    async def generate_json(self, contents: list[types.Content], response_schema) -> str:
+        config = types.GenerateContentConfig(
+            response_mime_type="application/json",
+            response_schema=response_schema,
+        )
+        estimated = estimate_tokens(contents)
+
+        for attempt in range(self.max_retries):
+            await self.limiter.acquire(estimated)
+            try:
+                async with self.concurrency:
+                    started = time.monotonic()
+                    response = await self.client.aio.models.generate_content(
+                        model=self.model,
+                        contents=contents,
+                        config=config,
+                    )
+                    self.concurrency.on_success(time.monotonic() - started)
+            except errors.APIError as e:
+                if e.code not in RETRYABLE_CODES or attempt == self.max_retries - 1:
+                    raise
+                delay = _retry_after(e)
+                if delay is None:
+                    delay = min(60.0, 2 ** attempt) + random.random()
+                if e.code == 429:
+                    self.throttled += 1
+                    self.concurrency.on_throttle()
+                    self.limiter.pause(delay)
+                logger.warning(f"Gemini {e.code}, {delay:.1f}초 후 재시도 (동시 요청 한도 {self.concurrency.limit:.1f})")
+                await asyncio.sleep(delay)
+                continue
+
+            usage = response.usage_metadata
+            if usage is not None and usage.total_token_count:
+                self.limiter.tokens.adjust(usage.total_token_count - estimated)
+            return response.text or ""
@@ -0,0 +1,337 @@
+import os
+import json
+import zlib
+import logging
+import threading
+from collections import Counter
+from typing import NamedTuple, Optional
+
+import numpy as np
+
+from plugins.extractor.keyword_extractor import ArticleClassification, categories
+from plugins.preprocessor.raw_text_preprocessor import _clean_text
+
+logger = logging.getLogger(__name__)
+
+# 확신도가 높은 기사는 LLM 대신 로컬 결과를 쓴다. (기본값 false: 보정된 모델을 확인한 뒤 켠다)
+USE_LOCAL_EXTRACTOR = os.getenv("USE_LOCAL_EXTRACTOR", "false").lower() == "true"
+# LLM 요청이 끝내 실패한 기사(할당량 소진 등)를 로컬 결과로 대신한다.
+LOCAL_FALLBACK = os.getenv("LOCAL_FALLBACK", "true").lower() == "true"
+LOCAL_MODEL_PATH = os.getenv("LOCAL_MODEL_PATH", "/opt/prefect/blog_data/local_extractor")
+# 사전 필터의 확신도 기준을 직접 지정 (비워 두면 학습 때 보정한 값을 쓴다)
+LOCAL_CONFIDENCE_THRESHOLD = float(os.environ["LOCAL_CONFIDENCE_THRESHOLD"]) if os.getenv("LOCAL_CONFIDENCE_THRESHOLD") else None
+# 보정: 확신도 기준 이상인 기사의 로컬 결과가 LLM 결과와 이 비율 이상 일치하는 가장 낮은 기준을 고른다.
+LOCAL_TARGET_PRECISION = float(os.getenv("LOCAL_TARGET_PRECISION", "0.95"))
+# 보정 기준을 통과한 held-out 기사가 이 수보다 적으면 기준을 정하지 않는다. (사전 필터를 쓰지 않음)
+LOCAL_MIN_CALIBRATION_POSTS = int(os.getenv("LOCAL_MIN_CALIBRATION_POSTS", "50"))
+# 학습에 쓰는 최근 분석 포스트 수 (본문을 레이크에서 읽는다)
+LOCAL_TRAIN_MAX_POSTS = int(os.getenv("LOCAL_TRAIN_MAX_POSTS", "20000"))
+# 이 수 이상의 포스트에 매핑된 키워드만 로컬 키워드 사전에 넣는다.
+LOCAL_MIN_KEYWORD_POSTS = int(os.getenv("LOCAL_MIN_KEYWORD_POSTS", "3"))
+
+# EXTERNAL_POSTS.analyzed_by 값
+ANALYZED_BY_LLM = "llm"
+ANALYZED_BY_LOCAL = "local"
+# post id 해시로 고정한 held-out 비율 (1/HOLDOUT_MODULUS). 다시 학습해도 같은 포스트가 보정용으로 남는다.
+HOLDOUT_MODULUS = 5
+
+# 단어/바이그램을 해싱해 고정 크기 특징 벡터로 만든다. (어휘 사전 없이 학습/예측)
+NUM_FEATURES = 1 << 16
+# 로컬 요약(본문에서 고른 문장)의 최대 길이
+SUMMARY_CHARS = 200
+# 키워드 사전과 맞춰 볼 최대 n-gram 길이
+MAX_KEYWORD_WORDS = 3
+
+
+def _tokens(text: str) -> list[str]:
+    return [word for word in (word.strip(".?!").lower() for word in text.split()) if len(word) >= 2]
+
+
+def _features(tokens: list[str]) -> np.ndarray:
+    grams = set(tokens) | {f"{a} {b}" for a, b in zip(tokens, tokens[1:])}
+    return np.unique(np.fromiter((zlib.crc32(gram.encode('utf-8')) % NUM_FEATURES for gram in grams),
+                                 dtype=np.int64, count=len(grams)))
+
+
+def normalize_keyword(keyword: str) -> str:
+    """
+    키워드를 본문과 같은 방식으로 정제/소문자화 (키워드 사전 조회 키)
+    """
+    return " ".join(_tokens(_clean_text(keyword)))
+
+
+class LocalPrediction(NamedTuple):
+    classification: ArticleClassification
+    # 예측한 카테고리의 사후 확률
+    confidence: float
+    # 키워드를 키워드 사전에서 찾았는지 (False면 TF-IDF 상위 단어)
+    known_keyword: bool
+
+
+class LocalExtractor():
+    """
+    네트워크 없이 동작하는 키워드 추출/카테고리 분류기
+
+    - 카테고리: 해싱한 단어/바이그램 출현 여부에 대한 나이브 베이즈 (LLM이 분석한 포스트의 본문으로 학습)
+    - 키워드: 본문 n-gram 중 키워드 사전에 있는 것을 TF-IDF 점수로 고르고, 없으면 TF-IDF 상위 단어
+    - 요약: 키워드 밀도가 가장 높은 문장 (LLM 요약과 달리 본문 언어 그대로)
+    - threshold: held-out 포스트로 보정한 사전 필터 확신도 기준 (None이면 사전 필터를 쓰지 않는다)
+    """
+    def __init__(self, classes: list[str], class_log_prior: np.ndarray, feature_log_prob: np.ndarray,
+                 idf: np.ndarray, keywords: dict[str, str], threshold: Optional[float] = None) -> None:
+        self.classes = classes
+        self.class_log_prior = class_log_prior
+        self.feature_log_prob = feature_log_prob
+        self.idf = idf
+        # 정제된 키워드 -> 원래 표기
+        self.keywords = keywords
+        self.threshold = threshold
+
+    @classmethod
+    def train(cls, documents: list[str], labels: list[str], keywords: list[str], alpha: float = 1.0) -> "LocalExtractor":
+        """
+        documents: 학습 문서 (process_text 결과를 이어 붙인 본문), labels: 문서별 카테고리, keywords: 키워드 사전
+        """
+        valid = set(categories)
+        pairs = [(_features(_tokens(_clean_text(document))), label) for document, label in zip(documents, labels) if label in valid]
+        classes = sorted({label for _, label in pairs})
+        if not classes:
+            raise ValueError("학습할 카테고리 레이블이 없습니다.")
+        class_index = {label: i for i, label in enumerate(classes)}
+
+        counts = np.zeros((len(classes), NUM_FEATURES), dtype=np.float64)
+        document_frequency = np.zeros(NUM_FEATURES, dtype=np.float64)
+        class_counts = np.zeros(len(classes), dtype=np.float64)
+        if pairs:
+            rows = np.concatenate([np.full(features.size, class_index[label]) for features, label in pairs])
+            columns = np.concatenate([features for features, _ in pairs])
+            np.add.at(counts, (rows, columns), 1)
+            np.add.at(document_frequency, columns, 1)
+            np.add.at(class_counts, [class_index[label] for _, label in pairs], 1)
+
+        smoothed = counts + alpha
+        feature_log_prob = np.log(smoothed) - np.log(smoothed.sum(axis=1, keepdims=True))
+        class_log_prior = np.log(class_counts) - np.log(class_counts.sum())
+        idf = np.log((len(pairs) + 1) / (document_frequency + 1)) + 1
+
+        normalized = {}
+        for keyword in keywords:
+            key = normalize_keyword(keyword)
+            if key and len(key.split()) <= MAX_KEYWORD_WORDS:
+                normalized.setdefault(key, keyword)
+        return cls(classes, class_log_prior, feature_log_prob.astype(np.float32), idf.astype(np.float32), normalized)
+
+    def _keyword(self, tokens: list[str]) -> tuple[Optional[str], bool]:
+        found = Counter(
+            gram for n in range(1, MAX_KEYWORD_WORDS + 1)
+            for gram in (" ".join(tokens[i:i + n]) for i in range(len(tokens) - n + 1))
+            if gram in self.keywords
+        )
+        if found:
+            best = max(found, key=lambda gram: found[gram] * self.idf[zlib.crc32(gram.encode('utf-8')) % NUM_FEATURES])
+            return self.keywords[best], True
+
+        frequency = Counter(token for token in tokens if not token.isdigit())
+        if not frequency:
+            return None, False
+        best = max(frequency, key=lambda token: frequency[token] * self.idf[zlib.crc32(token.encode('utf-8')) % NUM_FEATURES])
+        return best, False
+
+    def _summary(self, text: list[str], tokens: list[str]) -> str:
+        frequency = Counter(tokens)
+        best = max(text, key=lambda sentence: sum(frequency[token] for token in _tokens(sentence)) / (len(sentence.split()) + 1),
+                   default="")
+        return best[:SUMMARY_CHARS]
+
+    def predict(self, text: list[str]) -> LocalPrediction:
+        """
+        text: process_text 결과
+        """
+        tokens = _tokens(" ".join(text))
+        features = _features(tokens)
+        joint = self.class_log_prior + self.feature_log_prob[:, features].sum(axis=1)
+        probabilities = np.exp(joint - joint.max())
+        probabilities /= probabilities.sum()
+        best = int(probabilities.argmax())
+
+        keyword, known = self._keyword(tokens)
+        classification = ArticleClassification(
+            keywords=[keyword] if keyword else [],
+            category=self.classes[best],  # type: ignore
+            summary=self._summary(text, tokens),
+        )
+        return LocalPrediction(classification, float(probabilities[best]), known)
+
+    def classify_confident(self, texts: dict[str, list[str]], threshold: Optional[float] = None) -> dict[str, ArticleClassification]:
+        """
+        확신도가 기준 이상이고 키워드 사전의 키워드를 찾은 기사만 {post_id: 분류 결과}로 반환
+        기준은 threshold, LOCAL_CONFIDENCE_THRESHOLD, 보정값(self.threshold) 순으로 정하고, 없으면 아무것도 반환하지 않는다.
+        """
+        threshold = next((value for value in (threshold, LOCAL_CONFIDENCE_THRESHOLD, self.threshold) if value is not None), None)
+        if threshold is None:
+            return {}
+        confident = {}
+        for post_id, text in texts.items():
+            prediction = self.predict(text)
+            if prediction.confidence >= threshold and prediction.known_keyword:
+                confident[post_id] = prediction.classification
+        return confident
+
+    def fallback(self, text: list[str]) -> Optional[ArticleClassification]:
+        """
+        LLM 요청이 끝내 실패한 기사의 대체 결과. 키워드 사전의 키워드를 찾지 못하면 None (다음 실행에서 다시 시도)
+        """
+        prediction = self.predict(text)
+        return prediction.classification if prediction.known_keyword else None
+
+    def calibrate(self, texts: list[list[str]], labels: list[str], keywords: list[list[str]],
+                  target_precision: float = LOCAL_TARGET_PRECISION, min_posts: int = LOCAL_MIN_CALIBRATION_POSTS) -> Optional[float]:
+        """
+        학습에 쓰지 않은 LLM 분석 포스트(본문, 카테고리, 키워드)로 사전 필터 기준을 정해 self.threshold에 기록
+
+        키워드 사전의 키워드를 찾은 기사를 확신도 내림차순으로 받아들일 때, 카테고리와 키워드가 모두 LLM 결과와
+        같은 비율이 target_precision 이상인 가장 낮은 확신도를 고른다. 그런 기사가 min_posts 보다 적으면 None
+
+        Returns:
+            보정한 기준 (None이면 사전 필터를 쓰지 않는다)
+        """
+        confidences, correct = [], []
+        for text, label, post_keywords in zip(texts, labels, keywords):
+            prediction = self.predict(text)
+            if not prediction.known_keyword:
+                continue
+            expected = {normalize_keyword(keyword) for keyword in post_keywords}
+            confidences.append(prediction.confidence)
+            correct.append(prediction.classification.category == label
+                           and normalize_keyword(prediction.classification.keywords[0]) in expected)
+
+        self.threshold = None
+        if confidences:
+            order = np.argsort(confidences)[::-1]
+            precision = np.cumsum(np.array(correct)[order]) / np.arange(1, len(order) + 1)
+            accepted = np.flatnonzero(precision >= target_precision)
+            if accepted.size and accepted[-1] + 1 >= min_posts:
+                self.threshold = float(np.array(confidences)[order][accepted[-1]])
+        return self.threshold
+
+    def save(self, path: str = LOCAL_MODEL_PATH) -> None:
+        os.makedirs(path, exist_ok=True)
+        tmp_path = os.path.join(path, "model.tmp.npz")
+        np.savez(tmp_path, class_log_prior=self.class_log_prior, feature_log_prob=self.feature_log_prob, idf=self.idf)
+        os.replace(tmp_path, os.path.join(path, "model.npz"))
+        tmp_path = os.path.join(path, "meta.json.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({'classes': self.classes, 'keywords': self.keywords, 'threshold': self.threshold}, f, ensure_ascii=False)
+        os.replace(tmp_path, os.path.join(path, "meta.json"))
+
+    @classmethod
+    def load(cls, path: str = LOCAL_MODEL_PATH) -> Optional["LocalExtractor"]:
+        """
+        저장된 모델을 불러온다. 아직 학습하지 않았으면 None
+        """
+        meta_path = os.path.join(path, "meta.json")
+        if not os.path.exists(meta_path):
+            return None
+        with open(meta_path, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        with np.load(os.path.join(path, "model.npz")) as arrays:
+            return cls(meta['classes'], arrays['class_log_prior'], arrays['feature_log_prob'], arrays['idf'], meta['keywords'],
+                       meta.get('threshold'))
+
+
+_loaded: dict[str, tuple[float, Optional[LocalExtractor]]] = {}
+_load_lock = threading.Lock()
+
+
+def load_local_extractor(path: str = LOCAL_MODEL_PATH) -> Optional[LocalExtractor]:
+    """
+    프로세스 안에서 모델을 한 번만 불러와 공유한다. (다시 학습해 파일이 바뀌면 새로 불러온다)
+    """
+    meta_path = os.path.join(path, "meta.json")
+    mtime = os.path.getmtime(meta_path) if os.path.exists(meta_path) else 0.0
+    with _load_lock:
+        cached = _loaded.get(path)
+        if cached is None or cached[0] != mtime:
+            try:
+                cached = (mtime, LocalExtractor.load(path))
+            except Exception as e:
+                logger.warning(f"로컬 추출 모델을 불러오지 못했습니다: {e}")
+                cached = (mtime, None)
+            _loaded[path] = cached
+    return cached[1]
+
+
+def is_holdout(post_id: str) -> bool:
+    return zlib.crc32(post_id.encode('utf-8')) % HOLDOUT_MODULUS == 0
+
+
+def load_post_texts(post_ids: list[str]) -> dict[str, list[str]]:
+    """
+    매니페스트로 레이크에서 포스트 본문을 읽어 {post_id: process_text 결과}로 반환 (찾지 못한 포스트는 빠진다)
+    """
+    from services.lake import read_posts
+    from services.manifest import PostManifest
+    from plugins.preprocessor.raw_text_preprocessor import process_texts
+
+    texts: dict[str, list[str]] = {}
+    for obj_key, ids in PostManifest().locate(post_ids).items():
+        try:
+            table = read_posts(obj_key, ids)
+        except Exception as e:
+            logger.warning(f"학습용 본문을 읽지 못했습니다: {obj_key} ({e})")
+            continue
+        texts.update(zip(table.column('encoded_url').to_pylist(), process_texts(table.column('rss_content'))))
+    return texts
+
+
+def train_from_db(db, min_keyword_posts: int = LOCAL_MIN_KEYWORD_POSTS, max_posts: int = LOCAL_TRAIN_MAX_POSTS) -> LocalExtractor:
+    """
+    LLM이 분석한 최근 EXTERNAL_POSTS의 본문(레이크)과 카테고리, 매핑된 키워드로 학습하고 사전 필터 기준을 보정
+
+    - 로컬 모델이 분석한 포스트(analyzed_by = 'local')는 학습/보정/키워드 사전에서 제외한다. (자기 추측을 다시 학습하지 않도록)
+    - 예측 때와 같은 입력(process_text 결과)으로 학습하도록 본문을 레이크에서 읽는다.
+    - post id 해시로 고정한 1/HOLDOUT_MODULUS 는 학습에 쓰지 않고 확신도 기준 보정(calibrate)에만 쓴다.
+    """
+    from sqlalchemy import func, or_
+    from models.db_models import ExternalPost, Keyword, PostKeywordMapping
+
+    analyzed_by_llm = or_(ExternalPost.analyzed_by.is_(None), ExternalPost.analyzed_by == ANALYZED_BY_LLM)
+    posts = (
+        db.query(ExternalPost.id, ExternalPost.category)
+        .filter(ExternalPost.is_analyzed == True, ExternalPost.category.isnot(None), analyzed_by_llm)
+        .order_by(ExternalPost.published_at.desc().nullslast())
+        .limit(max_posts)
+        .all()
+    )
+    labels = dict(posts)
+    post_ids = list(labels)
+    post_keywords: dict[str, list[str]] = {}
+    for start in range(0, len(post_ids), 1000):
+        rows = (
+            db.query(PostKeywordMapping.post_id, Keyword.keyword)
+            .join(Keyword, Keyword.id == PostKeywordMapping.keyword_id)
+            .filter(PostKeywordMapping.post_id.in_(post_ids[start:start + 1000]))
+            .all()
+        )
+        for post_id, keyword in rows:
+            post_keywords.setdefault(post_id, []).append(keyword)
+    keywords = [
+        keyword for keyword, in (
+            db.query(Keyword.keyword)
+            .join(PostKeywordMapping, PostKeywordMapping.keyword_id == Keyword.id)
+            .join(ExternalPost, ExternalPost.id == PostKeywordMapping.post_id)
+            .filter(analyzed_by_llm)
+            .group_by(Keyword.keyword)
+            .having(func.count(PostKeywordMapping.post_id) >= min_keyword_posts)
+            .all()
+        )
+    ]
+
+    texts = load_post_texts(post_ids)
+    train_ids = [post_id for post_id in texts if not is_holdout(post_id)]
+    holdout_ids = [post_id for post_id in texts if is_holdout(post_id)]
+    model = LocalExtractor.train([" ".join(texts[post_id]) for post_id in train_ids], [labels[post_id] for post_id in train_ids], keywords)
+    threshold = model.calibrate([texts[post_id] for post_id in holdout_ids], [labels[post_id] for post_id in holdout_ids],
+                                [post_keywords.get(post_id, []) for post_id in holdout_ids])
+    logger.info(f"로컬 추출 모델: 학습 {len(train_ids)} 개, 보정 {len(holdout_ids)} 개 (본문 없음 {len(labels) - len(texts)} 개), 확신도 기준 {threshold}")
+    return model
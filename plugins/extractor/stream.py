@@ -0,0 +1,107 @@
+import queue
+import asyncio
+import logging
+import threading
+from typing import Awaitable, Callable, Optional
+
+from plugins.extractor.llm_client import AsyncLLMClient
+
+logger = logging.getLogger(__name__)
+
+# 큐에 쌓아 둘 수 있는 기사 묶음 수 (가득 차면 put이 생산자를 멈춘다)
+DEFAULT_QUEUE_SIZE = 8
+
+_DONE = object()
+
+
+class ExtractionStream():
+    """
+    수집과 키워드 추출을 겹쳐 실행하기 위한 생산자/소비자 큐
+
+    - 생산자(수집 flow)는 플랫폼 결과가 나올 때마다 put으로 기사 묶음을 넣는다.
+    - 백그라운드 스레드의 이벤트 루프가 묶음을 꺼내 공유 AsyncLLMClient 하나로 분류한다.
+    - 큐 크기와 동시에 처리 중인 묶음 수를 제한해(backpressure) 메모리가 무한히 늘지 않는다.
+
+    classify(llm_client, items)는 기사 딕셔너리 리스트를 받아 결과 딕셔너리 리스트를 돌려주는 코루틴 함수
+    """
+    def __init__(self, classify: Callable[[AsyncLLMClient, list[dict]], Awaitable[list[dict]]],
+                 maxsize: int = DEFAULT_QUEUE_SIZE, max_in_flight: Optional[int] = None) -> None:
+        self.classify = classify
+        self.queue: queue.Queue = queue.Queue(maxsize=maxsize)
+        self.max_in_flight = max_in_flight or maxsize
+        self.results: list[dict] = []
+        self.llm_client: Optional[AsyncLLMClient] = None
+        self._error: Optional[BaseException] = None
+        self._thread = threading.Thread(target=self._run, name="extraction-stream", daemon=True)
+
+    def start(self) -> "ExtractionStream":
+        self._thread.start()
+        return self
+
+    def put(self, items: list[dict]) -> None:
+        """
+        기사 묶음을 큐에 넣는다. 큐가 가득 차면 소비자가 따라잡을 때까지 기다린다.
+        """
+        if not items:
+            return
+        if self._error is not None:
+            raise RuntimeError("extraction stream stopped") from self._error
+        self.queue.put(items)
+
+    def close(self) -> list[dict]:
+        """
+        더 넣을 묶음이 없음을 알리고, 남은 묶음이 모두 처리되면 전체 결과를 반환
+        """
+        # 소비자가 오류로 먼저 끝났으면 가득 찬 큐에서 멈추지 않도록 스레드 상태를 확인하며 넣는다.
+        while self._thread.is_alive():
+            try:
+                self.queue.put(_DONE, timeout=1)
+                break
+            except queue.Full:
+                continue
+        self._thread.join()
+        if self._error is not None:
+            raise self._error
+        return self.results
+
+    def _run(self) -> None:
+        try:
+            asyncio.run(self._consume())
+        except BaseException as e:
+            self._error = self._error or e
+            # 생산자가 가득 찬 큐에서 멈춰 있지 않도록 남은 묶음을 비운다.
+            while True:
+                try:
+                    if self.queue.get_nowait() is _DONE:
+                        break
+                except queue.Empty:
+                    break
+
+    async def _consume(self) -> None:
+        loop = asyncio.get_running_loop()
+        self.llm_client = AsyncLLMClient()
+        slots = asyncio.Semaphore(self.max_in_flight)
+        pending: set[asyncio.Task] = set()
+
+        async def _handle(items: list[dict]) -> None:
+            try:
+                self.results.extend(await self.classify(self.llm_client, items))
+            except Exception as e:
+                logger.error(f"기사 묶음 분류 실패, 스트림을 중단합니다: {e}")
+                self._error = self._error or e
+            finally:
+                slots.release()
+
+        while True:
+            # 처리 중인 묶음이 한도에 이르면 큐에서 더 꺼내지 않는다.
+            await slots.acquire()
+            items = await loop.run_in_executor(None, self.queue.get)
+            if items is _DONE or self._error is not None:
+                break
+            task = asyncio.create_task(_handle(items))
+            pending.add(task)
+            task.add_done_callback(pending.discard)
+
+        await asyncio.gather(*pending)
+        if self._error is not None:
+            raise self._error
@@ -0,0 +1,112 @@
+import os
+import json
+import asyncio
+import logging
+from urllib.parse import urlparse
+
+import httpx
+import feedparser
+
+logger = logging.getLogger(__name__)
+
+FEED_CACHE_PATH = os.getenv("FEED_CACHE_PATH", "/opt/prefect/blog_data/feed_cache.json")
+
+
+class FeedCache():
+    """
+    피드 URL별 ETag / Last-Modified 값을 디스크에 보관하는 캐시
+
+    {url: {"etag": str | None, "last_modified": str | None}} 형태의 JSON 파일로 저장한다.
+    """
+
+    def __init__(self, path: str = FEED_CACHE_PATH) -> None:
+        self.path = path
+        self.entries: dict[str, dict] = {}
+
+    def load(self) -> "FeedCache":
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                self.entries = json.load(f)
+        except FileNotFoundError:
+            self.entries = {}
+        except Exception as e:
+            logger.warning(f"피드 캐시 로드 실패, 빈 캐시로 시작합니다: {e}")
+            self.entries = {}
+        return self
+
+    def get(self, url: str) -> dict:
+        return self.entries.get(url, {})
+
+    def update(self, url: str, **values) -> None:
+        entry = self.entries.setdefault(url, {})
+        entry.update({key: value for key, value in values.items() if value is not None})
+
+    def save(self) -> None:
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.entries, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+
+
+async def _fetch_one(client: httpx.AsyncClient, url: str, cached: dict, semaphore: asyncio.Semaphore) -> dict:
+    """
+    조건부 GET으로 피드 하나를 가져온다. 변경이 없으면 not_modified=True 를 반환한다.
+    """
+    headers = {}
+    if cached.get("etag"):
+        headers["If-None-Match"] = cached["etag"]
+    if cached.get("last_modified"):
+        headers["If-Modified-Since"] = cached["last_modified"]
+
+    result = {"url": url, "not_modified": False, "content": None, "headers": {},
+              "etag": None, "last_modified": None, "error": None}
+    async with semaphore:
+        try:
+            response = await client.get(url, headers=headers)
+        except Exception as e:
+            result["error"] = f"{type(e).__name__}: {e}"
+            return result
+
+    if response.status_code == 304:
+        result["not_modified"] = True
+        return result
+    if response.status_code >= 400:
+        result["error"] = f"HTTP {response.status_code}"
+        return result
+
+    result["content"] = response.content
+    result["headers"] = {"content-type": response.headers.get("content-type", "")}
+    result["etag"] = response.headers.get("etag")
+    result["last_modified"] = response.headers.get("last-modified")
+    return result
+
+
+async def fetch_feeds_async(urls: list[str], cache: FeedCache, per_host_limit: int = 2, timeout: float = 20.0) -> dict[str, dict]:
+    """
+    여러 피드를 동시에 가져온다. 같은 호스트(medium.com 등)에는 per_host_limit 개까지만 동시에 요청한다.
+
+    Returns:
+        {url: fetch 결과} 딕셔너리
+    """
+    semaphores: dict[str, asyncio.Semaphore] = {}
+    for url in urls:
+        host = urlparse(url).netloc
+        semaphores.setdefault(host, asyncio.Semaphore(per_host_limit))
+
+    async with httpx.AsyncClient(
+        timeout=httpx.Timeout(timeout),
+        follow_redirects=True,
+        headers={"User-Agent": feedparser.USER_AGENT},
+    ) as client:
+        results = await asyncio.gather(*[
+            _fetch_one(client, url, cache.get(url), semaphores[urlparse(url).netloc]) for url in urls
+        ])
+    return {result["url"]: result for result in results}
+
+
+def fetch_feeds(urls: list[str], cache: FeedCache, per_host_limit: int = 2, timeout: float = 20.0) -> dict[str, dict]:
+    """
+    fetch_feeds_async의 동기 래퍼 (Prefect task 스레드에서 호출)
+    """
+    return asyncio.run(fetch_feeds_async(urls, cache, per_host_limit=per_host_limit, timeout=timeout))
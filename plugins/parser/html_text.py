@@ -0,0 +1,109 @@
+import os
+import logging
+
+logger = logging.getLogger(__name__)
+
+# HTML → 텍스트 변환 백엔드 ("lxml" | "bs4"). lxml이 없으면 bs4로 대체한다.
+HTML_TEXT_BACKEND = os.getenv("HTML_TEXT_BACKEND", "lxml")
+# 이 길이를 넘는 본문은 청크 단위로 나눠 파서에 흘려 넣는다.
+STREAMING_THRESHOLD = 1 << 20
+STREAM_CHUNK_SIZE = 1 << 16
+
+# BeautifulSoup(html.parser).get_text() 와 같은 결과를 내기 위한 규칙
+ASCII_SPACES = '\x20\x0a\x09\x0c\x0d'
+_ASCII_SPACES_TABLE = {ord(c): None for c in ASCII_SPACES}
+SKIP_TEXT_TAGS = frozenset({"script", "style", "template"})
+PRESERVE_WHITESPACE_TAGS = frozenset({"pre", "textarea"})
+
+try:
+    from lxml import etree
+except ImportError:  # pragma: no cover - lxml 미설치 환경
+    etree = None
+
+
+class _TextCollector():
+    """
+    lxml 파서 target. 트리를 만들지 않고 텍스트 노드만 이어 붙인다.
+
+    BeautifulSoup과 같게 맞춘 규칙:
+    - script/style/template 안의 텍스트는 버린다.
+    - 공백 문자로만 된 텍스트 노드는 개행이 있으면 "\\n", 없으면 " " 하나로 줄인다 (pre/textarea 제외).
+    """
+
+    def __init__(self) -> None:
+        self.parts: list[str] = []
+        self.pending: list[str] = []
+        self.skip_depth = 0
+        self.preserve_depth = 0
+
+    def _flush(self) -> None:
+        if not self.pending:
+            return
+        text = "".join(self.pending)
+        self.pending = []
+        if self.skip_depth:
+            return
+        if not self.preserve_depth and not text.translate(_ASCII_SPACES_TABLE):
+            text = "\n" if "\n" in text else " "
+        self.parts.append(text)
+
+    def start(self, tag, attrib) -> None:
+        self._flush()
+        if tag in SKIP_TEXT_TAGS:
+            self.skip_depth += 1
+        elif tag in PRESERVE_WHITESPACE_TAGS:
+            self.preserve_depth += 1
+
+    def end(self, tag) -> None:
+        self._flush()
+        if tag in SKIP_TEXT_TAGS:
+            self.skip_depth = max(0, self.skip_depth - 1)
+        elif tag in PRESERVE_WHITESPACE_TAGS:
+            self.preserve_depth = max(0, self.preserve_depth - 1)
+
+    def data(self, data) -> None:
+        self.pending.append(data)
+
+    def comment(self, text) -> None:
+        self._flush()
+
+    def close(self) -> str:
+        self._flush()
+        return "".join(self.parts)
+
+
+def _lxml_text(html: str, chunk_size: int = 0) -> str:
+    parser = etree.HTMLParser(target=_TextCollector())
+    # libxml2는 문서 맨 앞의 공백을 버리므로, 빈 요소를 앞에 붙여 본문 공백을 살린다.
+    if html[:1] in ASCII_SPACES:
+        parser.feed("<span></span>")
+    if chunk_size:
+        for start in range(0, len(html), chunk_size):
+            parser.feed(html[start:start + chunk_size])
+    elif html:
+        parser.feed(html)
+    return parser.close()
+
+
+def _bs4_text(html: str) -> str:
+    from bs4 import BeautifulSoup
+    return BeautifulSoup(html, "html.parser").get_text()
+
+
+def html_to_text(html: str, backend: str = HTML_TEXT_BACKEND) -> str:
+    """
+    HTML 본문에서 태그를 제거한 텍스트를 반환
+
+    Args:
+        html: RSS 엔트리의 content/summary HTML
+        backend: "lxml"(기본, 빠름) 또는 "bs4". lxml이 없거나 파싱에 실패하면 bs4로 대체한다.
+    """
+    if not html:
+        return ""
+    if backend == "lxml" and etree is not None:
+        try:
+            chunk_size = STREAM_CHUNK_SIZE if len(html) > STREAMING_THRESHOLD else 0
+            return _lxml_text(html, chunk_size=chunk_size)
+        except Exception as e:
+            logger.warning(f"lxml 텍스트 추출 실패, BeautifulSoup으로 대체합니다: {e}")
+    return _bs4_text(html)
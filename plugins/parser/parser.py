@@ -1,11 +1,18 @@
-from typing import List
+from typing import Callable, List, Optional
 from datetime import datetime
+import hashlib
 import logging
 from models.rss_schema import ArticleSchema
 
 
 logger = logging.getLogger(__name__)
 
+def encode_url(link: str) -> str:
+    """
+    글 URL의 MD5 해시값 (ArticleSchema.encoded_url, EXTERNAL_POSTS.id)
+    """
+    return hashlib.md5(link.encode('utf-8')).hexdigest()
+
 class RSSParser():
     """
     RSS 피드 파서 클래스
@@ -27,8 +34,7 @@ class RSSParser():
         Returns:
             ArticleSchema instance
         """
-        from bs4 import BeautifulSoup
-        import hashlib
+        from plugins.parser.html_text import html_to_text
 
         parsed_content = ""
 
@@ -40,7 +46,7 @@ class RSSParser():
             parsed_content = str(entry.description)
 
 
-        parsed_content = BeautifulSoup(parsed_content, "html.parser").get_text()
+        parsed_content = html_to_text(parsed_content)
         article = ArticleSchema(
             source=self.platform,
             title=entry.get("title", ""),
@@ -49,13 +55,32 @@ class RSSParser():
             content="",
             published_at=entry.get("published", ""),
             created_at=datetime.now().isoformat(),
-            encoded_url= hashlib.md5(entry.get("link", "").encode('utf-8')).hexdigest(),
+            encoded_url= encode_url(entry.get("link", "")),
         )
         return article
 
-    def parse(self) -> List[ArticleSchema]:
+    def is_seen(self, entry, is_known: Optional[Callable[[str], bool]] = None) -> bool:
+        """
+        normalize(HTML 파싱) 전에 이미 수집한 엔트리인지 판별 (encoded_url이 인덱스에 있는지로만 판단)
+
+        Args:
+            entry: feedparser entry object
+            is_known: encoded_url을 받아 이미 수집된 글이면 True를 반환하는 함수
+        """
+        if is_known is None:
+            return False
+        return is_known(encode_url(entry.get("link", "")))
+
+    def parse(self, content: Optional[bytes] = None, response_headers: Optional[dict] = None,
+              is_known: Optional[Callable[[str], bool]] = None) -> List[ArticleSchema]:
         """
         RSS 피드를 파싱하여 ArticleSchema 리스트 반환 (공통 로직)
+        is_known으로 이미 본 엔트리는 normalize 전에 건너뛴다.
+
+        Args:
+            content: 미리 받아 둔 피드 본문 (plugins.parser.fetcher). 없으면 url에서 직접 받는다.
+            response_headers: content와 함께 받은 응답 헤더 (인코딩 판별용)
+            is_known: 이미 수집된 encoded_url 판별 함수 (예: UrlIndex.__contains__)
 
         Returns:
             List of ArticleSchema
@@ -63,10 +88,13 @@ class RSSParser():
         import feedparser
         try:
             rss_url = self.url
-            logger.info(f"Fetching RSS from: {rss_url}")
 
             # feedparser로 파싱
-            feed = feedparser.parse(rss_url)
+            if content is not None:
+                feed = feedparser.parse(content, response_headers=response_headers)
+            else:
+                logger.info(f"Fetching RSS from: {rss_url}")
+                feed = feedparser.parse(rss_url)
 
             if not feed.entries:
                 logger.warning(f"No entries found in RSS feed: {rss_url}")
@@ -74,7 +102,11 @@ class RSSParser():
 
             # 각 엔트리를 ArticleSchema로 변환
             articles = []
+            skipped = 0
             for entry in feed.entries:
+                if self.is_seen(entry, is_known=is_known):
+                    skipped += 1
+                    continue
                 try:
                     article = self.normalize(entry)
                     articles.append(article)
@@ -82,7 +114,7 @@ class RSSParser():
                     logger.error(f"Failed to normalize entry: {e}")
                     continue
 
-            logger.info(f"Parsed {len(articles)} articles from {rss_url}")
+            logger.info(f"Parsed {len(articles)} articles from {rss_url} (skipped {skipped} already seen)")
             return articles
 
         except Exception as e:
@@ -0,0 +1,72 @@
+import os
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+# 워커 프로세스마다 한 번만 받아 두는 이미 수집된 encoded_url 집합
+_known_hashes: frozenset = frozenset()
+
+
+def _init_worker(known_hashes: frozenset) -> None:
+    global _known_hashes
+    _known_hashes = known_hashes
+
+
+def _parse_feed(job: dict) -> dict:
+    """
+    워커 프로세스에서 피드 하나를 파싱 (feedparser + HTML 텍스트 추출)
+    feedparser 객체 대신 ArticleSchema 필드 딕셔너리만 돌려보낸다.
+    """
+    from plugins.parser.parser import RSSParser
+
+    parser = RSSParser(job['platform'], job['url'])
+    try:
+        articles = parser.parse(job.get('content'), job.get('headers'), is_known=_known_hashes.__contains__)
+    except Exception as e:
+        return {'url': job['url'], 'error': f"{type(e).__name__}: {e}", 'articles': []}
+
+    return {
+        'url': job['url'],
+        'error': None,
+        'articles': [article.to_dict() for article in articles],
+    }
+
+
+def _parse_feed_batch(jobs: list[dict]) -> list[dict]:
+    return [_parse_feed(job) for job in jobs]
+
+
+def parse_feeds_in_pool(jobs: list[dict], known_hashes: frozenset = frozenset(), max_workers: Optional[int] = None) -> dict[str, dict]:
+    """
+    여러 피드를 프로세스 풀에서 나눠 파싱 (GIL 우회)
+
+    Args:
+        jobs: {'platform', 'url', 'content', 'headers'} 딕셔너리 리스트
+        known_hashes: 이미 수집된 encoded_url 집합. 워커마다 한 번만 전달된다.
+        max_workers: 기본값은 CPU 코어 수
+
+    Returns:
+        {url: {'articles': [ArticleSchema 필드 딕셔너리], 'error'}}
+    """
+    if not jobs:
+        return {}
+    max_workers = max_workers or os.cpu_count() or 1
+    # 워커당 두 묶음 정도로 나눠 전달 횟수를 줄이면서도 느린 피드에 한 워커가 묶이지 않게 한다.
+    batch_size = max(1, -(-len(jobs) // (max_workers * 2)))
+    batches = [jobs[i:i + batch_size] for i in range(0, len(jobs), batch_size)]
+
+    # Prefect 워커는 스레드가 많은 프로세스라 fork 대신 spawn을 쓴다.
+    with ProcessPoolExecutor(
+        max_workers=min(max_workers, len(batches)),
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_worker,
+        initargs=(frozenset(known_hashes),),
+    ) as executor:
+        results = {}
+        for batch_result in executor.map(_parse_feed_batch, batches):
+            for result in batch_result:
+                results[result['url']] = result
+    return results
@@ -1,49 +1,108 @@
+import os
 import re
+from collections import Counter
 
-def _get_shortest_portion(text, ratio=0.5)->list[str]:
-    sentences = [s.strip() for s in re.split(r'(?<=[.?!])\s+', text) if s.strip()]
-    # 길이에 따라 정렬
-    sentences.sort(key=len)
-    
-    # 하위(짧은 쪽) n%만 추출
-    num_to_keep = int(len(sentences) * ratio)
-    return sentences[:num_to_keep]
+# 기사 한 개당 LLM에 보내는 본문 토큰 예산 (추정치 기준)
+ARTICLE_TOKEN_BUDGET = int(os.getenv("ARTICLE_TOKEN_BUDGET", "400"))
+
+SENTENCE_SPLIT_PATTERN = re.compile(r'(?<=[.?!])\s+')
+URL_PATTERN = re.compile(r'https?://\S+|www\.\S+')
+NON_TEXT_PATTERN = re.compile(r'[^가-힣a-zA-Z0-9\s.?!]')
+
+# 불용어 리스트 (기술 블로그 및 한국어 특성 반영)
+STOP_WORDS = frozenset({
+    "내용", "이번", "경우", "통해", "대한", "위해", "관련", "정도", "이후", "사실",
+    "생각", "사용", "진행", "확인", "작업", "부분", "기존", "기능", "방식", "설정",
+    "방법", "하나", "단어", "단락", "문장", "블로그", "포스팅", "주소", "댓글",
+    "감사합니다", "참고", "링크", "아래", "다음", "그리고", "하지만", "또한", "매우",
+    "그냥", "어떤", "지금", "오늘", "매일", "진짜", "역시", "항상", "종종", "한번"
+})
+
+def _split_sentences(text) -> list[str]:
+    return [s for s in map(str.strip, SENTENCE_SPLIT_PATTERN.split(text)) if s]
+
+def _estimate_tokens(text: str, num_words: int) -> int:
+    # 정제된 문장에는 한글(UTF-8 3바이트)과 ASCII만 남으므로 바이트 수로 한글 글자 수를 센다.
+    hangul = (len(text.encode('utf-8')) - len(text)) // 2
+    others = len(text) - hangul - text.count(' ')
+    return max(num_words, -(-hangul // 2) + -(-others // 4))
+
+def estimate_tokens(text: str) -> int:
+    """
+    토크나이저 호출 없이 계산하는 정제된 문장의 토큰 수 추정치 (약간 크게 잡는다)
+    영문/숫자는 4글자, 한글은 2글자에 토큰 하나로 보고 단어 수보다 작게 잡지 않는다.
+    """
+    return _estimate_tokens(text, len(text.split()))
+
+def _pack_sentences(sentences: list[str], budget: int) -> list[str]:
+    """
+    정제된 문장들 중 토큰 예산 안에 들어가는 문장을 골라 원래 순서대로 반환
+
+    예산 안에 다 들어가면 모두 보내고, 넘치면 키워드 밀도(기사 안에서 두 번 이상 나온 단어의
+    추가 등장 횟수 합 / 문장 토큰 수)가 높은 문장부터 채운다.
+    한 문장도 들어가지 않으면 밀도가 가장 높은 문장을 단어 단위로 잘라 보낸다.
+    """
+    sentences = [sentence for sentence in sentences if sentence]
+    words = [sentence.split() for sentence in sentences]
+    tokens = [_estimate_tokens(sentence, len(sentence_words)) for sentence, sentence_words in zip(sentences, words)]
+    if sum(tokens) <= budget:
+        return sentences
+
+    frequency = Counter(word for sentence_words in words for word in sentence_words)
+    scores = [(sum(map(frequency.__getitem__, sentence_words)) - len(sentence_words)) / count
+              for sentence_words, count in zip(words, tokens)]
+    order = sorted(range(len(sentences)), key=scores.__getitem__, reverse=True)
+
+    selected, remaining = [], budget
+    for i in order:
+        if tokens[i] <= remaining:
+            selected.append(i)
+            remaining -= tokens[i]
+    if selected:
+        return [sentences[i] for i in sorted(selected)]
+
+    truncated, remaining = [], budget
+    for word in words[order[0]]:
+        remaining -= estimate_tokens(word)
+        if remaining < 0:
+            break
+        truncated.append(word)
+    return [" ".join(truncated)]
+
+def _filter_words(text):
+    # 불용어에 포함되지 않고, 길이가 2글자 이상인 단어만 남기고 한 칸 공백으로 합친다.
+    # split()은 모든 공백을 기준으로 나누므로 다중 공백도 함께 정리된다.
+    return " ".join([word for word in text.split() if word not in STOP_WORDS and len(word) >= 2])
 
 def _clean_text(text):
     if not text:
         return ""
 
-    # 1. 이전 단계: URL, 특수문자 정제
-    text = re.sub(r'https?://\S+|www\.\S+', '', text)
-    text = re.sub(r'[^가-힣a-zA-Z0-9\s.?!]', ' ', text)
-    
-    # 2. 불용어 리스트 정의 (기술 블로그 및 한국어 특성 반영)
-    stop_words = {
-        "내용", "이번", "경우", "통해", "대한", "위해", "관련", "정도", "이후", "사실",
-        "생각", "사용", "진행", "확인", "작업", "부분", "기존", "기능", "방식", "설정",
-        "방법", "하나", "단어", "단락", "문장", "블로그", "포스팅", "주소", "댓글",
-        "감사합니다", "참고", "링크", "아래", "다음", "그리고", "하지만", "또한", "매우",
-        "그냥", "어떤", "지금", "오늘", "매일", "진짜", "역시", "항상", "종종", "한번"
-    }
-
-    # 3. 단어 단위로 쪼개어 필터링
-    # split()은 공백을 기준으로 단어를 나눕니다.
-    words = text.split()
-    
-    # 불용어에 포함되지 않고, 길이가 2글자 이상인 단어만 추출
-    clean_words = [word for word in words if word not in stop_words and len(word) >= 2]
-
-    # 4. 다시 문장으로 합침
-    result_text = " ".join(clean_words)
-    
-    # 5. 다중 공백 제거
-    result_text = re.sub(r'\s+', ' ', result_text).strip()
-
-
-    
-    return result_text
-
-def process_text(text:str) -> list[str]:
-    sentences = _get_shortest_portion(text=text)
-    sentences = list(map(_clean_text, sentences))
-    return sentences
\ No newline at end of file
+    # 1. URL, 특수문자 정제
+    text = URL_PATTERN.sub('', text)
+    text = NON_TEXT_PATTERN.sub(' ', text)
+
+    # 2. 단어 단위 불용어 필터링
+    return _filter_words(text)
+
+def process_text(text:str, budget: int = ARTICLE_TOKEN_BUDGET) -> list[str]:
+    sentences = list(map(_clean_text, _split_sentences(text or "")))
+    return _pack_sentences(sentences, budget)
+
+def process_texts(texts, budget: int = ARTICLE_TOKEN_BUDGET) -> list[list[str]]:
+    """
+    여러 기사의 rss_content를 기사별 process_text로 전처리
+    (여러 기사의 문장을 이어 붙여 정규식을 한 번에 적용해도 기사별 처리보다 빠르지 않았다. utils/bench_preprocessor.py)
+
+    Args:
+        texts: rss_content 컬럼 (pandas Series, pyarrow Array/ChunkedArray 또는 문자열 리스트)
+        budget: 기사 한 개당 토큰 예산
+
+    Returns:
+        기사 순서대로 process_text 결과 리스트
+    """
+    if hasattr(texts, "to_pylist"):
+        texts = texts.to_pylist()
+    elif hasattr(texts, "tolist"):
+        texts = texts.tolist()
+    return [process_text(text, budget) for text in texts]
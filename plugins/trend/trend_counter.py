@@ -0,0 +1,260 @@
+import os
+import json
+import logging
+from datetime import date, datetime, timedelta
+from typing import Optional
+from zoneinfo import ZoneInfo
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+TREND_COUNTER_PATH = os.getenv("TREND_COUNTER_PATH", "/opt/prefect/blog_data/trend")
+# 링 버퍼에 보관하는 일 수 (이보다 오래된 날은 새 날짜가 들어올 때 덮어쓴다)
+TREND_WINDOW_DAYS = int(os.getenv("TREND_WINDOW_DAYS", "180"))
+# KEYWORD_DAILY_COUNTS의 day와 같은 기준 (게시일을 Asia/Seoul 날짜로 버킷팅)
+TREND_TIMEZONE = ZoneInfo("Asia/Seoul")
+
+_EPOCH = date(1970, 1, 1)
+
+
+def day_number(day: date) -> int:
+    return (day - _EPOCH).days
+
+
+def today() -> date:
+    return datetime.now(TREND_TIMEZONE).date()
+
+
+class TrendCounter():
+    """
+    (분야, 키워드) x 일 버킷 카운터 (NumPy 링 버퍼)
+
+    - counts[row, day % num_buckets] = 그날 게시된 포스트 중 키워드가 매핑된 수
+      row는 기간 안에 카운트가 있는 (분야, 키워드) 쌍마다 하나씩만 둔다. (row_keys[row] = (field_id, keyword_id))
+      field_id 0은 분야 없음
+    - 메모리는 최대 keyword_id가 아니라 기간 안에 등장한 (분야, 키워드) 쌍 수에 비례한다.
+      sync_from_db가 기간 밖으로 밀려나 0이 된 행을 정리한다.
+    - 새 날짜로 넘어갈 때는 밀려나는 버킷만 0으로 비우므로 갱신 비용이 전체 기간과 무관하다.
+    - save로 .npy에 기록하고 load(mmap_mode='r')로 메모리 맵해 조회만 할 수 있다.
+    """
+    def __init__(self, num_buckets: int = TREND_WINDOW_DAYS) -> None:
+        self.num_buckets = num_buckets
+        self.counts = np.zeros((0, num_buckets), dtype=np.uint32)
+        self.row_keys = np.zeros((0, 2), dtype=np.int64)
+        self.num_rows = 0
+        self._rows: dict[tuple[int, int], int] = {}
+        # 링 버퍼에 들어 있는 가장 최근 날짜 (epoch day)
+        self.head_day: Optional[int] = None
+        self.keyword_names: dict[int, str] = {}
+        self.field_names: dict[int, str] = {}
+
+    def _row(self, field_id: int, keyword_id: int) -> int:
+        row = self._rows.get((field_id, keyword_id))
+        if row is not None:
+            return row
+        if self.num_rows == self.counts.shape[0]:
+            # 행은 두 배씩 늘려 재할당 횟수를 줄인다.
+            capacity = max(1024, self.num_rows * 2)
+            counts = np.zeros((capacity, self.num_buckets), dtype=np.uint32)
+            counts[:self.num_rows] = self.counts[:self.num_rows]
+            row_keys = np.zeros((capacity, 2), dtype=np.int64)
+            row_keys[:self.num_rows] = self.row_keys[:self.num_rows]
+            self.counts, self.row_keys = counts, row_keys
+        row = self.num_rows
+        self.row_keys[row] = (field_id, keyword_id)
+        self._rows[(field_id, keyword_id)] = row
+        self.num_rows += 1
+        return row
+
+    def _clear_buckets(self, days) -> None:
+        buckets = np.array([d % self.num_buckets for d in days], dtype=np.intp)
+        if buckets.size:
+            self.counts[:self.num_rows, buckets] = 0
+
+    def advance(self, day: int) -> None:
+        """
+        head_day를 day로 옮기며 그 사이 날짜의 버킷을 비운다.
+        """
+        if self.head_day is None:
+            self.counts[...] = 0
+            self.head_day = day
+            return
+        if day <= self.head_day:
+            return
+        steps = min(day - self.head_day, self.num_buckets)
+        self._clear_buckets(range(day - steps + 1, day + 1))
+        self.head_day = day
+
+    def _in_window(self, day: int) -> bool:
+        return self.head_day is not None and self.head_day - self.num_buckets < day <= self.head_day
+
+    def set_counts(self, field_ids: np.ndarray, keyword_ids: np.ndarray, days: np.ndarray, counts: np.ndarray) -> None:
+        """
+        (분야, 키워드, 날짜)별 카운트를 그대로 기록 (KEYWORD_DAILY_COUNTS 동기화용, 여러 번 적용해도 같은 결과)
+        링 버퍼 범위를 벗어난 오래된 날짜는 무시한다.
+        """
+        field_ids, keyword_ids, days, counts = map(np.asarray, (field_ids, keyword_ids, days, counts))
+        if days.size == 0:
+            return
+        self.advance(int(days.max()))
+        keep = (days > self.head_day - self.num_buckets) & (days <= self.head_day)
+        field_ids, keyword_ids, days, counts = field_ids[keep], keyword_ids[keep], days[keep], counts[keep]
+        if days.size == 0:
+            return
+        pairs, inverse = np.unique(np.stack([field_ids, keyword_ids], axis=1), axis=0, return_inverse=True)
+        rows = np.array([self._row(int(field_id), int(keyword_id)) for field_id, keyword_id in pairs], dtype=np.intp)
+        self.counts[rows[inverse.reshape(-1)], days % self.num_buckets] = counts
+
+    def add(self, field_id: int, keyword_id: int, day: int, count: int = 1) -> None:
+        """
+        카운터 하나를 count만큼 증가 (O(1))
+        """
+        self.advance(day)
+        if not self._in_window(day):
+            return
+        self.counts[self._row(field_id, keyword_id), day % self.num_buckets] += count
+
+    def compact(self) -> int:
+        """
+        기간 안의 카운트가 모두 0인 행을 지운다. 지운 행 수를 반환
+        """
+        keep = np.flatnonzero(self.counts[:self.num_rows].any(axis=1))
+        removed = self.num_rows - keep.size
+        if removed:
+            self.counts = self.counts[keep]
+            self.row_keys = self.row_keys[keep]
+            self.num_rows = keep.size
+            self._rows = {(int(field_id), int(keyword_id)): row for row, (field_id, keyword_id) in enumerate(self.row_keys.tolist())}
+        return removed
+
+    def window_counts(self, days: int, end_day: Optional[int] = None, field_id: Optional[int] = None) -> tuple[np.ndarray, np.ndarray]:
+        """
+        end_day(포함)까지 days 일 동안의 키워드별 합계 (field_id가 None이면 전체 분야)
+
+        Returns:
+            (keyword_ids, counts). 기간 안에 행이 있는 키워드만 keyword_id 순으로 담는다.
+        """
+        keyword_ids, counts = self._window_counts([days], [end_day], field_id)
+        return keyword_ids, counts[0]
+
+    def _window_counts(self, lengths: list[int], end_days: list[Optional[int]], field_id: Optional[int]) -> tuple[np.ndarray, np.ndarray]:
+        # 여러 구간의 키워드별 합계를 같은 keyword_ids 순서로 한 번에 계산
+        row_keys = self.row_keys[:self.num_rows]
+        rows = np.arange(self.num_rows) if field_id is None else np.flatnonzero(row_keys[:, 0] == field_id)
+        keyword_ids, inverse = np.unique(row_keys[rows, 1], return_inverse=True)
+        totals = np.zeros((len(lengths), keyword_ids.size), dtype=np.int64)
+        if self.head_day is None:
+            return keyword_ids, totals
+        for i, (days, end_day) in enumerate(zip(lengths, end_days)):
+            end_day = self.head_day if end_day is None else end_day
+            buckets = np.array([d % self.num_buckets for d in range(end_day - days + 1, end_day + 1) if self._in_window(d)], dtype=np.intp)
+            if buckets.size and rows.size:
+                totals[i] = np.bincount(inverse.reshape(-1), weights=self.counts[np.ix_(rows, buckets)].sum(axis=1, dtype=np.int64),
+                                        minlength=keyword_ids.size)
+        return keyword_ids, totals
+
+    def top_rising(self, k: int = 10, days: int = 7, field_id: Optional[int] = None,
+                   end_day: Optional[int] = None, min_count: int = 2) -> list[dict]:
+        """
+        최근 days 일과 그 직전 days 일을 비교해 가장 많이 늘어난 키워드 k개를 반환
+
+        점수는 (현재 - 이전) / sqrt(이전 + 1)로, 원래 드물던 키워드의 작은 증가보다
+        꾸준히 언급되던 키워드의 급증을 과대평가하지 않도록 이전 값의 크기로 나눈다.
+        """
+        end_day = self.head_day if end_day is None else end_day
+        if end_day is None:
+            return []
+        keyword_ids, (current, previous) = self._window_counts([days, days], [end_day, end_day - days], field_id)
+        scores = (current - previous) / np.sqrt(previous + 1)
+        scores[current < min_count] = -np.inf
+
+        k = min(k, int(np.isfinite(scores).sum()))
+        if k <= 0:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [{
+            'keyword_id': int(keyword_ids[index]),
+            'keyword': self.keyword_names.get(int(keyword_ids[index])),
+            'count': int(current[index]),
+            'previous_count': int(previous[index]),
+            'score': float(scores[index]),
+        } for index in top]
+
+    def sync_from_db(self, db, since: Optional[date] = None) -> int:
+        """
+        KEYWORD_DAILY_COUNTS에서 링 버퍼 기간(또는 since 이후)의 일별 카운트를 읽어 덮어쓰고,
+        키워드/분야 이름도 함께 갱신한다. 동기화한 행 수를 반환
+        """
+        from models.db_models import Keyword, KeywordDailyCount, Fields
+
+        current_day = today()
+        if since is None:
+            since = current_day - timedelta(days=self.num_buckets - 1)
+        rows = (
+            db.query(KeywordDailyCount.field_id, KeywordDailyCount.keyword_id, KeywordDailyCount.day, KeywordDailyCount.post_count)
+            .filter(KeywordDailyCount.day >= since)
+            .all()
+        )
+        # DB가 원본이므로 동기화 구간의 버킷은 비우고 다시 채운다.
+        self.advance(day_number(current_day))
+        self._clear_buckets(range(max(day_number(since), self.head_day - self.num_buckets + 1), self.head_day + 1))  # type: ignore
+        if rows:
+            field_ids, keyword_ids, days, counts = zip(*rows)
+            self.set_counts(
+                np.array(field_ids, dtype=np.int64),
+                np.array(keyword_ids, dtype=np.int64),
+                np.array([day_number(day) for day in days], dtype=np.int64),
+                np.array(counts, dtype=np.uint32),
+            )
+        self.compact()
+
+        active = set(self.row_keys[:self.num_rows, 1].tolist())
+        self.keyword_names = {keyword_id: name for keyword_id, name in self.keyword_names.items() if keyword_id in active}
+        new_ids = active - self.keyword_names.keys()
+        if new_ids:
+            for keyword_id, keyword in db.query(Keyword.id, Keyword.keyword).filter(Keyword.id.in_(new_ids)).all():
+                self.keyword_names[keyword_id] = keyword
+        self.field_names = {field.field_id: field.field_name.strip() for field in db.query(Fields).all()}
+        return len(rows)
+
+    def save(self, path: str = TREND_COUNTER_PATH) -> None:
+        os.makedirs(path, exist_ok=True)
+        for name, array in (("counts", self.counts[:self.num_rows]), ("row_keys", self.row_keys[:self.num_rows])):
+            tmp_path = os.path.join(path, f"{name}.tmp.npy")
+            np.save(tmp_path, array)
+            os.replace(tmp_path, os.path.join(path, f"{name}.npy"))
+        meta = {
+            'num_buckets': self.num_buckets,
+            'head_day': self.head_day,
+            'keyword_names': {str(keyword_id): name for keyword_id, name in self.keyword_names.items()},
+            'field_names': {str(field_id): name for field_id, name in self.field_names.items()},
+        }
+        tmp_path = os.path.join(path, "meta.json.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(meta, f, ensure_ascii=False)
+        os.replace(tmp_path, os.path.join(path, "meta.json"))
+
+    @classmethod
+    def load(cls, path: str = TREND_COUNTER_PATH, mmap_mode: Optional[str] = None) -> "TrendCounter":
+        """
+        저장된 카운터를 불러온다. 없거나 예전 형식(분야 x 키워드 x 일 배열)이면 빈 카운터를 반환
+        (다음 sync_from_db가 기간 전체를 다시 채운다)
+        mmap_mode='r'이면 배열을 메모리 맵으로 열어 조회만 한다.
+        """
+        meta_path = os.path.join(path, "meta.json")
+        row_keys_path = os.path.join(path, "row_keys.npy")
+        if not os.path.exists(meta_path) or not os.path.exists(row_keys_path):
+            return cls()
+        with open(meta_path, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        counter = cls(num_buckets=meta['num_buckets'])
+        counter.counts = np.load(os.path.join(path, "counts.npy"), mmap_mode=mmap_mode)
+        counter.row_keys = np.load(row_keys_path)
+        counter.num_rows = counter.row_keys.shape[0]
+        counter._rows = {(int(field_id), int(keyword_id)): row for row, (field_id, keyword_id) in enumerate(counter.row_keys.tolist())}
+        counter.head_day = meta['head_day']
+        counter.keyword_names = {int(keyword_id): name for keyword_id, name in meta['keyword_names'].items()}
+        counter.field_names = {int(field_id): name for field_id, name in meta['field_names'].items()}
+        return counter
@@ -0,0 +1,119 @@
+import os
+import logging
+from datetime import date
+from typing import Optional
+
+import pyarrow as pa
+
+from services.lake import LAKE_BACKEND, LAKE_ROOT, S3_BUCKET_NAME, S3_ENDPOINT_URL, RAW_PREFIX, KEYWORDS_PREFIX
+
+logger = logging.getLogger(__name__)
+
+
+def connect(database: str = ":memory:"):
+    """
+    Parquet 레이크를 조회할 DuckDB 연결을 만든다.
+    s3 백엔드면 httpfs를 불러오고 환경 변수의 자격 증명/엔드포인트(MinIO 등)를 설정한다.
+    """
+    import duckdb
+
+    conn = duckdb.connect(database)
+    if LAKE_BACKEND == "local":
+        return conn
+
+    conn.execute("INSTALL httpfs")
+    conn.execute("LOAD httpfs")
+    options = {"TYPE": "s3"}
+    region = os.getenv("AWS_REGION") or os.getenv("AWS_DEFAULT_REGION")
+    if region:
+        options["REGION"] = region
+    if os.getenv("AWS_ACCESS_KEY_ID"):
+        options["KEY_ID"] = os.getenv("AWS_ACCESS_KEY_ID")
+        options["SECRET"] = os.getenv("AWS_SECRET_ACCESS_KEY", "")
+    else:
+        conn.execute("INSTALL aws")
+        conn.execute("LOAD aws")
+        options["PROVIDER"] = "credential_chain"
+    if S3_ENDPOINT_URL:
+        endpoint = S3_ENDPOINT_URL.split("://", 1)[-1]
+        options["ENDPOINT"] = endpoint
+        options["URL_STYLE"] = "path"
+        options["USE_SSL"] = "true" if S3_ENDPOINT_URL.startswith("https") else "false"
+
+    secret = ", ".join(f"{key} '{value}'" if key not in ("TYPE", "PROVIDER", "USE_SSL") else f"{key} {value}"
+                       for key, value in options.items())
+    conn.execute(f"CREATE OR REPLACE SECRET lake ({secret})")
+    return conn
+
+
+def dataset_glob(prefix: str) -> str:
+    """
+    prefix 아래 dt= 파티션의 Parquet 파일 glob 경로
+    """
+    if LAKE_BACKEND == "local":
+        return f"{LAKE_ROOT}/{prefix}/dt=*/*.parquet"
+    return f"s3://{S3_BUCKET_NAME}/{prefix}/dt=*/*.parquet"
+
+
+def scan(prefix: str) -> str:
+    """
+    FROM 절에 넣을 read_parquet 식 (hive 파티션의 dt 컬럼 포함, 파일마다 다른 스키마는 이름 기준으로 합친다)
+    """
+    return f"read_parquet('{dataset_glob(prefix)}', hive_partitioning = true, union_by_name = true)"
+
+
+def query(sql: str, params: Optional[list] = None, conn=None) -> pa.Table:
+    """
+    SQL을 실행해 Arrow Table로 반환. sql 안의 {raw}, {keywords}는 각 데이터셋의 read_parquet 식으로 바뀐다.
+
+    dt 조건은 파일 경로 단계에서 파티션을 거르고(partition pruning),
+    SELECT에 쓴 컬럼만 Parquet에서 읽는다(projection pushdown).
+    """
+    conn = conn or connect()
+    sql = sql.format(raw=scan(RAW_PREFIX), keywords=scan(KEYWORDS_PREFIX))
+    return conn.execute(sql, params or []).fetch_arrow_table()
+
+
+def keyword_counts(start: date, end: date, by_category: bool = True, limit: int = 100, conn=None) -> pa.Table:
+    """
+    기간 내 날짜(dt)별, (카테고리별) 키워드 언급 포스트 수
+    """
+    group = "dt, category, keyword" if by_category else "dt, keyword"
+    return query(f"""
+        SELECT {group}, count(DISTINCT post_id) AS posts
+        FROM {{keywords}}
+        WHERE dt BETWEEN ? AND ? AND keyword IS NOT NULL
+        GROUP BY {group}
+        ORDER BY dt, posts DESC
+        LIMIT ?
+    """, [start, end, limit], conn=conn)
+
+
+def top_keywords(start: date, end: date, limit: int = 20, conn=None) -> pa.Table:
+    """
+    기간 전체에서 가장 많이 언급된 키워드
+    """
+    return query("""
+        SELECT keyword, count(DISTINCT post_id) AS posts, count(DISTINCT dt) AS active_days
+        FROM {keywords}
+        WHERE dt BETWEEN ? AND ? AND keyword IS NOT NULL
+        GROUP BY keyword
+        ORDER BY posts DESC
+        LIMIT ?
+    """, [start, end, limit], conn=conn)
+
+
+def source_activity(start: date, end: date, conn=None) -> pa.Table:
+    """
+    기간 내 플랫폼(source)별 수집 글 수와 마지막 게시/수집 시각
+    """
+    return query("""
+        SELECT decode(from_base64(source)) AS platform,
+               count(DISTINCT encoded_url) AS posts,
+               count(DISTINCT dt) AS active_days,
+               max(created_at) AS last_collected_at
+        FROM {raw}
+        WHERE dt BETWEEN ? AND ? AND encoded_url IS NOT NULL
+        GROUP BY source
+        ORDER BY posts DESC
+    """, [start, end], conn=conn)
@@ -0,0 +1,328 @@
+import io
+import os
+import logging
+from itertools import islice
+from typing import Any, Iterable, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+# COPY 한 번에 보낼 행 수. 메모리 사용량이 이 크기를 넘지 않는다.
+COPY_CHUNK_SIZE = int(os.getenv("COPY_CHUNK_SIZE", "5000"))
+
+# EXTERNAL_POSTS 적재용 임시 테이블 컬럼
+POST_STAGING_COLUMNS = {
+    'id': 'text',
+    'source': 'text',
+    'title': 'text',
+    'url': 'text',
+    'published_at': 'timestamptz',
+    'collected_at': 'timestamptz',
+}
+
+
+def _copy_value(value: Any) -> str:
+    """
+    COPY text 형식의 필드 값으로 변환 (None은 NULL)
+    """
+    if value is None:
+        return "\\N"
+    return (str(value)
+            .replace("\\", "\\\\")
+            .replace("\t", "\\t")
+            .replace("\n", "\\n")
+            .replace("\r", "\\r"))
+
+
+def _chunks(rows: Iterable[Sequence], size: int):
+    rows = iter(rows)
+    while chunk := list(islice(rows, size)):
+        yield chunk
+
+
+def create_staging_table(cursor, name: str, columns: dict[str, str]) -> None:
+    """
+    트랜잭션이 끝나면 사라지는 임시 테이블을 만든다.
+    같은 트랜잭션에서 다시 호출되면 이미 있는 테이블을 비워서 쓴다.
+    """
+    definition = ", ".join(f'"{column}" {type_}' for column, type_ in columns.items())
+    cursor.execute(f'CREATE TEMP TABLE IF NOT EXISTS "{name}" ({definition}) ON COMMIT DROP')
+    cursor.execute(f'TRUNCATE "{name}"')
+
+
+def copy_rows(cursor, table: str, columns: Sequence[str], rows: Iterable[Sequence], chunk_size: int = COPY_CHUNK_SIZE) -> int:
+    """
+    rows(컬럼 순서의 튜플)를 chunk_size 개씩 COPY FROM STDIN으로 table에 적재하고 적재한 행 수를 반환
+
+    Args:
+        cursor: psycopg2 cursor (호출한 쪽의 트랜잭션 안에서 실행된다)
+    """
+    column_list = ", ".join(f'"{column}"' for column in columns)
+    statement = f'COPY "{table}" ({column_list}) FROM STDIN'
+    total = 0
+    for chunk in _chunks(rows, chunk_size):
+        buffer = io.StringIO()
+        buffer.writelines("\t".join(map(_copy_value, row)) + "\n" for row in chunk)
+        buffer.seek(0)
+        cursor.copy_expert(statement, buffer)
+        total += len(chunk)
+    return total
+
+
+def bulk_insert_posts(cursor, rows: Iterable[Sequence], chunk_size: int = COPY_CHUNK_SIZE) -> tuple[int, int]:
+    """
+    (id, source, title, url, published_at, collected_at) 튜플들을 임시 테이블에 COPY로 적재한 뒤
+    INSERT ... SELECT ... ON CONFLICT DO NOTHING 한 번으로 EXTERNAL_POSTS에 병합
+
+    Returns:
+        (삽입된 행 수, 이미 있어서 건너뛴 행 수)
+    """
+    create_staging_table(cursor, "_posts_staging", POST_STAGING_COLUMNS)
+    total = copy_rows(cursor, "_posts_staging", list(POST_STAGING_COLUMNS), rows, chunk_size)
+    # is_analyzed는 ORM 쪽 기본값이라 직접 FALSE로 넣어야 분석 대상으로 조회된다.
+    cursor.execute('''
+        INSERT INTO "EXTERNAL_POSTS" (id, source, title, url, published_at, collected_at, is_analyzed)
+        SELECT DISTINCT ON (id) id, source, title, url, published_at, collected_at, FALSE
+        FROM "_posts_staging"
+        ORDER BY id
+        ON CONFLICT (id) DO NOTHING
+    ''')
+    inserted = cursor.rowcount
+    return inserted, total - inserted
+
+
+# 분석 결과 적재용 임시 테이블 컬럼
+RESULT_STAGING_COLUMNS = {
+    'id': 'text',
+    'category': 'text',
+    'summary': 'text',
+    'field_id': 'integer',
+    'analyzed_by': 'text',
+}
+
+# 재분석으로 분야가 바뀐 포스트의 일별 집계 이동분
+FIELD_MOVE_COLUMNS = {
+    'keyword_id': 'integer',
+    'day': 'date',
+    'old_field_id': 'integer',
+    'new_field_id': 'integer',
+    'post_count': 'bigint',
+}
+
+MAPPING_STAGING_COLUMNS = {
+    'keyword_id': 'integer',
+    'post_id': 'text',
+}
+
+# keyword → KEYWORDS.id 캐시. 워커 프로세스가 살아 있는 동안 실행 간에 재사용한다.
+# 커밋이 끝난 id만 remember_keyword_ids로 넣는다.
+_keyword_ids: dict[str, int] = {}
+
+
+def remember_keyword_ids(keyword_ids: dict[str, int]) -> None:
+    _keyword_ids.update(keyword_ids)
+
+
+def forget_keyword_ids() -> None:
+    _keyword_ids.clear()
+
+
+def resolve_keyword_ids(cursor, keywords: Iterable[str], chunk_size: int = COPY_CHUNK_SIZE) -> dict[str, int]:
+    """
+    키워드를 매핑할 KEYWORDS.id를 반환 (master_id가 있으면 대표 키워드의 id). 캐시에 없는 키워드만 chunk_size 개씩
+    INSERT ... ON CONFLICT DO UPDATE ... RETURNING 한 번으로 삽입과 id 조회를 함께 처리한다.
+    (DO NOTHING은 이미 있던 행의 id를 돌려주지 않는다)
+    """
+    from psycopg2.extras import execute_values
+
+    keywords = set(keywords)
+    resolved = {keyword: _keyword_ids[keyword] for keyword in keywords if keyword in _keyword_ids}
+    missing = sorted(keywords - resolved.keys())
+    for chunk in _chunks(missing, chunk_size):
+        rows = execute_values(cursor, '''
+            INSERT INTO "KEYWORDS" (keyword) VALUES %s
+            ON CONFLICT (keyword) DO UPDATE SET keyword = EXCLUDED.keyword
+            RETURNING keyword, COALESCE(master_id, id)
+        ''', [(keyword,) for keyword in chunk], page_size=len(chunk), fetch=True)
+        resolved.update(rows)
+    return resolved
+
+
+def set_keyword_masters(cursor, pairs: Iterable[Sequence], chunk_size: int = COPY_CHUNK_SIZE) -> int:
+    """
+    (keyword_id, master_id) 쌍으로 아직 master_id가 없는 키워드의 대표 키워드를 지정
+
+    같은 트랜잭션에서 대표 키워드를 한 단계로 평탄화한다. (X→Y, Y→Z 이면 X→Z)
+    resolve_keyword_ids는 master_id를 한 단계만 따라가므로 사슬이 남으면 안 된다.
+
+    Returns:
+        변경된 키워드 수
+    """
+    from psycopg2.extras import execute_values
+
+    updated = 0
+    for chunk in _chunks(pairs, chunk_size):
+        execute_values(cursor, '''
+            UPDATE "KEYWORDS" AS k SET master_id = v.master_id
+            FROM (VALUES %s) AS v (id, master_id)
+            WHERE k.id = v.id AND k.master_id IS NULL AND k.id <> v.master_id
+        ''', chunk, page_size=len(chunk))
+        updated += cursor.rowcount
+
+    # 대표 키워드에 다시 대표가 생긴 경우 그 대표를 따르던 키워드를 최종 대표로 옮긴다.
+    # 한 번에 한 단계씩 줄어들므로 사슬 길이만큼 반복한다. (자기 자신을 가리키게 되는 순환은 건너뛴다)
+    while True:
+        cursor.execute('''
+            UPDATE "KEYWORDS" AS k SET master_id = m.master_id
+            FROM "KEYWORDS" AS m
+            WHERE k.master_id = m.id AND m.master_id IS NOT NULL AND m.master_id <> k.id
+        ''')
+        if cursor.rowcount == 0:
+            break
+    return updated
+
+
+def merge_keyword_mappings(cursor) -> int:
+    """
+    master_id가 있는 키워드의 EXTERNAL_POSTS_KEYWORDS 매핑을 대표 키워드로 옮긴다.
+    (대표 키워드에 이미 같은 포스트가 매핑되어 있으면 원래 매핑만 지운다)
+    삭제와 삽입을 한 쿼리로 처리해 지운 매핑만 옮긴다. (그 사이 다른 트랜잭션이 넣은 매핑을 옮기지 않고 지우는 일이 없다)
+    이후 KEYWORD_DAILY_COUNTS는 rebuild_keyword_daily_counts로 다시 계산해야 한다.
+
+    Returns:
+        옮겨진(삭제된) 매핑 수
+    """
+    cursor.execute('''
+        WITH moved AS (
+            DELETE FROM "EXTERNAL_POSTS_KEYWORDS" AS m
+            USING "KEYWORDS" AS k
+            WHERE k.id = m.keyword_id AND k.master_id IS NOT NULL
+            RETURNING k.master_id, m.post_id
+        ), inserted AS (
+            INSERT INTO "EXTERNAL_POSTS_KEYWORDS" (keyword_id, post_id)
+            SELECT DISTINCT master_id, post_id FROM moved
+            ON CONFLICT DO NOTHING
+        )
+        SELECT count(*) FROM moved
+    ''')
+    return cursor.fetchone()[0]
+
+
+def update_analyzed_posts(cursor, rows: Iterable[Sequence], chunk_size: int = COPY_CHUNK_SIZE,
+                          replace_keywords_of: Optional[str] = None) -> int:
+    """
+    (id, category, summary, field_id, analyzed_by) 튜플들을 임시 테이블에 COPY로 적재한 뒤
+    UPDATE ... FROM 한 번으로 EXTERNAL_POSTS에 반영하고 is_analyzed를 TRUE로 바꾼다.
+
+    이미 키워드가 매핑된 포스트(재분석)의 분야가 바뀌면 KEYWORD_DAILY_COUNTS의 해당 집계도
+    이전 분야에서 새 분야로 옮긴다. (같은 트랜잭션에서 빼기와 더하기를 따로 실행)
+    replace_keywords_of가 주어지면 그 주체(예: 'local')가 분석했던 포스트는 기존 키워드 매핑과 집계를 먼저 지운다.
+    (새 결과의 매핑은 insert_post_keywords가 넣는다)
+
+    Returns:
+        업데이트된 행 수
+    """
+    create_staging_table(cursor, "_results_staging", RESULT_STAGING_COLUMNS)
+    copy_rows(cursor, "_results_staging", list(RESULT_STAGING_COLUMNS), rows, chunk_size)
+    if replace_keywords_of is not None:
+        cursor.execute('''
+            WITH removed AS (
+                DELETE FROM "EXTERNAL_POSTS_KEYWORDS" AS m
+                USING "EXTERNAL_POSTS" AS p
+                WHERE m.post_id = p.id AND p.analyzed_by = %s AND p.id IN (SELECT id FROM "_results_staging")
+                RETURNING m.keyword_id,
+                          (COALESCE(p.published_at, p.collected_at) AT TIME ZONE 'Asia/Seoul')::date AS day,
+                          COALESCE(p.field_id, 0) AS field_id
+            )
+            UPDATE "KEYWORD_DAILY_COUNTS" AS c SET post_count = c.post_count - r.post_count
+            FROM (SELECT keyword_id, day, field_id, count(*) AS post_count FROM removed GROUP BY 1, 2, 3) AS r
+            WHERE c.keyword_id = r.keyword_id AND c.day = r.day AND c.field_id = r.field_id
+        ''', (replace_keywords_of,))
+    create_staging_table(cursor, "_field_moves", FIELD_MOVE_COLUMNS)
+    cursor.execute('''
+        INSERT INTO "_field_moves" (keyword_id, day, old_field_id, new_field_id, post_count)
+        SELECT m.keyword_id,
+               (COALESCE(p.published_at, p.collected_at) AT TIME ZONE 'Asia/Seoul')::date,
+               COALESCE(p.field_id, 0),
+               COALESCE(s.field_id, 0),
+               count(*)
+        FROM (SELECT DISTINCT ON (id) id, field_id FROM "_results_staging" ORDER BY id) AS s
+        JOIN "EXTERNAL_POSTS" AS p ON p.id = s.id
+        JOIN "EXTERNAL_POSTS_KEYWORDS" AS m ON m.post_id = p.id
+        WHERE COALESCE(p.field_id, 0) <> COALESCE(s.field_id, 0)
+        GROUP BY 1, 2, 3, 4
+    ''')
+    # 빼기와 더하기를 한 문장에서 하면 분야를 맞바꾼 포스트들(1→2, 2→1)의 집계 행이 두 번 갱신되어 한쪽이 사라진다.
+    cursor.execute('''
+        UPDATE "KEYWORD_DAILY_COUNTS" AS c SET post_count = c.post_count - r.post_count
+        FROM (SELECT keyword_id, day, old_field_id, sum(post_count) AS post_count FROM "_field_moves" GROUP BY 1, 2, 3) AS r
+        WHERE c.keyword_id = r.keyword_id AND c.day = r.day AND c.field_id = r.old_field_id
+    ''')
+    cursor.execute('''
+        INSERT INTO "KEYWORD_DAILY_COUNTS" (keyword_id, day, field_id, post_count)
+        SELECT keyword_id, day, new_field_id, sum(post_count) FROM "_field_moves" GROUP BY 1, 2, 3
+        ON CONFLICT (keyword_id, day, field_id)
+        DO UPDATE SET post_count = "KEYWORD_DAILY_COUNTS".post_count + EXCLUDED.post_count
+    ''')
+    cursor.execute('''
+        UPDATE "EXTERNAL_POSTS" AS p
+        SET category = s.category, summary = s.summary, field_id = s.field_id, analyzed_by = s.analyzed_by, is_analyzed = TRUE
+        FROM "_results_staging" AS s
+        WHERE p.id = s.id
+    ''')
+    return cursor.rowcount
+
+
+def insert_post_keywords(cursor, rows: Iterable[Sequence], chunk_size: int = COPY_CHUNK_SIZE) -> tuple[int, int]:
+    """
+    (keyword_id, post_id) 튜플들을 임시 테이블에 COPY로 적재한 뒤
+    INSERT ... SELECT ... ON CONFLICT DO NOTHING 한 번으로 EXTERNAL_POSTS_KEYWORDS에 병합
+
+    같은 쿼리에서 새로 삽입된 매핑만 키워드 x 게시일 x 분야별로 세어 KEYWORD_DAILY_COUNTS에 더한다.
+    집계 비용은 전체 이력이 아니라 이번에 추가된 매핑 수에 비례한다.
+
+    Returns:
+        (새로 삽입된 매핑 수, 갱신된 집계 행 수)
+    """
+    create_staging_table(cursor, "_mappings_staging", MAPPING_STAGING_COLUMNS)
+    copy_rows(cursor, "_mappings_staging", list(MAPPING_STAGING_COLUMNS), rows, chunk_size)
+    cursor.execute('''
+        WITH inserted AS (
+            INSERT INTO "EXTERNAL_POSTS_KEYWORDS" (keyword_id, post_id)
+            SELECT DISTINCT keyword_id, post_id FROM "_mappings_staging"
+            ON CONFLICT DO NOTHING
+            RETURNING keyword_id, post_id
+        ), counted AS (
+            INSERT INTO "KEYWORD_DAILY_COUNTS" (keyword_id, day, field_id, post_count)
+            SELECT i.keyword_id,
+                   (COALESCE(p.published_at, p.collected_at) AT TIME ZONE 'Asia/Seoul')::date,
+                   COALESCE(p.field_id, 0),
+                   count(*)
+            FROM inserted AS i
+            JOIN "EXTERNAL_POSTS" AS p ON p.id = i.post_id
+            GROUP BY 1, 2, 3
+            ON CONFLICT (keyword_id, day, field_id)
+            DO UPDATE SET post_count = "KEYWORD_DAILY_COUNTS".post_count + EXCLUDED.post_count
+            RETURNING 1
+        )
+        SELECT (SELECT count(*) FROM inserted), (SELECT count(*) FROM counted)
+    ''')
+    inserted, counted = cursor.fetchone()
+    return inserted, counted
+
+
+def rebuild_keyword_daily_counts(cursor) -> int:
+    """
+    KEYWORD_DAILY_COUNTS를 EXTERNAL_POSTS_KEYWORDS 전체에서 다시 계산 (최초 적재나 정합성 복구용)
+    """
+    cursor.execute('TRUNCATE "KEYWORD_DAILY_COUNTS"')
+    cursor.execute('''
+        INSERT INTO "KEYWORD_DAILY_COUNTS" (keyword_id, day, field_id, post_count)
+        SELECT m.keyword_id,
+               (COALESCE(p.published_at, p.collected_at) AT TIME ZONE 'Asia/Seoul')::date,
+               COALESCE(p.field_id, 0),
+               count(*)
+        FROM "EXTERNAL_POSTS_KEYWORDS" AS m
+        JOIN "EXTERNAL_POSTS" AS p ON p.id = m.post_id
+        GROUP BY 1, 2, 3
+    ''')
+    return cursor.rowcount
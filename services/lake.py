@@ -0,0 +1,187 @@
+import os
+import bisect
+import logging
+from typing import Iterable, Optional
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.fs as pafs
+import pyarrow.parquet as pq
+
+logger = logging.getLogger(__name__)
+
+# Parquet 저장소 백엔드: "s3" (운영) | "local" (테스트, LAKE_ROOT 디렉터리)
+LAKE_BACKEND = os.getenv("LAKE_BACKEND", "s3")
+LAKE_ROOT = os.getenv("LAKE_ROOT", "/opt/prefect/blog_data/lake")
+S3_BUCKET_NAME = os.getenv("S3_BUCKET_NAME", "jandi-post-bucket")
+# MinIO 등 로컬 S3 호환 서버를 쓸 때 지정 (예: localhost:9000)
+S3_ENDPOINT_URL = os.getenv("S3_ENDPOINT_URL")
+# Parquet 행 그룹 크기 (행 수)
+ROW_GROUP_SIZE = int(os.getenv("LAKE_ROW_GROUP_SIZE", "65536"))
+
+# 데이터셋별 prefix. 각 prefix 아래 dt=YYYY-MM-DD 파티션에 Parquet 파일이 쌓인다.
+RAW_PREFIX = "blog-data/raw"            # 수집 원본 기사
+KEYWORDS_PREFIX = "blog-data/keywords"  # 키워드 추출 결과
+# 데이터셋별 정렬 키 (행 그룹 min/max 통계로 id 조회 범위를 좁힌다)
+SORT_KEYS = {RAW_PREFIX: "encoded_url", KEYWORDS_PREFIX: "post_id"}
+# 반복 값이 많은 컬럼만 dictionary 인코딩
+DICTIONARY_COLUMNS = {RAW_PREFIX: ["source"], KEYWORDS_PREFIX: ["keyword", "category"]}
+
+
+def get_filesystem() -> tuple[pafs.FileSystem, str]:
+    """
+    현재 백엔드의 pyarrow 파일시스템과 기준 경로(버킷 또는 로컬 디렉터리)를 반환
+    """
+    if LAKE_BACKEND == "local":
+        return pafs.LocalFileSystem(), LAKE_ROOT
+
+    options = {}
+    region = os.getenv("AWS_REGION") or os.getenv("AWS_DEFAULT_REGION")
+    if region:
+        options["region"] = region
+    if S3_ENDPOINT_URL:
+        options["endpoint_override"] = S3_ENDPOINT_URL
+        options["scheme"] = "https" if S3_ENDPOINT_URL.startswith("https") else "http"
+    return pafs.S3FileSystem(**options), S3_BUCKET_NAME
+
+
+def write_parquet(obj_key: str, table: pa.Table, **write_options) -> str:
+    """
+    Arrow Table을 Parquet으로 써서 obj_key 위치에 저장하고 전체 경로를 반환
+    """
+    fs, base = get_filesystem()
+    path = f"{base}/{obj_key}"
+    if LAKE_BACKEND == "local":
+        fs.create_dir(os.path.dirname(path), recursive=True)
+    write_options.setdefault("compression", "snappy")
+    pq.write_table(table, path, filesystem=fs, **write_options)
+    return path
+
+
+def write_dataset(prefix: str, table: pa.Table, partition_date: str, name: str) -> str:
+    """
+    한 번의 실행 결과를 데이터셋(prefix)의 dt 파티션에 파일 하나로 저장하고 object key를 반환
+    정렬 키 순으로 정렬하고, 행 그룹 크기와 dictionary 인코딩 컬럼을 데이터셋별로 맞춘다.
+    """
+    sort_key = SORT_KEYS.get(prefix)
+    if sort_key and sort_key in table.column_names:
+        table = table.sort_by(sort_key)
+    obj_key = f"{prefix}/dt={partition_date}/{name}.parquet"
+    write_parquet(obj_key, table, row_group_size=ROW_GROUP_SIZE,
+                  use_dictionary=[c for c in DICTIONARY_COLUMNS.get(prefix, []) if c in table.column_names])
+    return obj_key
+
+
+def list_partition(prefix: str, partition_date: str) -> list[str]:
+    """
+    데이터셋 dt 파티션 안의 Parquet 파일 전체 경로 목록
+    """
+    fs, base = get_filesystem()
+    selector = pafs.FileSelector(f"{base}/{prefix}/dt={partition_date}", allow_not_found=True)
+    return sorted(info.path for info in fs.get_file_info(selector)
+                  if info.type == pafs.FileType.File and info.path.endswith(".parquet"))
+
+
+def list_partition_dates(prefix: str) -> list[str]:
+    """
+    데이터셋에 있는 dt 파티션 날짜 전체 (오름차순)
+    """
+    fs, base = get_filesystem()
+    selector = pafs.FileSelector(f"{base}/{prefix}", allow_not_found=True)
+    return sorted(name[len("dt="):] for name in (os.path.basename(info.path) for info in fs.get_file_info(selector)
+                                                 if info.type == pafs.FileType.Directory)
+                  if name.startswith("dt="))
+
+
+def compact_partition(prefix: str, partition_date: str, name: str) -> Optional[str]:
+    """
+    dt 파티션의 작은 파일들을 정렬된 큰 파일 하나(name)로 합치고 원본 파일을 지운 뒤 새 object key를 반환
+    합칠 파일이 없으면 None
+
+    수집 원본 prefix에 섞여 있던 예전 키워드 결과 파일(encoded_url 컬럼이 없는 파일)은
+    키워드 데이터셋으로 옮긴다.
+    """
+    fs, base = get_filesystem()
+    paths = list_partition(prefix, partition_date)
+    tables = {path: pq.read_table(path, filesystem=fs, partitioning=None) for path in paths}
+
+    moved = {}
+    if prefix == RAW_PREFIX:
+        moved = {path: table for path, table in tables.items() if "encoded_url" not in table.column_names}
+        for path in moved:
+            del tables[path]
+        if moved:
+            write_dataset(KEYWORDS_PREFIX, pa.concat_tables(moved.values(), promote_options="permissive"), partition_date, name)
+            logger.info(f"{len(moved)} keyword files moved from {prefix}/dt={partition_date} to {KEYWORDS_PREFIX}")
+
+    obj_key = None
+    if len(tables) > 1:
+        obj_key = write_dataset(prefix, pa.concat_tables(tables.values(), promote_options="permissive"), partition_date, name)
+    else:
+        tables = {}
+
+    written = {f"{base}/{obj_key}", f"{base}/{KEYWORDS_PREFIX}/dt={partition_date}/{name}.parquet"}
+    for path in [*tables, *moved]:
+        if path not in written:
+            fs.delete_file(path)
+    return obj_key
+
+
+def _row_group_may_contain(metadata: pq.RowGroupMetaData, column_index: int, sorted_ids: list[str]) -> bool:
+    """
+    행 그룹 통계(min/max)로 찾는 id가 있을 수 없는 행 그룹을 거른다.
+    encoded_url로 정렬해 쓴 파일에서 특히 효과가 크다.
+    """
+    stats = metadata.column(column_index).statistics
+    if stats is None or not stats.has_min_max:
+        return True
+    position = bisect.bisect_left(sorted_ids, stats.min)
+    return position < len(sorted_ids) and sorted_ids[position] <= stats.max
+
+
+def read_post_ids(obj_key: str) -> list[str]:
+    """
+    Parquet 객체의 encoded_url 컬럼만 읽어 id 목록을 반환 (encoded_url 컬럼이 없는 파일이면 빈 리스트)
+    """
+    fs, base = get_filesystem()
+    with fs.open_input_file(f"{base}/{obj_key}") as f:
+        parquet_file = pq.ParquetFile(f)
+        if "encoded_url" not in parquet_file.schema_arrow.names:
+            return []
+        return parquet_file.read(columns=["encoded_url"]).column(0).to_pylist()
+
+
+def read_posts(obj_key: str, target_ids: Iterable[str], columns: tuple[str, ...] = ("encoded_url", "rss_content")) -> pa.Table:
+    """
+    Parquet 객체에서 target_ids에 해당하는 행의 필요한 컬럼만 읽는다.
+
+    - 파일 전체를 받지 않고 footer와 필요한 행 그룹/컬럼 청크만 범위 요청(ranged read)으로 읽는다.
+    - 행 그룹마다 encoded_url 컬럼만 먼저 읽어 해시 조인(pc.is_in)으로 걸러내고,
+      일치하는 행이 있는 행 그룹에서만 나머지 컬럼을 읽는다. (encoded_url은 먼저 읽은 것을 그대로 쓴다)
+    """
+    sorted_ids = sorted(set(target_ids))
+    empty = pa.table({column: pa.array([], type=pa.string()) for column in columns})
+    if not sorted_ids:
+        return empty
+    value_set = pa.array(sorted_ids, type=pa.string())
+
+    fs, base = get_filesystem()
+    tables = []
+    with fs.open_input_file(f"{base}/{obj_key}") as f:
+        parquet_file = pq.ParquetFile(f)
+        id_index = parquet_file.schema_arrow.get_field_index("encoded_url")
+        for row_group in range(parquet_file.num_row_groups):
+            if not _row_group_may_contain(parquet_file.metadata.row_group(row_group), id_index, sorted_ids):
+                continue
+            ids = parquet_file.read_row_group(row_group, columns=["encoded_url"]).column(0)
+            mask = pc.is_in(ids, value_set=value_set)
+            if not pc.any(mask).as_py():
+                continue
+            others = [column for column in columns if column != "encoded_url"]
+            rest = parquet_file.read_row_group(row_group, columns=others).filter(mask) if others else None
+            matched = ids.filter(mask)
+            tables.append(pa.table({column: matched if column == "encoded_url" else rest.column(column) for column in columns}))  # type: ignore
+
+    if not tables:
+        return empty
+    return pa.concat_tables(tables)
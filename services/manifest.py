@@ -0,0 +1,143 @@
+import os
+import time
+import sqlite3
+import logging
+from contextlib import contextmanager
+from itertools import islice
+from typing import Iterable, Iterator
+
+logger = logging.getLogger(__name__)
+
+POST_MANIFEST_PATH = os.getenv("POST_MANIFEST_PATH", "/opt/prefect/blog_data/post_manifest.db")
+
+# SQLite 바인드 변수 한도보다 작게 나눠 조회
+_QUERY_CHUNK = 900
+
+
+class PostManifest():
+    """
+    post id(encoded_url) → 본문이 들어 있는 레이크 object key 매니페스트 (로컬 SQLite)
+
+    수집 원본 파일을 쓸 때와 파티션을 압축할 때 갱신한다.
+    객체 전체를 내려받지 않고도 필요한 기사가 어느 파일에 있는지 바로 찾는다.
+    """
+    def __init__(self, path: str = POST_MANIFEST_PATH) -> None:
+        self.path = path
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS posts ("
+                " post_id TEXT PRIMARY KEY,"
+                " obj_key TEXT NOT NULL)"
+            )
+            conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+            # 레이크에서 본문을 찾지 못한 포스트 (backlog flow가 매일 다시 읽지 않도록)
+            conn.execute("CREATE TABLE IF NOT EXISTS missing (post_id TEXT PRIMARY KEY, marked_at REAL NOT NULL)")
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def add(self, post_ids: Iterable[str], obj_key: str) -> None:
+        """
+        post_ids가 obj_key에 있음을 기록 (이미 있는 id는 새 object key로 덮어쓴다)
+        본문 없음 표시가 있던 id는 표시를 지운다.
+        """
+        post_ids = list(post_ids)
+        with self._connect() as conn:
+            conn.executemany(
+                "INSERT INTO posts (post_id, obj_key) VALUES (?, ?) "
+                "ON CONFLICT(post_id) DO UPDATE SET obj_key = excluded.obj_key",
+                ((post_id, obj_key) for post_id in post_ids),
+            )
+            conn.executemany("DELETE FROM missing WHERE post_id = ?", ((post_id,) for post_id in post_ids))
+
+    def mark_missing(self, post_ids: Iterable[str]) -> None:
+        """
+        레이크에서 본문을 찾지 못한 포스트로 표시 (add로 다시 기록되면 표시가 지워진다)
+        """
+        now = time.time()
+        with self._connect() as conn:
+            conn.executemany("INSERT OR REPLACE INTO missing (post_id, marked_at) VALUES (?, ?)",
+                             ((post_id, now) for post_id in post_ids))
+
+    def missing(self, post_ids: Iterable[str]) -> set[str]:
+        """
+        post_ids 중 본문 없음으로 표시된 id
+        """
+        post_ids = iter(post_ids)
+        marked: set[str] = set()
+        with self._connect() as conn:
+            while chunk := list(islice(post_ids, _QUERY_CHUNK)):
+                rows = conn.execute(
+                    f"SELECT post_id FROM missing WHERE post_id IN ({','.join('?' * len(chunk))})",
+                    chunk,
+                ).fetchall()
+                marked.update(post_id for post_id, in rows)
+        return marked
+
+    def locate(self, post_ids: Iterable[str]) -> dict[str, list[str]]:
+        """
+        post id들을 object key별로 묶어 반환 {obj_key: [post_id, ...]}
+        매니페스트에 없는 id는 결과에 포함되지 않는다.
+        """
+        post_ids = iter(post_ids)
+        located: dict[str, list[str]] = {}
+        with self._connect() as conn:
+            while chunk := list(islice(post_ids, _QUERY_CHUNK)):
+                rows = conn.execute(
+                    f"SELECT post_id, obj_key FROM posts WHERE post_id IN ({','.join('?' * len(chunk))})",
+                    chunk,
+                ).fetchall()
+                for post_id, obj_key in rows:
+                    located.setdefault(obj_key, []).append(post_id)
+        return located
+
+    def __len__(self) -> int:
+        with self._connect() as conn:
+            return conn.execute("SELECT COUNT(*) FROM posts").fetchone()[0]
+
+    def rebuild_from_lake(self, prefix: str) -> int:
+        """
+        레이크의 prefix 아래 모든 Parquet 파일에서 encoded_url 컬럼만 읽어 매니페스트를 다시 만든다.
+        (매니페스트 도입 전에 쓴 파일 반영용) 기록한 id 수를 반환
+        """
+        import pyarrow.fs as pafs
+        from services.lake import get_filesystem, read_post_ids
+
+        fs, base = get_filesystem()
+        selector = pafs.FileSelector(f"{base}/{prefix}", recursive=True, allow_not_found=True)
+        total = 0
+        for info in fs.get_file_info(selector):
+            if info.type != pafs.FileType.File or not info.path.endswith(".parquet"):
+                continue
+            obj_key = info.path[len(base) + 1:]
+            post_ids = read_post_ids(obj_key)
+            if not post_ids:
+                continue
+            self.add(post_ids, obj_key)
+            total += len(post_ids)
+        return total
+
+    @property
+    def backfilled(self) -> bool:
+        """
+        레이크 전체로 한 번 채웠는지 (수집 flow가 새 파일을 바로 기록하므로 비어 있지 않아도 예전 파일이 빠져 있을 수 있다)
+        """
+        with self._connect() as conn:
+            return conn.execute("SELECT 1 FROM meta WHERE key = 'backfilled_at'").fetchone() is not None
+
+    def backfill(self, prefix: str) -> int:
+        """
+        prefix 아래 전체 파일로 매니페스트를 채우고 완료 시각을 기록한다. 기록한 id 수를 반환
+        """
+        total = self.rebuild_from_lake(prefix)
+        with self._connect() as conn:
+            conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('backfilled_at', ?)", (str(time.time()),))
+        return total
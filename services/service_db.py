@@ -1,16 +1,133 @@
 import os
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, declarative_base
+import time
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Iterator
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import Session, sessionmaker, declarative_base
 from dotenv import load_dotenv
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 DATABASE_URL: str = str(os.getenv(
     "DATABASE_URL"
 ))
 
-engine = create_engine(DATABASE_URL)
+# flow의 ThreadPoolTaskRunner 동시 실행 수. 커넥션 풀 크기도 여기에 맞춘다.
+TASK_RUNNER_WORKERS = int(os.getenv("TASK_RUNNER_WORKERS", "4"))
+# 태스크 스레드마다 하나 + flow 스레드 하나
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", str(TASK_RUNNER_WORKERS + 1)))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", str(TASK_RUNNER_WORKERS)))
+# 커넥션을 기다리는 최대 시간 (초)
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+# 쿼리 하나의 최대 실행 시간 (ms, PostgreSQL만 적용)
+DB_STATEMENT_TIMEOUT_MS = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "120000"))
+# 커넥션 대기가 이 시간(초)을 넘으면 경고 로그
+DB_SLOW_CHECKOUT_SECONDS = float(os.getenv("DB_SLOW_CHECKOUT_SECONDS", "1.0"))
+
+
+def _engine_options(url: str) -> dict:
+    options = {
+        'pool_pre_ping': True,
+        'pool_size': DB_POOL_SIZE,
+        'max_overflow': DB_MAX_OVERFLOW,
+        'pool_timeout': DB_POOL_TIMEOUT,
+        'pool_recycle': DB_POOL_RECYCLE,
+    }
+    if make_url(url).get_backend_name() == "postgresql":
+        options['connect_args'] = {'options': f"-c statement_timeout={DB_STATEMENT_TIMEOUT_MS}"}
+    return options
+
+
+engine = create_engine(DATABASE_URL, **_engine_options(DATABASE_URL))
 
 DbSession = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
-Base = declarative_base()
\ No newline at end of file
+Base = declarative_base()
+
+
+class PoolMetrics():
+    """
+    커넥션 풀 사용량 카운터 (체크아웃 대기 시간, 사용 중인 커넥션 수)
+    """
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.active = 0
+        self.peak_active = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def on_checkout(self) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.active += 1
+            self.peak_active = max(self.peak_active, self.active)
+
+    def on_checkin(self) -> None:
+        with self._lock:
+            self.active = max(0, self.active - 1)
+
+    def record_wait(self, seconds: float) -> None:
+        with self._lock:
+            self.total_wait += seconds
+            self.max_wait = max(self.max_wait, seconds)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                'checkouts': self.checkouts,
+                'active': self.active,
+                'peak_active': self.peak_active,
+                'total_wait_seconds': round(self.total_wait, 3),
+                'max_wait_seconds': round(self.max_wait, 3),
+                'pool_size': DB_POOL_SIZE,
+                'max_overflow': DB_MAX_OVERFLOW,
+            }
+
+
+pool_metrics = PoolMetrics()
+
+
+@event.listens_for(engine, "checkout")
+def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+    pool_metrics.on_checkout()
+
+
+@event.listens_for(engine, "checkin")
+def _on_checkin(dbapi_connection, connection_record):
+    pool_metrics.on_checkin()
+
+
+@contextmanager
+def session_scope() -> Iterator[Session]:
+    """
+    세션 하나의 수명 주기를 관리
+    블록이 정상 종료되면 commit, 예외가 나면 rollback하고, 어느 경우든 커넥션을 풀에 돌려준다.
+
+        with session_scope() as db:
+            db.execute(...)
+    """
+    db = DbSession()
+    try:
+        # 대기 시간을 재기 위해 커넥션을 바로 가져온다.
+        started = time.perf_counter()
+        db.connection()
+        waited = time.perf_counter() - started
+        pool_metrics.record_wait(waited)
+        if waited > DB_SLOW_CHECKOUT_SECONDS:
+            logger.warning(f"DB 커넥션 대기 {waited:.2f}s (pool: {engine.pool.status()})")
+
+        yield db
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
@@ -0,0 +1,43 @@
+import os
+import uuid
+import logging
+from typing import Optional
+
+import pyarrow as pa
+import pyarrow.ipc as ipc
+
+logger = logging.getLogger(__name__)
+
+# 수집 → 추출 flow 간에 Arrow 배치를 넘기는 로컬 스풀 디렉터리
+SPOOL_DIR = os.getenv("SPOOL_DIR", "/opt/prefect/blog_data/spool")
+
+
+def write_spool(tables: list[pa.Table], spool_dir: str = SPOOL_DIR) -> str:
+    """
+    Arrow Table들을 하나의 Arrow IPC 파일로 써서 경로를 반환
+    IPC 파일은 읽을 때 memory map으로 복사 없이 열 수 있다.
+    """
+    os.makedirs(spool_dir, exist_ok=True)
+    path = os.path.join(spool_dir, f"{uuid.uuid4().hex}.arrow")
+    schema = tables[0].schema
+    with pa.OSFile(path, "wb") as sink:
+        with ipc.new_file(sink, schema) as writer:
+            for table in tables:
+                writer.write_table(table.cast(schema))
+    return path
+
+
+def read_spool(path: str, columns: Optional[list[str]] = None) -> pa.Table:
+    """
+    스풀 파일을 memory map으로 열어 Table로 반환 (필요한 컬럼만 선택 가능)
+    """
+    with pa.memory_map(path, "r") as source:
+        table = ipc.open_file(source).read_all()
+    return table.select(columns) if columns else table
+
+
+def remove_spool(path: str) -> None:
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
@@ -0,0 +1,92 @@
+import os
+import logging
+from datetime import datetime
+from typing import Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+URL_INDEX_PATH = os.getenv("URL_INDEX_PATH", "/opt/prefect/blog_data/url_index.txt")
+WATERMARK_PREFIX = "#watermark="
+
+
+class UrlIndex():
+    """
+    이미 수집된 글의 encoded_url(MD5) 해시를 담는 로컬 인덱스
+
+    디스크에는 정렬된 해시 파일(한 줄에 하나)로 저장하고, 메모리에는 set으로 올려 O(1)로 조회한다.
+    파일 첫 줄에는 마지막으로 DB와 동기화한 collected_at 워터마크를 기록하여
+    다음 실행에서는 그 이후에 들어온 행만 가져온다.
+    """
+
+    def __init__(self, path: str = URL_INDEX_PATH) -> None:
+        self.path = path
+        self.hashes: set[str] = set()
+        self.watermark: Optional[datetime] = None
+        self.synced = False
+
+    def __contains__(self, url_hash: str) -> bool:
+        return url_hash in self.hashes
+
+    def __len__(self) -> int:
+        return len(self.hashes)
+
+    def load(self) -> "UrlIndex":
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                first = f.readline().strip()
+                if first.startswith(WATERMARK_PREFIX):
+                    value = first[len(WATERMARK_PREFIX):]
+                    self.watermark = datetime.fromisoformat(value) if value else None
+                elif first:
+                    self.hashes.add(first)
+                self.hashes.update(line.strip() for line in f if line.strip())
+        except FileNotFoundError:
+            logger.info(f"URL 인덱스 파일이 없어 DB 전체에서 새로 만듭니다: {self.path}")
+        return self
+
+    def sync_from_db(self, db) -> int:
+        """
+        워터마크 이후에 수집된 글의 해시를 DB에서 가져와 인덱스에 추가
+
+        Returns:
+            가져온 행 수
+        """
+        from models.db_models import ExternalPost
+
+        query = db.query(ExternalPost.id, ExternalPost.collected_at)
+        if self.watermark is not None:
+            query = query.filter(ExternalPost.collected_at >= self.watermark)
+        rows = query.all()
+
+        for post_id, collected_at in rows:
+            self.hashes.add(post_id)
+            if collected_at is not None and (self.watermark is None or collected_at > self.watermark):
+                self.watermark = collected_at
+        self.synced = True
+        return len(rows)
+
+    def filter_new(self, url_hashes: Iterable[str], db=None) -> set[str]:
+        """
+        인덱스에 없는 해시만 반환
+        db가 주어지면 인덱스에서 못 찾은 해시만 DB에 한 번 더 확인한다 (인덱스 동기화 실패 시 대비).
+        """
+        misses = set(url_hashes) - self.hashes
+        if misses and db is not None:
+            from models.db_models import ExternalPost
+
+            existing = {row[0] for row in db.query(ExternalPost.id).filter(ExternalPost.id.in_(misses)).all()}
+            self.hashes.update(existing)
+            misses -= existing
+        return misses
+
+    def add(self, url_hashes: Iterable[str]) -> None:
+        self.hashes.update(url_hashes)
+
+    def save(self) -> None:
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(WATERMARK_PREFIX + (self.watermark.isoformat() if self.watermark else "") + "\n")
+            for url_hash in sorted(self.hashes):
+                f.write(url_hash + "\n")
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,144 @@
+from datetime import datetime, timezone
+
+from services.bulk_load import (
+    bulk_insert_posts, insert_post_keywords, merge_keyword_mappings, rebuild_keyword_daily_counts, resolve_keyword_ids,
+    set_keyword_masters, update_analyzed_posts,
+)
+
+PUBLISHED = datetime(2026, 1, 1, 3, 0, tzinfo=timezone.utc)
+
+
+def _posts(*ids):
+    return [(post_id, "source", f"title {post_id}", f"https://example.com/{post_id}", PUBLISHED, PUBLISHED) for post_id in ids]
+
+
+def _daily_counts(cursor):
+    cursor.execute('SELECT keyword_id, day, field_id, post_count FROM "KEYWORD_DAILY_COUNTS" ORDER BY 1, 2, 3')
+    return cursor.fetchall()
+
+
+def test_bulk_insert_posts_skips_existing_and_duplicate_ids(cursor):
+    assert bulk_insert_posts(cursor, _posts("a", "b")) == (2, 0)
+    # 이미 있는 id와 한 번에 중복으로 들어온 id는 건너뛴다.
+    assert bulk_insert_posts(cursor, _posts("b", "c", "c"), chunk_size=1) == (1, 2)
+
+    cursor.execute('SELECT id, is_analyzed FROM "EXTERNAL_POSTS" ORDER BY id')
+    assert cursor.fetchall() == [("a", False), ("b", False), ("c", False)]
+
+
+def test_copy_escapes_special_characters(cursor):
+    title = "tab\there\nnew line \\ backslash"
+    bulk_insert_posts(cursor, [("a", "source", title, None, PUBLISHED, PUBLISHED)])
+
+    cursor.execute('SELECT title, url FROM "EXTERNAL_POSTS"')
+    assert cursor.fetchone() == (title, None)
+
+
+def test_staging_tables_can_be_reused_in_one_transaction(cursor):
+    bulk_insert_posts(cursor, _posts("a", "b"))
+    bulk_insert_posts(cursor, _posts("c"))
+
+    assert update_analyzed_posts(cursor, [("a", "Backend", "summary a", None, "llm")]) == 1
+    # 두 번째 호출은 첫 번째 호출의 임시 테이블을 비우고 다시 쓴다.
+    assert update_analyzed_posts(cursor, [("b", "Frontend", "summary b", None, "llm")]) == 1
+
+    keyword_ids = resolve_keyword_ids(cursor, ["Kafka", "Redis"])
+    assert insert_post_keywords(cursor, [(keyword_ids["Kafka"], "a")]) == (1, 1)
+    assert insert_post_keywords(cursor, [(keyword_ids["Kafka"], "b"), (keyword_ids["Redis"], "b")]) == (2, 2)
+
+    cursor.execute('SELECT id, category, analyzed_by, is_analyzed FROM "EXTERNAL_POSTS" ORDER BY id')
+    assert cursor.fetchall() == [("a", "Backend", "llm", True), ("b", "Frontend", "llm", True), ("c", None, None, False)]
+
+
+def test_insert_post_keywords_counts_only_new_mappings(cursor):
+    bulk_insert_posts(cursor, _posts("a", "b"))
+    keyword_ids = resolve_keyword_ids(cursor, ["Kafka"])
+    kafka = keyword_ids["Kafka"]
+
+    assert insert_post_keywords(cursor, [(kafka, "a"), (kafka, "a"), (kafka, "b")]) == (2, 1)
+    # 이미 있는 매핑은 다시 세지 않는다.
+    assert insert_post_keywords(cursor, [(kafka, "a")]) == (0, 0)
+
+    incremental = _daily_counts(cursor)
+    assert [(keyword_id, field_id, count) for keyword_id, _, field_id, count in incremental] == [(kafka, 0, 2)]
+    rebuild_keyword_daily_counts(cursor)
+    assert _daily_counts(cursor) == incremental
+
+
+def test_resolve_keyword_ids_returns_existing_ids(cursor):
+    first = resolve_keyword_ids(cursor, ["Kafka", "Redis"])
+    assert resolve_keyword_ids(cursor, ["Kafka", "Redis", "Kafka"]) == first
+    assert len(set(first.values())) == 2
+
+
+def test_set_keyword_masters_flattens_chains(cursor):
+    ids = resolve_keyword_ids(cursor, ["k8s", "kube", "Kubernetes"])
+    assert set_keyword_masters(cursor, [(ids["k8s"], ids["kube"])]) == 1
+    # 대표였던 kube에 대표가 생기면 k8s도 Kubernetes를 직접 가리킨다.
+    assert set_keyword_masters(cursor, [(ids["kube"], ids["Kubernetes"])]) == 1
+
+    cursor.execute('SELECT keyword, master_id FROM "KEYWORDS" ORDER BY keyword')
+    assert cursor.fetchall() == [("Kubernetes", None), ("k8s", ids["Kubernetes"]), ("kube", ids["Kubernetes"])]
+    assert resolve_keyword_ids(cursor, ["k8s", "kube"]) == {"k8s": ids["Kubernetes"], "kube": ids["Kubernetes"]}
+
+
+def test_merge_keyword_mappings_moves_mappings_to_master(cursor):
+    bulk_insert_posts(cursor, _posts("a", "b"))
+    ids = resolve_keyword_ids(cursor, ["k8s", "Kubernetes"])
+    insert_post_keywords(cursor, [(ids["k8s"], "a"), (ids["k8s"], "b"), (ids["Kubernetes"], "a")])
+    set_keyword_masters(cursor, [(ids["k8s"], ids["Kubernetes"])])
+
+    assert merge_keyword_mappings(cursor) == 2
+    cursor.execute('SELECT keyword_id, post_id FROM "EXTERNAL_POSTS_KEYWORDS" ORDER BY post_id')
+    assert cursor.fetchall() == [(ids["Kubernetes"], "a"), (ids["Kubernetes"], "b")]
+
+
+def test_update_analyzed_posts_moves_daily_counts_to_new_field(cursor):
+    cursor.execute('INSERT INTO "FIELDS" (field_id, field_name) VALUES (1, \'Backend\'), (2, \'Frontend\')')
+    bulk_insert_posts(cursor, _posts("a", "b"))
+    update_analyzed_posts(cursor, [("a", "Backend", "summary", 1, "llm"), ("b", "Backend", "summary", 1, "llm")])
+    kafka = resolve_keyword_ids(cursor, ["Kafka"])["Kafka"]
+    insert_post_keywords(cursor, [(kafka, "a"), (kafka, "b")])
+
+    # 재분석으로 a의 분야만 바뀐다.
+    update_analyzed_posts(cursor, [("a", "Frontend", "summary", 2, "llm"), ("b", "Backend", "summary", 1, "llm")])
+
+    moved = [(field_id, count) for _, _, field_id, count in _daily_counts(cursor)]
+    assert moved == [(1, 1), (2, 1)]
+    rebuild_keyword_daily_counts(cursor)
+    assert [(field_id, count) for _, _, field_id, count in _daily_counts(cursor)] == moved
+
+
+def test_update_analyzed_posts_swaps_fields_between_posts(cursor):
+    cursor.execute('INSERT INTO "FIELDS" (field_id, field_name) VALUES (1, \'Backend\'), (2, \'Frontend\')')
+    bulk_insert_posts(cursor, _posts("a", "b"))
+    update_analyzed_posts(cursor, [("a", "Backend", "summary", 1, "llm"), ("b", "Frontend", "summary", 2, "llm")])
+    kafka = resolve_keyword_ids(cursor, ["Kafka"])["Kafka"]
+    insert_post_keywords(cursor, [(kafka, "a"), (kafka, "b")])
+
+    # 같은 키워드, 같은 날의 두 포스트가 서로 분야를 맞바꾸면 두 집계 행이 모두 빠졌다가 다시 더해진다.
+    update_analyzed_posts(cursor, [("a", "Frontend", "summary", 2, "llm"), ("b", "Backend", "summary", 1, "llm")])
+
+    swapped = [(field_id, count) for _, _, field_id, count in _daily_counts(cursor)]
+    assert swapped == [(1, 1), (2, 1)]
+    rebuild_keyword_daily_counts(cursor)
+    assert [(field_id, count) for _, _, field_id, count in _daily_counts(cursor)] == swapped
+
+
+def test_update_analyzed_posts_replaces_keywords_of_local_posts(cursor):
+    bulk_insert_posts(cursor, _posts("a", "b"))
+    update_analyzed_posts(cursor, [("a", "Backend", "local summary", None, "local"), ("b", "Backend", "summary", None, "llm")])
+    ids = resolve_keyword_ids(cursor, ["Kafka", "Redis"])
+    insert_post_keywords(cursor, [(ids["Kafka"], "a"), (ids["Kafka"], "b")])
+
+    # LLM이 다시 분석하면 로컬 결과(a의 Kafka)만 지우고, LLM 결과였던 b의 매핑은 그대로 둔다.
+    update_analyzed_posts(cursor, [("a", "Backend", "summary", None, "llm"), ("b", "Backend", "summary", None, "llm")],
+                          replace_keywords_of="local")
+    insert_post_keywords(cursor, [(ids["Redis"], "a"), (ids["Kafka"], "b")])
+
+    cursor.execute('SELECT keyword_id, post_id FROM "EXTERNAL_POSTS_KEYWORDS" ORDER BY post_id')
+    assert cursor.fetchall() == [(ids["Redis"], "a"), (ids["Kafka"], "b")]
+    counts = {(keyword_id, field_id): count for keyword_id, _, field_id, count in _daily_counts(cursor) if count}
+    assert counts == {(ids["Kafka"], 0): 1, (ids["Redis"], 0): 1}
+    cursor.execute('SELECT analyzed_by FROM "EXTERNAL_POSTS" ORDER BY id')
+    assert cursor.fetchall() == [("llm",), ("llm",)]
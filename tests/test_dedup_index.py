@@ -0,0 +1,59 @@
+import random
+
+from plugins.extractor.dedup_index import SHINGLE_SIZE, NearDuplicateIndex, minhash, similarity
+from plugins.extractor.keyword_extractor import ArticleClassification
+
+VOCABULARY = [f"word{i}" for i in range(5000)]
+
+
+def _text(rng, length=200):
+    return rng.choices(VOCABULARY, k=length)
+
+
+def _mutate(rng, words, fraction):
+    words = list(words)
+    for i in rng.sample(range(len(words)), int(len(words) * fraction)):
+        words[i] = rng.choice(VOCABULARY)
+    return words
+
+
+def _jaccard(a, b):
+    def shingles(words):
+        return {" ".join(words[i:i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1)}
+    a, b = shingles(a), shingles(b)
+    return len(a & b) / len(a | b)
+
+
+def test_estimated_similarity_tracks_exact_jaccard():
+    rng = random.Random(7)
+    for fraction in (0.0, 0.02, 0.05, 0.1, 0.2, 0.4):
+        for _ in range(10):
+            a = _text(rng)
+            b = _mutate(rng, a, fraction)
+            exact = _jaccard(a, b)
+            # 해시 128개면 표준오차가 0.045 이하이므로 0.15 안에 들어와야 한다.
+            assert abs(similarity(minhash([" ".join(a)]), minhash([" ".join(b)])) - exact) < 0.15, (fraction, exact)
+
+
+def test_low_jaccard_pairs_are_not_near_duplicates():
+    rng = random.Random(11)
+    for _ in range(50):
+        a = _text(rng)
+        b = _mutate(rng, a, 0.4)
+        assert _jaccard(a, b) < 0.3
+        assert similarity(minhash([" ".join(a)]), minhash([" ".join(b)])) < 0.5
+
+
+def test_index_matches_only_near_duplicates(tmp_path):
+    rng = random.Random(3)
+    index = NearDuplicateIndex(path=str(tmp_path / "dedup.db"))
+    classification = ArticleClassification(keywords=["Kafka"], category="Backend", summary="요약")
+    originals = {f"orig{i}": _text(rng) for i in range(20)}
+    index.add_many({post_id: (minhash([" ".join(words)]), classification) for post_id, words in originals.items()})
+
+    unrelated = {f"new{i}": minhash([" ".join(_text(rng))]) for i in range(200)}
+    assert index.match(unrelated) == ({}, {})
+
+    mirrored = {f"mirror{i}": minhash([" ".join(_mutate(rng, words, 0.01))]) for i, words in enumerate(originals.values())}
+    reused, canonical_of = index.match(mirrored)
+    assert set(reused) == set(mirrored) and canonical_of == {}
@@ -0,0 +1,31 @@
+import json
+import os
+
+import pytest
+
+from plugins.parser.html_text import STREAMING_THRESHOLD, _bs4_text, _lxml_text, html_to_text
+
+with open(os.path.join(os.path.dirname(__file__), "fixtures", "html_text_corpus.json"), "r", encoding="utf-8") as f:
+    CORPUS = json.load(f)
+
+
+@pytest.mark.parametrize("html", CORPUS)
+def test_lxml_text_matches_bs4(html):
+    assert html_to_text(html) == _bs4_text(html)
+
+
+@pytest.mark.parametrize("html", CORPUS)
+def test_chunked_feed_matches_bs4(html):
+    # 청크 경계가 태그나 엔티티 중간에 걸려도 결과가 같아야 한다.
+    assert _lxml_text(html, chunk_size=7) == _bs4_text(html)
+
+
+def test_large_document_is_streamed_with_same_text():
+    html = "".join(CORPUS) * (STREAMING_THRESHOLD // len("".join(CORPUS)) + 1)
+    assert len(html) > STREAMING_THRESHOLD
+    assert html_to_text(html) == _bs4_text(html)
+
+
+def test_bs4_backend_and_empty_input():
+    assert html_to_text("<p>a</p>", backend="bs4") == "a"
+    assert html_to_text("") == ""
@@ -0,0 +1,65 @@
+import numpy as np
+
+from plugins.extractor.keyword_canonicalizer import (
+    KeywordCanonicalizer, cluster_keywords, keyword_key, ngram_vectors, similar_pairs,
+)
+
+
+def test_keyword_key_ignores_case_spacing_and_separators():
+    assert keyword_key("Spring Boot") == keyword_key("spring-boot") == keyword_key("SPRING_BOOT") == "springboot"
+    assert keyword_key("Node.js") == keyword_key("node js") == "nodejs"
+    assert keyword_key("ＣＩ/ＣＤ") == "cicd"
+    assert keyword_key(" - ") == ""
+
+
+def test_canonicalize_prefers_alias_then_first_known_spelling():
+    canonicalizer = KeywordCanonicalizer()
+    assert canonicalizer.canonicalize("k8s") == "Kubernetes"
+    assert canonicalizer.canonicalize("쿠버네티스") == "Kubernetes"
+    assert canonicalizer.canonicalize("kubernetes") == "Kubernetes"
+    assert canonicalizer.canonicalize("   ") is None
+
+    canonicalizer.add_known(["Event Sourcing", "event-sourcing"])
+    assert canonicalizer.known["eventsourcing"] == "Event Sourcing"
+    assert canonicalizer.canonicalize("EVENT_SOURCING") == "Event Sourcing"
+    # 처음 보는 키워드는 정리한 표기가 이후 같은 키의 표기가 된다.
+    assert canonicalizer.canonicalize("  Vector   Search ") == "Vector Search"
+    assert canonicalizer.canonicalize("vector-search") == "Vector Search"
+
+
+def test_custom_aliases_replace_defaults():
+    canonicalizer = KeywordCanonicalizer(aliases={"pg": "PostgreSQL"})
+    assert canonicalizer.canonicalize("PG") == "PostgreSQL"
+    assert canonicalizer.canonicalize("k8s") == "k8s"
+
+
+def test_similar_pairs_blocks_match_full_matrix():
+    keywords = [f"keyword{i % 37}{'s' * (i % 3)}" for i in range(100)]
+    vectors = ngram_vectors(keywords)
+    i, j = similar_pairs(vectors, 0.8, block_size=7)
+    similarity = vectors @ vectors.T
+    expected = {(a, b) for a, b in zip(*np.nonzero(similarity >= 0.8)) if a < b}
+    assert set(zip(i.tolist(), j.tolist())) == expected
+
+
+def test_cluster_keywords_groups_around_alias_and_popular_spelling():
+    keywords = ["Kubernetes", "k8s", "쿠버네티스", "Microservice", "microservices", "Micro-Services", "Redis", "Kafka Streams"]
+    popularity = [1, 10, 5, 3, 8, 1, 4, 2]
+    master = cluster_keywords(keywords, popularity)
+
+    # 별칭의 대표 표기와 같은 키워드가 인기와 관계없이 대표가 된다.
+    assert [master[i] for i in range(3)] == [0, 0, 0]
+    assert [master[i] for i in range(3, 6)] == [4, 4, 4]
+    assert master[6] == 6 and master[7] == 7
+
+
+def test_cluster_keywords_does_not_chain_through_intermediate_keywords():
+    # A~B, B~C 이지만 A와 C는 멀다. 대표 A는 B만 흡수하고 C는 따로 남는다.
+    keywords = ["abcdefgh", "abcdefghij", "abcdefghijkl"]
+    vectors = ngram_vectors(keywords)
+    similarity = vectors @ vectors.T
+    threshold = float((similarity[0, 1] + similarity[0, 2]) / 2)
+    assert similarity[1, 2] >= threshold and similarity[0, 2] < threshold
+
+    master = cluster_keywords(keywords, [5, 1, 1], threshold=threshold, aliases={})
+    assert master == [0, 0, 2]
@@ -0,0 +1,69 @@
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+
+from services import lake
+
+
+@pytest.fixture
+def local_lake(tmp_path, monkeypatch):
+    monkeypatch.setattr(lake, "LAKE_BACKEND", "local")
+    monkeypatch.setattr(lake, "LAKE_ROOT", str(tmp_path))
+    # 행 그룹 여러 개에 걸친 조회를 확인하도록 작게 쓴다.
+    monkeypatch.setattr(lake, "ROW_GROUP_SIZE", 10)
+    return tmp_path
+
+
+def _raw_table(ids):
+    return pa.table({
+        'encoded_url': ids,
+        'source': ["blog"] * len(ids),
+        'rss_content': [f"content of {post_id}" for post_id in ids],
+    })
+
+
+def test_read_post_ids_returns_all_ids_sorted(local_lake):
+    ids = [f"post{i:03d}" for i in range(35)]
+    obj_key = lake.write_dataset(lake.RAW_PREFIX, _raw_table(ids[::-1]), "2026-01-01", "run_000000")
+
+    assert obj_key == f"{lake.RAW_PREFIX}/dt=2026-01-01/run_000000.parquet"
+    assert pq.ParquetFile(local_lake / obj_key).num_row_groups == 4
+    assert lake.read_post_ids(obj_key) == ids
+
+
+def test_read_posts_reads_only_target_rows(local_lake):
+    ids = [f"post{i:03d}" for i in range(35)]
+    obj_key = lake.write_dataset(lake.RAW_PREFIX, _raw_table(ids), "2026-01-01", "run_000000")
+
+    targets = ["post003", "post017", "post034", "missing"]
+    table = lake.read_posts(obj_key, targets)
+    assert table.column_names == ["encoded_url", "rss_content"]
+    assert table.to_pylist() == [{'encoded_url': post_id, 'rss_content': f"content of {post_id}"} for post_id in targets[:3]]
+
+    assert lake.read_posts(obj_key, ["post005"], columns=("encoded_url",)).to_pylist() == [{'encoded_url': "post005"}]
+    assert lake.read_posts(obj_key, ["missing"]).num_rows == 0
+    assert lake.read_posts(obj_key, []).num_rows == 0
+
+
+def test_read_post_ids_skips_files_without_post_ids(local_lake):
+    keywords = pa.table({'keyword': ["Kafka"], 'post_id': ["post001"], 'category': ["Backend"]})
+    obj_key = lake.write_dataset(lake.KEYWORDS_PREFIX, keywords, "2026-01-01", "run_000000")
+
+    assert lake.read_post_ids(obj_key) == []
+
+
+def test_compact_partition_moves_legacy_keyword_files(local_lake):
+    lake.write_dataset(lake.RAW_PREFIX, _raw_table(["post002", "post001"]), "2025-06-01", "run_000000")
+    lake.write_dataset(lake.RAW_PREFIX, _raw_table(["post003"]), "2025-06-01", "run_000001")
+    # 키워드 결과를 keywords prefix에 따로 쓰기 전의 파일
+    lake.write_parquet(f"{lake.RAW_PREFIX}/dt=2025-06-01/keywords_000000.parquet",
+                       pa.table({'keyword': ["Kafka"], 'post_id': ["post001"], 'category': ["Backend"]}))
+    lake.write_dataset(lake.RAW_PREFIX, _raw_table(["post004"]), "2026-01-01", "run_000000")
+    assert lake.list_partition_dates(lake.RAW_PREFIX) == ["2025-06-01", "2026-01-01"]
+    assert lake.list_partition_dates("blog-data/missing") == []
+
+    obj_key = lake.compact_partition(lake.RAW_PREFIX, "2025-06-01", "compacted")
+    assert lake.list_partition(lake.RAW_PREFIX, "2025-06-01") == [str(local_lake / obj_key)]
+    assert lake.read_post_ids(obj_key) == ["post001", "post002", "post003"]
+    [keyword_file] = lake.list_partition(lake.KEYWORDS_PREFIX, "2025-06-01")
+    assert pq.read_table(keyword_file, partitioning=None).to_pylist() == [{'keyword': "Kafka", 'post_id': "post001", 'category': "Backend"}]
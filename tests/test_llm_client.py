@@ -0,0 +1,114 @@
+import time
+import asyncio
+
+import httpx
+from aiohttp.test_utils import TestServer
+from google.genai import errors, types
+
+from plugins.extractor.llm_client import AdaptiveConcurrency, AsyncLLMClient, RateLimiter, TokenBucket, _retry_after
+from plugins.extractor.keyword_extractor import ArticleClassification
+from utils.fake_gemini_server import make_app
+
+
+def _contents(text):
+    return [types.Content(role="user", parts=[types.Part.from_text(text=text)])]
+
+
+def test_token_bucket_waits_for_refill():
+    bucket = TokenBucket(60)
+    assert bucket.wait_time(60) == 0.0
+    bucket.take(60)
+    # 초당 1개씩 채워지므로 10개는 약 10초
+    assert 9.5 < bucket.wait_time(10) <= 10.0
+    # 용량보다 큰 요청은 용량만큼만 기다린다.
+    assert bucket.wait_time(1000) <= 60.0
+    bucket.adjust(-30)
+    assert bucket.wait_time(10) == 0.0
+
+
+def test_rate_limiter_spaces_requests_and_honors_pause():
+    async def run():
+        limiter = RateLimiter(rpm=600, tpm=10**6)
+        limiter.requests.tokens = 0.0
+        started = time.monotonic()
+        for _ in range(3):
+            await limiter.acquire(1)
+        spaced = time.monotonic() - started
+
+        limiter.requests.tokens = limiter.requests.capacity
+        limiter.pause(0.3)
+        started = time.monotonic()
+        await limiter.acquire(1)
+        return spaced, time.monotonic() - started
+
+    spaced, paused = asyncio.run(run())
+    # 분당 600 = 0.1초에 하나
+    assert 0.25 < spaced < 0.6
+    assert 0.25 < paused < 0.6
+
+
+def test_adaptive_concurrency_aimd():
+    concurrency = AdaptiveConcurrency(initial=4, maximum=6, latency_target=1.0)
+    for _ in range(4):
+        concurrency.on_success(0.1)
+    assert 4.8 < concurrency.limit < 5.0
+    concurrency.on_success(5.0)
+    assert concurrency.limit < 4.5
+    concurrency.on_throttle()
+    assert concurrency.limit < 2.25
+    for _ in range(5):
+        concurrency.on_throttle()
+    assert concurrency.limit == 1
+    for _ in range(200):
+        concurrency.on_success(0.1)
+    assert concurrency.limit == 6
+
+
+def test_adaptive_concurrency_caps_in_flight():
+    async def run():
+        concurrency = AdaptiveConcurrency(initial=2)
+        peak = 0
+
+        async def worker():
+            nonlocal peak
+            async with concurrency:
+                peak = max(peak, concurrency.in_flight)
+                await asyncio.sleep(0.01)
+
+        await asyncio.gather(*(worker() for _ in range(10)))
+        return peak, concurrency.in_flight
+
+    assert asyncio.run(run()) == (2, 0)
+
+
+def test_retry_after_reads_header_then_retry_info():
+    response = httpx.Response(429, headers={"Retry-After": "2.5"})
+    assert _retry_after(errors.APIError(429, {"error": {"code": 429}}, response)) == 2.5
+
+    body = {"error": {"code": 429, "details": [
+        {"@type": "type.googleapis.com/google.rpc.QuotaFailure"},
+        {"@type": "type.googleapis.com/google.rpc.RetryInfo", "retryDelay": "17s"},
+    ]}}
+    assert _retry_after(errors.APIError(429, body)) == 17.0
+    assert _retry_after(errors.APIError(503, {"error": {"code": 503}})) is None
+
+
+def test_client_backs_off_on_fake_server_429(monkeypatch):
+    monkeypatch.setenv("GEMINI_API_KEY", "test")
+
+    async def run():
+        # 1초에 3개만 받는 서버에 8개를 동시에 보낸다.
+        server = TestServer(make_app(rpm=3, latency=0.01, error_rate=0.0, window=1.0))
+        await server.start_server()
+        try:
+            client = AsyncLLMClient(rpm=600, tpm=10**6, base_url=str(server.make_url("")), max_retries=10)
+            initial_limit = client.concurrency.limit
+            texts = await asyncio.gather(*(client.generate_json(_contents(f"기사 {i}"), ArticleClassification) for i in range(8)))
+            return client, initial_limit, texts
+        finally:
+            await server.close()
+
+    client, initial_limit, texts = asyncio.run(run())
+    assert [ArticleClassification.model_validate_json(text).category for text in texts] == ["Infra"] * 8
+    assert client.throttled >= 1
+    assert client.concurrency.limit < initial_limit
@@ -0,0 +1,75 @@
+import random
+
+from plugins.extractor.local_extractor import LocalExtractor, normalize_keyword
+
+TOPICS = {
+    "Backend": ("Kafka", "kafka consumer offset partition broker topic replication latency throughput cluster".split()),
+    "Cook": ("Kimchi", "kimchi cabbage salt pepper fermentation recipe garlic radish jar taste".split()),
+    "Trip": ("Jeju", "jeju island beach hotel flight ticket trail sunset ocean ferry".split()),
+}
+
+
+def _article(rng, category, noise=0.0, length=40):
+    keyword, vocabulary = TOPICS[category]
+    words = [rng.choice(vocabulary) for _ in range(length)]
+    # noise 비율만큼 다른 주제의 단어를 섞어 확신도가 낮고 틀리기 쉬운 기사를 만든다.
+    others = [word for other, (_, other_vocabulary) in TOPICS.items() if other != category for word in other_vocabulary]
+    words = [rng.choice(others) if rng.random() < noise else word for word in words]
+    return [f"{keyword} {' '.join(words[i:i + 10])}." for i in range(0, len(words), 10)]
+
+
+def _corpus(rng, n, max_noise, length=40):
+    labels = [rng.choice(list(TOPICS)) for _ in range(n)]
+    return [_article(rng, label, rng.uniform(0, max_noise), length) for label in labels], labels
+
+
+def _train(rng):
+    texts, labels = _corpus(rng, 300, 0.1)
+    return LocalExtractor.train([" ".join(text) for text in texts], labels, [keyword for keyword, _ in TOPICS.values()])
+
+
+def test_predict_finds_category_and_known_keyword():
+    rng = random.Random(1)
+    model = _train(rng)
+
+    prediction = model.predict(_article(rng, "Cook"))
+    assert prediction.classification.category == "Cook"
+    assert prediction.classification.keywords == ["Kimchi"]
+    assert prediction.known_keyword
+    assert normalize_keyword(" Vector Database! ") == "vector database"
+
+
+def test_calibrated_threshold_meets_target_precision():
+    rng = random.Random(2)
+    model = _train(rng)
+    texts, labels = _corpus(rng, 400, 0.9, length=10)
+    keywords = [[TOPICS[label][0]] for label in labels]
+
+    threshold = model.calibrate(texts, labels, keywords, target_precision=0.95, min_posts=20)
+    assert threshold is not None
+
+    predictions = [model.predict(text) for text in texts]
+    accepted = [(prediction, label) for prediction, label in zip(predictions, labels)
+                if prediction.known_keyword and prediction.confidence >= threshold]
+    correct = sum(prediction.classification.category == label for prediction, label in accepted)
+    assert len(accepted) >= 20
+    assert correct / len(accepted) >= 0.95
+    # 노이즈가 많은 held-out에서는 모든 기사를 받아들이는 기준이 될 수 없다.
+    assert len(accepted) < len(texts)
+
+    confident = model.classify_confident({str(i): text for i, text in enumerate(texts)})
+    assert set(confident) == {str(i) for i, prediction in enumerate(predictions)
+                              if prediction.known_keyword and prediction.confidence >= threshold}
+
+
+def test_calibration_without_enough_posts_disables_prefilter(tmp_path):
+    rng = random.Random(3)
+    model = _train(rng)
+    texts, labels = _corpus(rng, 10, 0.0)
+
+    assert model.calibrate(texts, labels, [[TOPICS[label][0]] for label in labels], min_posts=50) is None
+    assert model.classify_confident({str(i): text for i, text in enumerate(texts)}) == {}
+
+    model.threshold = 0.9
+    model.save(str(tmp_path))
+    assert LocalExtractor.load(str(tmp_path)).threshold == 0.9
@@ -0,0 +1,15 @@
+from services.manifest import PostManifest
+
+
+def test_missing_marks_are_cleared_when_post_is_recorded(tmp_path):
+    manifest = PostManifest(path=str(tmp_path / "manifest.db"))
+    manifest.add(["post1"], "blog-data/raw/dt=2026-01-01/run_000000.parquet")
+    manifest.mark_missing(["post2", "post3"])
+
+    assert manifest.missing(["post1", "post2", "post3", "post4"]) == {"post2", "post3"}
+    assert manifest.locate(["post1", "post2"]) == {"blog-data/raw/dt=2026-01-01/run_000000.parquet": ["post1"]}
+
+    # 매니페스트를 다시 채워 본문이 기록되면 다시 backlog 대상이 된다.
+    manifest.add(["post2"], "blog-data/raw/dt=2026-01-02/run_000000.parquet")
+    assert manifest.missing(["post2", "post3"]) == {"post3"}
+    assert manifest.missing([f"post{i}" for i in range(2000)]) == {"post3"}
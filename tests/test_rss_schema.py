@@ -0,0 +1,47 @@
+from datetime import datetime, timedelta, timezone
+
+import pyarrow as pa
+
+from models.rss_schema import TIMESTAMP_TYPE, ArticleBatchBuilder, ArticleSchema, parse_timestamps
+
+UTC = timezone.utc
+
+
+def test_parse_timestamps_handles_rss_and_iso_formats():
+    values = pa.array([
+        "Mon, 02 Jan 2026 10:00:00 +0900",
+        "Mon, 02 Jan 2026 10:00:00 GMT",
+        "Tue, 3 Feb 2026 01:02:03 -0000",
+        "2026-01-02T10:00:00+09:00",
+        "2026-01-02T10:00:00Z",
+        "2026-01-02 10:00:00",
+        "2026-01-02T10:00:00.250+09:00",
+    ])
+    assert parse_timestamps(values).to_pylist() == [
+        datetime(2026, 1, 2, 1, tzinfo=UTC),
+        datetime(2026, 1, 2, 10, tzinfo=UTC),
+        datetime(2026, 2, 3, 1, 2, 3, tzinfo=UTC),
+        datetime(2026, 1, 2, 1, tzinfo=UTC),
+        datetime(2026, 1, 2, 10, tzinfo=UTC),
+        datetime(2026, 1, 2, 10, tzinfo=UTC),
+        datetime(2026, 1, 2, 1, 0, 0, 250000, tzinfo=UTC),
+    ]
+
+
+def test_parse_timestamps_fills_missing_and_invalid_with_now():
+    before = datetime.now(UTC)
+    parsed = parse_timestamps(pa.chunked_array([["", None], ["not a date", "2026-01-02T10:00:00"]])).to_pylist()
+    assert all(before <= value <= before + timedelta(minutes=1) for value in parsed[:3])
+    assert parsed[3] == datetime(2026, 1, 2, 10, tzinfo=UTC)
+
+
+def test_builder_adds_typed_timestamp_columns():
+    article = ArticleSchema(source="c29tZQ==", title="t", url="https://example.com/1", rss_content="본문", content="",
+                            published_at="Mon, 02 Jan 2026 10:00:00 +0900", created_at="2026-01-05T08:30:00.123456",
+                            encoded_url="abc")
+    table = ArticleBatchBuilder().extend([article]).build()
+    assert table.schema.field('published_ts').type == TIMESTAMP_TYPE
+    assert table.column('published_at').to_pylist() == ["Mon, 02 Jan 2026 10:00:00 +0900"]
+    assert table.column('published_ts').to_pylist() == [datetime(2026, 1, 2, 1, tzinfo=UTC)]
+    assert table.column('collected_ts').to_pylist() == [datetime(2026, 1, 5, 8, 30, 0, 123456, tzinfo=UTC)]
+    assert ArticleBatchBuilder().build().num_rows == 0
@@ -0,0 +1,20 @@
+"""
+레이크의 수집 원본 파일 전체로 post id → object key 매니페스트를 채운다.
+
+    python utils/backfill_manifest.py
+
+backlog_analysis_flow는 한 번도 채운 적이 없으면 시작할 때 자동으로 실행한다.
+레이크 파일을 직접 옮기거나 지운 뒤에는 이 스크립트로 다시 채운다.
+"""
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.lake import RAW_PREFIX
+from services.manifest import PostManifest
+
+if __name__ == "__main__":
+    manifest = PostManifest()
+    total = manifest.backfill(RAW_PREFIX)
+    print(f"{total} posts from {RAW_PREFIX} ({len(manifest)} in manifest)")
@@ -0,0 +1,112 @@
+"""
+raw_text_preprocessor 마이크로 벤치마크
+
+    python utils/bench_preprocessor.py --articles 500 --repeat 5
+    python utils/bench_preprocessor.py --corpus texts.json   # 본문 문자열 JSON 리스트
+
+같은 고정 코퍼스(시드 고정 생성 또는 --corpus)에서 개선 전 process_text(baseline_process_text)와 현재 구현을 비교한다.
+- 문장 정제: 같은 문장 목록에 개선 전 _clean_text와 현재 _clean_text를 적용한 시간 (결과가 같은지도 확인)
+- 전체: 기사당 실행 시간과 LLM에 보내는 추정 토큰 수 (현재 구현은 모든 문장을 정제한 뒤 토큰 예산으로 고른다)
+"""
+import os
+import re
+import sys
+import json
+import time
+import random
+import argparse
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from plugins.preprocessor.raw_text_preprocessor import _clean_text, _split_sentences, estimate_tokens, process_text, process_texts
+
+WORDS = [
+    "쿠버네티스", "클러스터에서", "배포", "파이프라인을", "구성했습니다", "Docker", "이미지", "캐시를", "통해",
+    "빌드", "시간을", "줄였습니다", "그리고", "모니터링은", "Prometheus", "Grafana로", "합니다", "내용",
+    "https://example.com/post?id=1", "(참고)", "API", "응답", "지연이", "50ms", "이하로", "유지됩니다",
+]
+
+
+# 개선 전 구현 (비교 기준). 문장마다 정규식을 다시 찾고 불용어 집합을 새로 만들며, 토큰 예산이 없다.
+def _baseline_get_shortest_portion(text, ratio=0.5) -> list[str]:
+    sentences = [s.strip() for s in re.split(r'(?<=[.?!])\s+', text) if s.strip()]
+    sentences.sort(key=len)
+    num_to_keep = int(len(sentences) * ratio)
+    return sentences[:num_to_keep]
+
+
+def _baseline_clean_text(text):
+    if not text:
+        return ""
+    text = re.sub(r'https?://\S+|www\.\S+', '', text)
+    text = re.sub(r'[^가-힣a-zA-Z0-9\s.?!]', ' ', text)
+    stop_words = {
+        "내용", "이번", "경우", "통해", "대한", "위해", "관련", "정도", "이후", "사실",
+        "생각", "사용", "진행", "확인", "작업", "부분", "기존", "기능", "방식", "설정",
+        "방법", "하나", "단어", "단락", "문장", "블로그", "포스팅", "주소", "댓글",
+        "감사합니다", "참고", "링크", "아래", "다음", "그리고", "하지만", "또한", "매우",
+        "그냥", "어떤", "지금", "오늘", "매일", "진짜", "역시", "항상", "종종", "한번"
+    }
+    words = text.split()
+    clean_words = [word for word in words if word not in stop_words and len(word) >= 2]
+    result_text = " ".join(clean_words)
+    return re.sub(r'\s+', ' ', result_text).strip()
+
+
+def baseline_process_text(text: str) -> list[str]:
+    return list(map(_baseline_clean_text, _baseline_get_shortest_portion(text=text)))
+
+
+def make_article(rng: random.Random, sentences: int) -> str:
+    return " ".join(
+        " ".join(rng.choice(WORDS) for _ in range(rng.randint(3, 25))) + rng.choice([".", "?", "!"])
+        for _ in range(sentences)
+    )
+
+
+def bench(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def count_tokens(processed: list[list[str]]) -> int:
+    return sum(estimate_tokens(sentence) for text in processed for sentence in text)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--articles", type=int, default=500)
+    parser.add_argument("--sentences", type=int, default=80)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--corpus", help="본문 문자열 리스트 JSON 파일 (없으면 시드 0으로 생성)")
+    args = parser.parse_args()
+
+    if args.corpus:
+        with open(args.corpus, "r", encoding="utf-8") as f:
+            texts = json.load(f)
+    else:
+        rng = random.Random(0)
+        texts = [make_article(rng, rng.randint(args.sentences // 2, args.sentences * 2)) for _ in range(args.articles)]
+
+    assert process_texts(texts) == [process_text(text) for text in texts], "process_texts 결과가 process_text와 다릅니다."
+
+    sentences = [sentence for text in texts for sentence in _split_sentences(text)]
+    assert list(map(_clean_text, sentences)) == list(map(_baseline_clean_text, sentences)), "_clean_text 결과가 개선 전과 다릅니다."
+    baseline_clean = bench(lambda: list(map(_baseline_clean_text, sentences)), args.repeat)
+    current_clean = bench(lambda: list(map(_clean_text, sentences)), args.repeat)
+
+    baseline = bench(lambda: [baseline_process_text(text) for text in texts], args.repeat)
+    current = bench(lambda: process_texts(texts), args.repeat)
+    raw = sum(estimate_tokens(sentence) for sentence in sentences)
+    print(f"articles={len(texts)} sentences={len(sentences)} chars={sum(map(len, texts))}")
+    print(f"baseline _clean_text:  {baseline_clean * 1000:8.1f} ms ({baseline_clean / len(sentences) * 1e6:7.2f} us/sentence)")
+    print(f"_clean_text:           {current_clean * 1000:8.1f} ms ({current_clean / len(sentences) * 1e6:7.2f} us/sentence)"
+          f"  x{baseline_clean / current_clean:.2f}")
+    print(f"baseline process_text: {baseline * 1000:8.1f} ms ({baseline / len(texts) * 1e6:7.1f} us/article)")
+    print(f"process_texts:         {current * 1000:8.1f} ms ({current / len(texts) * 1e6:7.1f} us/article)  x{baseline / current:.2f}")
+    print(f"tokens (estimated): raw {raw}, baseline {count_tokens([baseline_process_text(text) for text in texts])}, "
+          f"current {count_tokens(process_texts(texts))}")
@@ -0,0 +1,78 @@
+"""
+html_to_text의 lxml 백엔드가 BeautifulSoup(html.parser).get_text()와 같은 텍스트를 내는지 확인
+
+    python utils/check_html_text_parity.py            # 내장 코퍼스
+    python utils/check_html_text_parity.py --feeds    # config/platforms.json 피드 본문까지 (네트워크 필요)
+
+알려진 차이 (전처리 결과에는 영향 없음):
+- CRLF(\\r\\n)는 lxml이 \\n으로 바꾼다.
+- ';' 없이 끝나는 알 수 없는 엔티티(&foo;)는 html.parser가 ';'를 버린다.
+- HTML 안의 <![CDATA[...]]> 는 lxml이 버린다.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from plugins.parser.html_text import _bs4_text, _lxml_text, html_to_text
+
+BASE_PATH = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# 내장 코퍼스는 tests/test_html_text.py와 같은 파일을 쓴다.
+CORPUS_PATH = os.path.join(BASE_PATH, "tests", "fixtures", "html_text_corpus.json")
+
+
+def load_corpus(path: str = CORPUS_PATH) -> list[str]:
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def compare(samples: list[str], chunk_size: int = 0) -> int:
+    mismatches = 0
+    for html in samples:
+        expected = _bs4_text(html)
+        actual = html_to_text(html) if not chunk_size else _lxml_text(html, chunk_size=chunk_size)
+        if expected != actual:
+            mismatches += 1
+            print(f"MISMATCH: {html[:80]!r}\n  bs4 : {expected[:120]!r}\n  lxml: {actual[:120]!r}")
+    return mismatches
+
+
+def feed_samples() -> list[str]:
+    import feedparser
+
+    with open(os.path.join(BASE_PATH, "config", "platforms.json"), "r", encoding="utf-8") as f:
+        urls = json.load(f).values()
+
+    samples = []
+    for url in urls:
+        for entry in feedparser.parse(url).entries:
+            if hasattr(entry, 'content'):
+                samples.append(str(entry.content[0].value))
+            elif hasattr(entry, 'summary'):
+                samples.append(str(entry.summary))
+    return samples
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--feeds", action="store_true", help="설정된 RSS 피드 본문도 비교")
+    args = parser.parse_args()
+
+    samples = load_corpus() + (feed_samples() if args.feeds else [])
+    mismatches = compare(samples) + compare(samples, chunk_size=7)
+
+    started = time.perf_counter()
+    for html in samples:
+        _bs4_text(html)
+    bs4_time = time.perf_counter() - started
+    started = time.perf_counter()
+    for html in samples:
+        html_to_text(html)
+    lxml_time = time.perf_counter() - started
+
+    print(f"samples={len(samples)} mismatches={mismatches}")
+    print(f"bs4: {bs4_time * 1000:.1f} ms, lxml: {lxml_time * 1000:.1f} ms")
+    sys.exit(1 if mismatches else 0)
@@ -1,6 +1,10 @@
 import base64
 import json
-from bs4 import BeautifulSoup
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from plugins.parser.html_text import html_to_text
 
 urls = rss_feeds = {
     "무신사(MUSINSA)": "https://medium.com/feed/musinsa-tech",
@@ -63,7 +67,7 @@ for platform, url in urls.items():
             content_body = str(entry.description)
         
         # 2. HTML 태그를 제거하고 순수 텍스트 길이만 측정
-        clean_text = BeautifulSoup(content_body, "html.parser").get_text()
+        clean_text = html_to_text(content_body)
         total_chars += len(clean_text)
     mean_chars = total_chars / len(feed.entries) if feed.entries else 0
     print(f"평균 글자 수: {mean_chars}")
@@ -0,0 +1,80 @@
+"""
+AsyncLLMClient를 로컬에서 시험하기 위한 가짜 Gemini 서버
+
+    python utils/fake_gemini_server.py --port 8089 --rpm 30 --latency 0.5
+
+워커 환경 변수에 GEMINI_BASE_URL=http://localhost:8089 를 주면 AsyncLLMClient가 이 서버로 요청한다.
+generateContent 요청에 고정된 분류 결과를 돌려주고, --rpm 을 넘으면 Retry-After 헤더와 함께 429를 반환한다.
+"""
+import re
+import json
+import time
+import random
+import asyncio
+import argparse
+from collections import deque
+
+from aiohttp import web
+
+ARTICLE_ID_PATTERN = re.compile(r"### Article ID: (\S+)")
+
+
+def _classification(article_id=None):
+    result = {"keywords": ["Docker"], "category": "Infra", "summary": "가짜 Gemini 서버의 요약입니다."}
+    return result | {"id": article_id} if article_id is not None else result
+
+
+def make_app(rpm: int, latency: float, error_rate: float, window: float = 60.0) -> web.Application:
+    """
+    window: rpm을 세는 구간(초). 테스트에서는 짧게 줘 Retry-After를 줄인다.
+    """
+    recent: deque = deque()
+
+    async def generate_content(request: web.Request) -> web.Response:
+        now = time.monotonic()
+        while recent and now - recent[0] > window:
+            recent.popleft()
+        if len(recent) >= rpm:
+            retry_after = window - (now - recent[0])
+            return web.json_response(
+                {"error": {"code": 429, "message": "Resource has been exhausted", "status": "RESOURCE_EXHAUSTED"}},
+                status=429,
+                headers={"Retry-After": f"{retry_after:.1f}"},
+            )
+        recent.append(now)
+
+        if random.random() < error_rate:
+            return web.json_response({"error": {"code": 503, "message": "overloaded", "status": "UNAVAILABLE"}}, status=503)
+
+        body = await request.json()
+        text = " ".join(part.get("text", "") for content in body.get("contents", []) for part in content.get("parts", []))
+        ids = ARTICLE_ID_PATTERN.findall(text)
+        payload = [_classification(article_id) for article_id in ids] if ids else _classification()
+
+        await asyncio.sleep(latency * random.uniform(0.5, 1.5))
+        prompt_tokens = len(text) // 3
+        return web.json_response({
+            "candidates": [{
+                "content": {"role": "model", "parts": [{"text": json.dumps(payload, ensure_ascii=False)}]},
+                "finishReason": "STOP",
+            }],
+            "usageMetadata": {
+                "promptTokenCount": prompt_tokens,
+                "candidatesTokenCount": 50 * max(1, len(ids)),
+                "totalTokenCount": prompt_tokens + 50 * max(1, len(ids)),
+            },
+        })
+
+    app = web.Application()
+    app.router.add_post(r"/{version}/models/{model}:generateContent", generate_content)
+    return app
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--rpm", type=int, default=30)
+    parser.add_argument("--latency", type=float, default=0.5)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    args = parser.parse_args()
+    web.run_app(make_app(args.rpm, args.latency, args.error_rate), port=args.port)
@@ -0,0 +1,31 @@
+"""
+Parquet 레이크(blog-data/.../dt=...)를 DuckDB로 조회 (운영 Postgres를 거치지 않음)
+
+    python utils/lake_analytics.py keywords --start 2026-02-01 --end 2026-02-28
+    python utils/lake_analytics.py sources --start 2026-02-01 --end 2026-02-28
+    LAKE_BACKEND=local LAKE_ROOT=./lake python utils/lake_analytics.py top --start 2026-02-01 --end 2026-02-28
+"""
+import os
+import sys
+import argparse
+from datetime import date
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services import analytics
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("report", choices=["keywords", "top", "sources"])
+    parser.add_argument("--start", type=date.fromisoformat, required=True)
+    parser.add_argument("--end", type=date.fromisoformat, required=True)
+    parser.add_argument("--limit", type=int, default=20)
+    args = parser.parse_args()
+
+    if args.report == "keywords":
+        table = analytics.keyword_counts(args.start, args.end, limit=args.limit)
+    elif args.report == "top":
+        table = analytics.top_keywords(args.start, args.end, limit=args.limit)
+    else:
+        table = analytics.source_activity(args.start, args.end)
+    print(table.to_pandas().to_string(index=False))
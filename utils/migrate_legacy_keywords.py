@@ -0,0 +1,47 @@
+"""
+수집 원본 prefix 전체 기간의 dt 파티션을 한 번 압축해, 그 안에 섞여 있는 예전 키워드 결과 파일을 keywords 데이터셋으로 옮긴다.
+
+    python utils/migrate_legacy_keywords.py            # 전체 기간
+    python utils/migrate_legacy_keywords.py --dry-run  # 옮길 파일 수만 확인
+
+lake_compaction_flow는 최근 days 일만 압축하므로, 키워드 결과를 keywords prefix에 따로 쓰기 전의 파일은
+이 스크립트를 한 번 실행해야 analytics(keywords 데이터셋)에서 보인다.
+옮긴 파티션의 매니페스트 object key는 합쳐진 파일로 다시 채운다.
+"""
+import os
+import sys
+import argparse
+from datetime import datetime
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pyarrow.parquet as pq
+
+from services.lake import RAW_PREFIX, KEYWORDS_PREFIX, compact_partition, get_filesystem, list_partition, list_partition_dates
+from services.manifest import PostManifest
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args()
+
+    fs, _ = get_filesystem()
+    name = f"migrated_{datetime.now().strftime('%Y%m%d%H%M%S')}"
+    dates = list_partition_dates(RAW_PREFIX)
+    legacy, migrated = 0, []
+    for partition_date in dates:
+        paths = list_partition(RAW_PREFIX, partition_date)
+        files = sum("encoded_url" not in pq.read_schema(path, filesystem=fs).names for path in paths)
+        legacy += files
+        if args.dry_run or not files:
+            continue
+        compact_partition(RAW_PREFIX, partition_date, name)
+        compact_partition(KEYWORDS_PREFIX, partition_date, f"{name}_k")
+        migrated.append(partition_date)
+        print(f"dt={partition_date}: {files} keyword files moved")
+
+    manifest = PostManifest()
+    for partition_date in migrated:
+        # 합쳐진 파일로 매니페스트의 object key를 옮긴다
+        manifest.rebuild_from_lake(f"{RAW_PREFIX}/dt={partition_date}")
+    print(f"{legacy} legacy keyword files in {len(dates)} partitions of {RAW_PREFIX}{' (dry run)' if args.dry_run else ''}")
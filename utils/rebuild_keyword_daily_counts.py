@@ -0,0 +1,20 @@
+"""
+KEYWORD_DAILY_COUNTS를 EXTERNAL_POSTS_KEYWORDS 전체에서 다시 계산
+
+    python utils/setup.py                          # 테이블 생성
+    python utils/rebuild_keyword_daily_counts.py   # 기존 매핑으로 최초 적재
+
+이후에는 upload_results_to_db가 새로 삽입된 매핑만큼 증분으로 갱신한다.
+"""
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.service_db import session_scope
+from services.bulk_load import rebuild_keyword_daily_counts
+
+if __name__ == "__main__":
+    with session_scope() as db:
+        rows = rebuild_keyword_daily_counts(db.connection().connection.cursor())
+    print(f"KEYWORD_DAILY_COUNTS: {rows} rows")
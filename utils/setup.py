@@ -1,3 +1,6 @@
 from models.db_models import *
 from services.service_db import engine, Base
-Base.metadata.create_all(bind=engine)
\ No newline at end of file
+Base.metadata.create_all(bind=engine)
+# 기존 테이블에 나중에 추가된 컬럼 (create_all은 이미 있는 테이블을 바꾸지 않는다)
+with engine.begin() as conn:
+    conn.exec_driver_sql('ALTER TABLE "EXTERNAL_POSTS" ADD COLUMN IF NOT EXISTS analyzed_by VARCHAR(10)')
@@ -0,0 +1,22 @@
+"""
+로컬 키워드 추출/분류 모델 학습
+
+    python utils/train_local_extractor.py
+
+LLM이 분석한 EXTERNAL_POSTS의 본문(레이크), 카테고리, 키워드로 학습하고 held-out 포스트로
+사전 필터 확신도 기준을 보정해 LOCAL_MODEL_PATH에 저장한다.
+정기 학습은 local_extractor_training_deployment(flows/train_local_extractor.py)가 맡고, 추출 flow는 저장된 모델만 불러온다.
+"""
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.service_db import session_scope
+from plugins.extractor.local_extractor import LOCAL_MODEL_PATH, train_from_db
+
+if __name__ == "__main__":
+    with session_scope() as db:
+        model = train_from_db(db)
+    model.save()
+    print(f"{LOCAL_MODEL_PATH}: categories={len(model.classes)} keywords={len(model.keywords)} threshold={model.threshold}")
@@ -0,0 +1,33 @@
+"""
+로컬 트렌드 카운터에서 분야별 급상승 키워드 조회 (DB 접속 없음)
+
+    python utils/trending.py --days 7 --top 10
+    python utils/trending.py --days 30 --field 2
+"""
+import os
+import sys
+import time
+import argparse
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from plugins.trend.trend_counter import TrendCounter, TREND_COUNTER_PATH
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--path", default=TREND_COUNTER_PATH)
+    parser.add_argument("--days", type=int, default=7, help="비교 구간 길이 (일)")
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--field", type=int, default=None, help="field_id (생략하면 분야별로 모두 출력)")
+    args = parser.parse_args()
+
+    counter = TrendCounter.load(args.path, mmap_mode="r")
+    fields = [args.field] if args.field is not None else [None, *sorted(counter.field_names)]
+    for field_id in fields:
+        started = time.perf_counter()
+        rising = counter.top_rising(k=args.top, days=args.days, field_id=field_id)
+        elapsed = (time.perf_counter() - started) * 1000
+        name = "전체" if field_id is None else counter.field_names.get(field_id, str(field_id))
+        print(f"== {name} ({elapsed:.1f} ms)")
+        for item in rising:
+            print(f"  {item['keyword'] or item['keyword_id']}: {item['previous_count']} -> {item['count']} ({item['score']:.2f})")